@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: compiled keyword classifier vs. the original
+per-category `any(keyword in text ...)` scans.
+
+Usage:
+    python3 benchmarks/bench_categorize.py [iterations]
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from generate_quests import categorize_event
+
+SAMPLE_EVENTS = [
+    ("Team Standup", ""),
+    ("Code Review Session", "Walk through the auth refactor"),
+    ("Q1 Report - FINAL DEADLINE", "Numbers due to finance by EOD"),
+    ("Morning run", "5k around the lake"),
+    ("Sunday brunch with the family", "Pancakes at the usual place"),
+    ("Read the new RFC", "Focus on the security section"),
+    ("Pick up dry cleaning", ""),
+    ("Dentist appointment", "Bring insurance card and arrive 10 minutes early"),
+]
+
+def categorize_event_legacy(title: str, description: str = "") -> str:
+    """The substring-scan classifier this benchmark compares against."""
+    title_lower = title.lower()
+    desc_lower = description.lower()
+
+    coding_keywords = ['code', 'programming', 'development', 'debug', 'refactor', 'commit', 'pull request', 'merge', 'review']
+    meeting_keywords = ['meeting', 'call', 'sync', 'standup', 'review', 'discussion', 'interview', 'presentation']
+    writing_keywords = ['write', 'document', 'email', 'report', 'blog', 'documentation', 'proposal']
+    exercise_keywords = ['gym', 'workout', 'run', 'exercise', 'fitness', 'yoga', 'sports', 'training']
+    research_keywords = ['research', 'study', 'learn', 'read', 'investigate', 'analysis', 'explore']
+
+    text = f"{title_lower} {desc_lower}"
+
+    if any(keyword in text for keyword in coding_keywords):
+        return 'coding'
+    elif any(keyword in text for keyword in meeting_keywords):
+        return 'meeting'
+    elif any(keyword in text for keyword in writing_keywords):
+        return 'writing'
+    elif any(keyword in text for keyword in exercise_keywords):
+        return 'exercise'
+    elif any(keyword in text for keyword in research_keywords):
+        return 'research'
+    else:
+        return 'misc'
+
+def run(func, iterations: int) -> float:
+    """Return classifications per second for `func` over the sample events."""
+    elapsed = timeit.timeit(
+        lambda: [func(title, description) for title, description in SAMPLE_EVENTS],
+        number=iterations
+    )
+    return iterations * len(SAMPLE_EVENTS) / elapsed
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    legacy = run(categorize_event_legacy, iterations)
+    compiled = run(categorize_event, iterations)
+
+    print(f"legacy:   {legacy:>12,.0f} events/sec")
+    print(f"compiled: {compiled:>12,.0f} events/sec ({compiled / legacy:.2f}x)")
+
+    for title, description in SAMPLE_EVENTS:
+        before = categorize_event_legacy(title, description)
+        after = categorize_event(title, description)
+        marker = "" if before == after else "  <- changed"
+        print(f"  {title!r}: {before} -> {after}{marker}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark: narration client (cache + coalescing + micro-batching) vs. one
+model request per prompt, against the local stub model server.
+
+A burst of concurrent prompts drawn from a small set of distinct ones (as
+near-identical quests produce) is narrated twice: cold, then warm from the
+disk cache. No network is used.
+
+Usage:
+    python3 benchmarks/bench_narration_client.py [prompts] [distinct] [latency_ms]
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from narration_client import ChatTransport, NarrationCache, NarrationClient, StubModelServer
+
+
+def naive(stub: StubModelServer, prompts) -> float:
+    """One blocking request per prompt, no cache."""
+    transport = ChatTransport(stub.url, api_key='')
+    started = time.perf_counter()
+    for prompt in prompts:
+        transport.complete('stub', [{"role": "user", "content": prompt}])
+    return time.perf_counter() - started
+
+
+def client_run(stub: StubModelServer, cache: NarrationCache, prompts):
+    client = NarrationClient(ChatTransport(stub.url, api_key=''), cache, model='stub', style='epic_humorous')
+    started = time.perf_counter()
+    texts = asyncio.run(client.narrate_many(prompts))
+    elapsed = time.perf_counter() - started
+    client.close()
+    assert len(texts) == len(prompts) and all(texts)
+    return elapsed, client.counters
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    latency = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.05
+    prompts = [
+        f"The quest 'Refactoring the Legacy Crypt #{index % distinct}' is complete. You gained 100 XP!"
+        for index in range(count)
+    ]
+
+    with StubModelServer(latency=latency) as stub, tempfile.TemporaryDirectory() as directory:
+        naive_seconds = naive(stub, prompts)
+        naive_requests = stub.requests
+
+        cache = NarrationCache(os.path.join(directory, 'narration.db'))
+        cold_seconds, cold = client_run(stub, cache, prompts)
+        cold_requests = stub.requests - naive_requests
+        warm_seconds, warm = client_run(stub, cache, prompts)
+        warm_requests = stub.requests - naive_requests - cold_requests
+        cache.close()
+
+    print(json.dumps({
+        "prompts": count,
+        "distinct": distinct,
+        "stub_latency_ms": latency * 1000,
+        "naive": {"seconds": round(naive_seconds, 3), "model_requests": naive_requests},
+        "client_cold": {"seconds": round(cold_seconds, 3), "model_requests": cold_requests, **cold},
+        "client_warm": {"seconds": round(warm_seconds, 3), "model_requests": warm_requests, **warm},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
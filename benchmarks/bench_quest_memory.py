@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark: a quest history held as a list of dicts vs. a list of
+__slots__ Quest objects vs. a columnar QuestTable, plus the time for one
+category-count pass over each.
+
+Usage:
+    python3 benchmarks/bench_quest_memory.py [count]
+"""
+
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_quests import generate_quest_from_event
+from quest_model import QuestTable, quests_from_dicts
+from resolve_quest import build_aggregates
+from synthetic import synthetic_events
+
+def serialize_quests(count: int):
+    """Completed quests generated from synthetic events, one JSON line each."""
+    lines = []
+    for seq, event in enumerate(synthetic_events(count)):
+        quest = generate_quest_from_event(event, seq)
+        quest['status'] = 'completed'
+        quest['completed_at'] = event.get('end', {}).get('dateTime', quest['created_at'])
+        lines.append(json.dumps(quest))
+    return lines
+
+def make_quests(lines):
+    """Parse the quests afresh, as when a history is loaded from disk."""
+    for line in lines:
+        yield json.loads(line)
+
+def measure(build):
+    """Return (result, bytes allocated while building it)."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    # Generated once, before tracing starts, so only the parsed quests are measured
+    lines = serialize_quests(count)
+
+    dicts, dict_bytes = measure(lambda: list(make_quests(lines)))
+    dict_time = timed(lambda: build_aggregates(dicts))
+    del dicts
+
+    # Each model is built straight from the generator, so the transient
+    # source dicts are freed and only what the model retains is counted
+    objects, object_bytes = measure(lambda: quests_from_dicts(make_quests(lines)))
+    object_time = timed(lambda: build_aggregates(objects))
+    del objects
+
+    table, table_bytes = measure(lambda: QuestTable(make_quests(lines)))
+    table_time = timed(lambda: build_aggregates(table))
+
+    print(f"{count:,} quests")
+    print(f"list of dicts: {dict_bytes / 2**20:>9,.1f} MiB  aggregates {dict_time:.3f}s")
+    print(f"Quest objects: {object_bytes / 2**20:>9,.1f} MiB  aggregates {object_time:.3f}s ({dict_bytes / object_bytes:.1f}x smaller)")
+    print(f"QuestTable:    {table_bytes / 2**20:>9,.1f} MiB  aggregates {table_time:.3f}s ({dict_bytes / table_bytes:.1f}x smaller)")
+
+if __name__ == "__main__":
+    main()
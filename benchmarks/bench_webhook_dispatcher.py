@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: posting a team's morning boards through the webhook dispatcher
+vs. one synchronous post per quest, against the local stand-in server.
+
+The stand-in enforces Discord's webhook limit (5 posts per 2 s per
+channel) and answers 429 with Retry-After when it is exceeded; the serial
+baseline waits out every 429 and opens a new connection per post. No
+network is used.
+
+Usage:
+    python3 benchmarks/bench_webhook_dispatcher.py [channels] [quests_per_channel] [--fail-every N] [--baseline]
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_quests import generate_quest_from_event
+from synthetic import synthetic_events
+from webhook_dispatcher import StandInServer, WebhookDispatcher, format_quest
+
+
+def board_entries(count: int, seed: int):
+    return [format_quest(generate_quest_from_event(event)) for event in synthetic_events(count, seed)]
+
+
+async def dispatched(standin: StandInServer, boards):
+    channels = {f"team{index}": {"platform": "discord", "url": standin.url(f"/team{index}")} for index in range(len(boards))}
+    dispatcher = WebhookDispatcher(channels)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(dispatcher.send_all(name, entries) for name, entries in zip(channels, boards)))
+    elapsed = time.perf_counter() - started
+    await dispatcher.close()
+    failures = sum(isinstance(result, Exception) for batch in results for result in batch)
+    return elapsed, dict(dispatcher.stats, connections=dispatcher.pool.opened, failed_entries=failures)
+
+
+def serial(url_for, boards):
+    """One blocking post per quest, sleeping out each 429."""
+    posts = 0
+    started = time.perf_counter()
+    for index, entries in enumerate(boards):
+        for entry in entries:
+            while True:
+                posts += 1
+                request = urllib.request.Request(url_for(f"/serial{index}"), data=json.dumps({"content": entry}).encode(),
+                                                 headers={'Content-Type': 'application/json'}, method='POST')
+                try:
+                    urllib.request.urlopen(request).close()
+                    break
+                except urllib.error.HTTPError as e:
+                    time.sleep(float(e.headers.get('Retry-After') or 1) if e.code == 429 else 0.5)
+    return time.perf_counter() - started, posts
+
+
+def main():
+    args = sys.argv[1:]
+    fail_every = 0
+    if '--fail-every' in args:
+        index = args.index('--fail-every')
+        fail_every = int(args[index + 1])
+        del args[index:index + 2]
+    baseline = '--baseline' in args
+    args = [arg for arg in args if arg != '--baseline']
+    channel_count = int(args[0]) if args else 20
+    per_channel = int(args[1]) if len(args) > 1 else 25
+    boards = [board_entries(per_channel, seed) for seed in range(channel_count)]
+
+    loop = asyncio.new_event_loop()
+    standin = loop.run_until_complete(StandInServer(fail_every=fail_every).start())
+    report = {"channels": channel_count, "quests_per_channel": per_channel}
+
+    elapsed, stats = loop.run_until_complete(dispatched(standin, boards))
+    report["dispatcher"] = {"seconds": round(elapsed, 3), "quests_per_sec": round(channel_count * per_channel / elapsed, 1), **stats}
+
+    if baseline:
+        # Serve the stand-in from a background thread while the baseline blocks
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        posts_before = standin.posts
+        elapsed, posts = serial(standin.url, boards)
+        report["serial"] = {"seconds": round(elapsed, 3), "quests_per_sec": round(channel_count * per_channel / elapsed, 1), "posts": posts}
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        assert standin.posts - posts_before == posts
+    loop.run_until_complete(standin.stop())
+    report["standin"] = {"connections": standin.connections, "posts": standin.posts, "rejected_429": standin.rejected}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: times the hot paths on seeded synthetic data and writes
+machine-readable JSON, optionally comparing against a saved baseline.
+
+Cases (each run at every size):
+    categorize_event          classify N event titles/descriptions
+    generate_quest_from_event build N quests from events
+    generate_quests_main      full generate_quests.main on an N-event export
+    resolve_history_scan      resolve_quest_completion over an N-quest
+                              history without aggregates (full scan)
+    resolve_aggregates        the same with the persisted aggregate block
+    generate_boss_encounter   N boss encounters
+
+Usage:
+    python3 benchmarks/run_benchmarks.py [--sizes 100,1000,10000] [--seed N]
+        [--repeat N] [--only case,...] [--output results.json]
+        [--compare baseline.json] [--threshold 0.2]
+
+With --compare, cases more than --threshold (fractional) slower than the
+baseline are reported as regressions and the exit status is 1. Save a
+baseline with --output and commit it alongside the change it measures.
+"""
+
+import atexit
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, Any, List, Callable
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import generate_quests
+from generate_quests import categorize_event, generate_quest_from_event
+from resolve_quest import resolve_quest_completion, build_aggregates
+from boss_fight import generate_boss_encounter
+from synthetic import synthetic_events, synthetic_history, DEFAULT_SEED
+
+DEFAULT_SIZES = [100, 1000, 10000]
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.2
+
+def _time(func: Callable[[], Any], repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+def case_categorize_event(size: int, seed: int):
+    pairs = [(event['title'], event['description']) for event in synthetic_events(size, seed)]
+    return size, lambda: [categorize_event(title, description) for title, description in pairs]
+
+def case_generate_quest_from_event(size: int, seed: int):
+    events = synthetic_events(size, seed)
+    return size, lambda: [generate_quest_from_event(event, seq) for seq, event in enumerate(events)]
+
+def case_generate_quests_main(size: int, seed: int):
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        json.dump(synthetic_events(size, seed), f)
+        path = f.name
+    atexit.register(os.unlink, path)
+
+    def run():
+        argv = sys.argv
+        sys.argv = ['generate_quests.py', path]
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_quests.main()
+        finally:
+            sys.argv = argv
+
+    return size, run
+
+def _resolve_setup(size: int, seed: int):
+    history = synthetic_history(size, seed)
+    quest = dict(history[-1], status='active', completed_at=None)
+    character_sheet = {"xp": sum(q['xp_reward'] for q in history), "level": 1, "class": "Unclassed"}
+    return history, quest, character_sheet
+
+def case_resolve_history_scan(size: int, seed: int):
+    history, quest, character_sheet = _resolve_setup(size, seed)
+    # Enough completions per timing to rise above timer noise at small sizes
+    ops = max(1, min(100, 100000 // size))
+    return ops, lambda: [resolve_quest_completion(dict(quest), character_sheet, history) for _ in range(ops)]
+
+def case_resolve_aggregates(size: int, seed: int):
+    history, quest, character_sheet = _resolve_setup(size, seed)
+    aggregates = build_aggregates(history)
+    ops = 1000
+    return ops, lambda: [resolve_quest_completion(dict(quest), character_sheet, aggregates=aggregates) for _ in range(ops)]
+
+def case_generate_boss_encounter(size: int, seed: int):
+    quests = [generate_quest_from_event(event, seq) for seq, event in enumerate(synthetic_events(size, seed))]
+    character_sheet = {"level": 4}
+    return size, lambda: [generate_boss_encounter(quest, character_sheet) for quest in quests]
+
+CASES = {
+    'categorize_event': case_categorize_event,
+    'generate_quest_from_event': case_generate_quest_from_event,
+    'generate_quests_main': case_generate_quests_main,
+    'resolve_history_scan': case_resolve_history_scan,
+    'resolve_aggregates': case_resolve_aggregates,
+    'generate_boss_encounter': case_generate_boss_encounter,
+}
+
+def run_suite(sizes: List[int], seed: int = DEFAULT_SEED, repeat: int = DEFAULT_REPEAT, only: List[str] = None) -> Dict[str, Any]:
+    """Run every case at every size; returns the JSON-ready report."""
+    results = {}
+    for name, setup in CASES.items():
+        if only and name not in only:
+            continue
+        for size in sizes:
+            ops, func = setup(size, seed)
+            timings = _time(func, repeat)
+            best = min(timings)
+            results[f"{name}@{size}"] = {
+                "case": name,
+                "size": size,
+                "ops": ops,
+                "best_seconds": best,
+                "median_seconds": statistics.median(timings),
+                "ops_per_sec": ops / best if best > 0 else None,
+            }
+            print(f"{name:<28} {size:>9,}  {best:>10.4f}s  {ops / best if best > 0 else 0:>14,.0f} ops/sec", file=sys.stderr)
+    return {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat() + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "repeat": repeat,
+            "sizes": sizes,
+        },
+        "results": results
+    }
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """Per-case change in best time vs. the baseline; slower than the threshold is a regression."""
+    rows = []
+    for key, current in report['results'].items():
+        previous = baseline.get('results', {}).get(key)
+        if previous is None or not previous.get('best_seconds'):
+            continue
+        ratio = current['best_seconds'] / previous['best_seconds']
+        rows.append({
+            "key": key,
+            "baseline_seconds": previous['best_seconds'],
+            "current_seconds": current['best_seconds'],
+            "ratio": ratio,
+            "regression": ratio > 1 + threshold
+        })
+    return rows
+
+def main():
+    args = sys.argv[1:]
+    options = {}
+    for flag in ('--sizes', '--seed', '--repeat', '--only', '--output', '--compare', '--threshold'):
+        if flag in args:
+            index = args.index(flag)
+            options[flag] = args[index + 1]
+            del args[index:index + 2]
+
+    sizes = [int(size) for size in options['--sizes'].split(',')] if '--sizes' in options else DEFAULT_SIZES
+    only = options['--only'].split(',') if '--only' in options else None
+    unknown = [name for name in only or [] if name not in CASES]
+    if unknown:
+        print(f"Error: unknown case(s): {', '.join(unknown)}", file=sys.stderr)
+        sys.exit(2)
+
+    report = run_suite(
+        sizes,
+        seed=int(options.get('--seed', DEFAULT_SEED)),
+        repeat=int(options.get('--repeat', DEFAULT_REPEAT)),
+        only=only
+    )
+
+    regressions = []
+    if '--compare' in options:
+        with open(options['--compare'], 'r') as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, float(options.get('--threshold', DEFAULT_THRESHOLD)))
+        report['comparison'] = rows
+        for row in rows:
+            marker = "  <- REGRESSION" if row['regression'] else ""
+            print(f"{row['key']:<40} {row['ratio']:>6.2f}x{marker}", file=sys.stderr)
+        regressions = [row for row in rows if row['regression']]
+
+    output = json.dumps(report, indent=2)
+    if '--output' in options:
+        with open(options['--output'], 'w') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond the threshold", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
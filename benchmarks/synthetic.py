@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Seeded synthetic data for benchmarks: calendar exports and completion
+histories that look like a real player's, at any size.
+
+The same (count, seed) always produces the same data, so timings from
+different runs and machines measure the code, not the input.
+
+Usage:
+    python3 benchmarks/synthetic.py events [count] [--seed N] > events.json
+    python3 benchmarks/synthetic.py history [count] [--seed N] > quests.json
+"""
+
+import datetime
+import json
+import os
+import random
+import sys
+from typing import Dict, Any, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from generate_quests import generate_quest_from_event
+
+DEFAULT_SEED = 1337
+START_DATE = datetime.datetime(2026, 1, 5, tzinfo=datetime.timezone.utc)
+
+# (weight, title templates, description templates) per kind of event
+EVENT_KINDS = [
+    (30, ["Team Standup", "1:1 with {person}", "Sprint Planning", "Design Review: {project}",
+          "Call with {person}", "{project} sync", "Interview: {role} candidate", "All-hands"],
+         ["", "Agenda in the doc", "Dial-in link in the invite", "Bring updates on {project}"]),
+    (25, ["Refactor {project} module", "Debug flaky {project} tests", "Code review for {project}",
+          "Merge {project} pull request", "Pairing on {project}", "Ship {project} v{version}"],
+         ["", "Focus block", "See ticket {ticket}", "Branch: feature/{ticket}"]),
+    (15, ["Write {project} proposal", "Draft blog post", "Q{quarter} report", "Reply to email backlog",
+          "Document the {project} API"],
+         ["", "Due to {person} by EOD", "Outline first, then prose"]),
+    (10, ["Morning run", "Gym: leg day", "Yoga class", "Climbing with {person}", "Marathon training"],
+         ["", "5k around the lake", "Bring water"]),
+    (10, ["Read {project} RFC", "Research {topic}", "Study for {topic} certification", "Explore {topic} options"],
+         ["", "Take notes", "Focus on the security section"]),
+    (10, ["Dentist appointment", "Pick up dry cleaning", "Groceries", "Tax filing", "Car service",
+          "Dinner with {person}"],
+         ["", "Bring insurance card", "Remember the receipts"]),
+]
+PEOPLE = ["Alex", "Sam", "Priya", "Jordan", "Mei", "Chris", "Taylor", "Noor"]
+PROJECTS = ["billing", "auth", "search", "onboarding", "payments", "reporting", "mobile", "infra"]
+TOPICS = ["Kubernetes", "Rust", "accessibility", "pricing", "LLM evals", "SQL tuning"]
+ROLES = ["backend", "frontend", "SRE", "data"]
+# Mostly short events with a long tail so every difficulty (and bosses) shows up
+DURATIONS = [(15, 15), (30, 30), (45, 10), (60, 20), (90, 10), (120, 7), (180, 2), (240, 1)]
+
+def _fill(rng: random.Random, template: str) -> str:
+    return template.format(
+        person=rng.choice(PEOPLE), project=rng.choice(PROJECTS), topic=rng.choice(TOPICS),
+        role=rng.choice(ROLES), ticket=f"QB-{rng.randrange(100, 9999)}",
+        version=f"{rng.randrange(1, 5)}.{rng.randrange(0, 20)}", quarter=rng.randrange(1, 5)
+    )
+
+def synthetic_events(count: int, seed: int = DEFAULT_SEED, all_day_rate: float = 0.03) -> List[Dict[str, Any]]:
+    """`count` Google Calendar-style events, ~8 per working day."""
+    rng = random.Random(seed)
+    weights = [kind[0] for kind in EVENT_KINDS]
+    duration_values = [value for value, _ in DURATIONS]
+    duration_weights = [weight for _, weight in DURATIONS]
+    events = []
+    for i in range(count):
+        _, titles, descriptions = rng.choices(EVENT_KINDS, weights)[0]
+        day = START_DATE + datetime.timedelta(days=i // 8)
+        event = {
+            "id": f"evt{seed:x}{i:07d}",
+            "title": _fill(rng, rng.choice(titles)),
+            "description": _fill(rng, rng.choice(descriptions)),
+            "status": "confirmed",
+            "updated": (day - datetime.timedelta(days=1)).isoformat().replace('+00:00', 'Z'),
+        }
+        if rng.random() < all_day_rate:
+            event["start"] = {"date": day.date().isoformat()}
+            event["end"] = {"date": (day + datetime.timedelta(days=1)).date().isoformat()}
+        else:
+            start = day + datetime.timedelta(hours=rng.randrange(8, 18), minutes=rng.choice((0, 15, 30, 45)))
+            end = start + datetime.timedelta(minutes=rng.choices(duration_values, duration_weights)[0])
+            event["start"] = {"dateTime": start.isoformat().replace('+00:00', 'Z')}
+            event["end"] = {"dateTime": end.isoformat().replace('+00:00', 'Z')}
+        events.append(event)
+    return events
+
+def synthetic_history(count: int, seed: int = DEFAULT_SEED) -> List[Dict[str, Any]]:
+    """`count` completed quests, generated from synthetic events."""
+    history = []
+    for seq, event in enumerate(synthetic_events(count, seed)):
+        quest = generate_quest_from_event(event, seq)
+        quest['status'] = 'completed'
+        quest['completed_at'] = event.get('end', {}).get('dateTime', quest['created_at'])
+        history.append(quest)
+    return history
+
+def main():
+    args = sys.argv[1:]
+    seed = DEFAULT_SEED
+    if '--seed' in args:
+        index = args.index('--seed')
+        seed = int(args[index + 1])
+        del args[index:index + 2]
+    if not args or args[0] not in ('events', 'history'):
+        print(__doc__.strip().split('Usage:')[1], file=sys.stderr)
+        sys.exit(2)
+    count = int(args[1]) if len(args) > 1 else 1000
+
+    if args[0] == 'events':
+        json.dump(synthetic_events(count, seed), sys.stdout)
+    else:
+        json.dump(synthetic_history(count, seed), sys.stdout)
+    print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Incremental streak and achievement engine.
+
+Driven by resolve_quest_completion (or resolve_quest_batch) results: each
+completion updates the day streak in O(1) and evaluates only the
+achievement rules that depend on something the completion changed.
+
+Rules live in data/achievements.json. An achievement unlocks when all of
+its conditions hold; conditions compare a completion-event field with an
+operator (==, !=, >=, >, <=, <, in). Event fields:
+
+    quest.<key>             any key of the completed quest
+    xp_gained, level, class, total_completed, streak
+    category_counts.<cat>   completions in a category (from the aggregates)
+    counters.<name>         counters declared in the same file, incremented
+                            when their `when` holds and zeroed on `reset_when`
+
+Rules are indexed by field at load time. Per completion, the quest.*,
+xp_gained, total_completed and the quest's category count always change;
+streak, level, class and counters only when they actually moved.
+
+Days are bucketed in the `timezone` from data/config.json. Streak state
+and unlocks are kept in data/achievements_state.json.
+
+Usage:
+    python3 scripts/achievements.py process < resolve_quest_output.json
+    python3 scripts/achievements.py status
+"""
+
+import datetime
+import json
+import operator
+import os
+import sys
+from typing import Dict, Any, List, Tuple
+
+from calendar_dates import get_timezone, parse_datetime
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+ACHIEVEMENTS_PATH = os.path.join(DATA_DIR, 'achievements.json')
+STATE_PATH = os.environ.get('QUESTBOARD_ACHIEVEMENTS_STATE', os.path.join(DATA_DIR, 'achievements_state.json'))
+
+OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>=': operator.ge,
+    '>': operator.gt,
+    '<=': operator.le,
+    '<': operator.lt,
+    'in': lambda value, options: value in options,
+}
+
+Condition = Tuple[str, Any, Any]
+
+
+def compile_conditions(spec: Dict[str, Dict[str, Any]]) -> List[Condition]:
+    """{"field": {"op": value}} -> [(field, op function, value)]."""
+    conditions = []
+    for field, tests in spec.items():
+        for symbol, expected in tests.items():
+            if symbol not in OPERATORS:
+                raise ValueError(f"Unknown operator {symbol!r} for {field}")
+            conditions.append((field, OPERATORS[symbol], expected))
+    return conditions
+
+
+def matches(conditions: List[Condition], event: Dict[str, Any]) -> bool:
+    for field, test, expected in conditions:
+        value = event.get(field)
+        if value is None and test not in (operator.eq, operator.ne):
+            return False
+        try:
+            if not test(value, expected):
+                return False
+        except TypeError:
+            return False
+    return True
+
+
+def empty_state() -> Dict[str, Any]:
+    return {'last_day': None, 'streak': 0, 'longest_streak': 0, 'class': None, 'counters': {}, 'unlocked': {}}
+
+
+class AchievementEngine:
+    """Rule index plus streak/counter/unlock state."""
+
+    def __init__(self, rules: Dict[str, Any] = None, state: Dict[str, Any] = None, tz: datetime.tzinfo = None):
+        if rules is None:
+            with open(ACHIEVEMENTS_PATH, 'r', encoding='utf-8') as f:
+                rules = json.load(f)
+        self.tz = tz or get_timezone()
+        self.state = state if state is not None else empty_state()
+
+        self.achievements = {entry['id']: entry for entry in rules.get('achievements', [])}
+        self._order = {achievement_id: position for position, achievement_id in enumerate(self.achievements)}
+        self._conditions = {entry['id']: compile_conditions(entry['when']) for entry in rules.get('achievements', [])}
+        self._counters = {
+            name: (compile_conditions(spec.get('when', {})), compile_conditions(spec.get('reset_when', {})))
+            for name, spec in rules.get('counters', {}).items()
+        }
+        # field -> achievement IDs that read it
+        self._index: Dict[str, List[str]] = {}
+        for achievement_id, conditions in self._conditions.items():
+            for field in {field for field, _, _ in conditions}:
+                self._index.setdefault(field, []).append(achievement_id)
+
+    def day_of(self, timestamp: str = None) -> int:
+        """Day ordinal of a completion timestamp in the player's timezone."""
+        when = None
+        if timestamp:
+            try:
+                when = parse_datetime(timestamp, datetime.timezone.utc)
+            except ValueError:
+                when = None
+        when = when or datetime.datetime.now(datetime.timezone.utc)
+        return when.astimezone(self.tz).date().toordinal()
+
+    def _advance_streak(self, day: int) -> bool:
+        """Fold one completion day into the streak; True if it changed."""
+        state = self.state
+        last_day = state['last_day']
+        if last_day is not None and day <= last_day:
+            return False  # same day, or a late completion for an earlier day
+        state['streak'] = state['streak'] + 1 if last_day == day - 1 else 1
+        state['longest_streak'] = max(state['longest_streak'], state['streak'])
+        state['last_day'] = day
+        return True
+
+    def current_streak(self, today: int = None) -> int:
+        """The streak as of `today`; 0 once a whole day has been missed."""
+        today = today if today is not None else self.day_of()
+        last_day = self.state['last_day']
+        if last_day is None or today - last_day > 1:
+            return 0
+        return self.state['streak']
+
+    def _process_one(self, result: Dict[str, Any], aggregates: Dict[str, Any]) -> List[Dict[str, Any]]:
+        quest = result.get('quest_completed', {})
+        category = quest.get('category', 'misc')
+        state = self.state
+
+        event = {f"quest.{key}": value for key, value in quest.items()}
+        event.update({
+            'xp_gained': result.get('xp_gained', 0),
+            'level': result.get('new_level'),
+            'class': result.get('class'),
+            'total_completed': aggregates.get('total_completed', result.get('total_quests_completed')),
+        })
+        for name, count in (aggregates.get('category_counts') or {}).items():
+            event[f"category_counts.{name}"] = count
+        changed = set(event) - {'level', 'class'} - {key for key in event if key.startswith('category_counts.')}
+        changed.add(f"category_counts.{category}")
+        if result.get('leveled_up'):
+            changed.add('level')
+        if result.get('class_assigned') or state.get('class') != result.get('class'):
+            changed.add('class')
+            state['class'] = result.get('class')
+
+        if self._advance_streak(self.day_of(quest.get('completed_at'))):
+            changed.add('streak')
+        event['streak'] = state['streak']
+
+        counters = state['counters']
+        for name, (when, reset_when) in self._counters.items():
+            before = counters.get(name, 0)
+            if reset_when and matches(reset_when, event):
+                counters[name] = 0
+            elif when and matches(when, event):
+                counters[name] = before + 1
+            if counters.get(name, 0) != before:
+                changed.add(f"counters.{name}")
+        for name, count in counters.items():
+            event[f"counters.{name}"] = count
+
+        unlocked = []
+        candidates = {achievement_id for field in changed for achievement_id in self._index.get(field, ())}
+        for achievement_id in sorted(candidates, key=self._order.get):
+            if achievement_id in state['unlocked']:
+                continue
+            if matches(self._conditions[achievement_id], event):
+                state['unlocked'][achievement_id] = quest.get('completed_at') or datetime.datetime.now().isoformat() + "Z"
+                unlocked.append(self.describe(achievement_id))
+        return unlocked
+
+    def describe(self, achievement_id: str) -> Dict[str, Any]:
+        entry = self.achievements.get(achievement_id, {'id': achievement_id, 'name': achievement_id})
+        return {
+            'id': achievement_id,
+            'emoji': entry.get('emoji', '🏅'),
+            'name': entry.get('name', achievement_id),
+            'description': entry.get('description', ''),
+            'unlocked_at': self.state['unlocked'].get(achievement_id)
+        }
+
+    def process(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply a resolve result; returns new unlocks and the streak.
+
+        The returned block is what resolve_quest.py --achievements adds to
+        its output under "achievements".
+        """
+        unlocked = []
+        if 'results' in result:
+            # Batch results carry only the final aggregates; rebuild the
+            # per-quest counts by walking back from them
+            aggregates = dict(result.get('aggregates') or {})
+            counts = dict(aggregates.get('category_counts') or {})
+            total = aggregates.get('total_completed', 0)
+            steps = []
+            for item in reversed(result['results']):
+                steps.append({'total_completed': total, 'category_counts': dict(counts)})
+                category = item.get('quest_completed', {}).get('category', 'misc')
+                counts[category] = counts.get(category, 0) - 1
+                total -= 1
+            for item, step in zip(result['results'], reversed(steps)):
+                unlocked += self._process_one(item, step)
+        else:
+            unlocked += self._process_one(result, result.get('aggregates') or {})
+        return {
+            'unlocked': unlocked,
+            'all_unlocked': [self.describe(achievement_id) for achievement_id in self.state['unlocked']],
+            'streak': self.state['streak'],
+            'longest_streak': self.state['longest_streak']
+        }
+
+
+def load_state(path: str = STATE_PATH) -> Dict[str, Any]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return empty_state()
+
+
+def save_state(state: Dict[str, Any], path: str = STATE_PATH):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def process_result(result: Dict[str, Any], path: str = STATE_PATH) -> Dict[str, Any]:
+    """Load state, apply one resolve result, save state."""
+    engine = AchievementEngine(state=load_state(path))
+    block = engine.process(result)
+    save_state(engine.state, path)
+    return block
+
+
+def main():
+    """Main function to apply completions or show streak and unlocks."""
+    try:
+        command = sys.argv[1] if len(sys.argv) > 1 else 'status'
+
+        if command == 'process':
+            output = process_result(json.load(sys.stdin))
+        elif command == 'status':
+            engine = AchievementEngine(state=load_state())
+            output = {
+                'streak': engine.current_streak(),
+                'longest_streak': engine.state['longest_streak'],
+                'unlocked': [engine.describe(achievement_id) for achievement_id in engine.state['unlocked']]
+            }
+        else:
+            raise ValueError(f"Unknown command: {command}")
+
+        print(json.dumps(output, indent=2, ensure_ascii=False))
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
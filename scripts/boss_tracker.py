@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Persistent boss fights: queue, pre-rendered encounters and phase progress.
+
+`sync` fills `boss_queue` in data/quest_log.json from the active quests
+flagged `is_boss` and drops fights whose quest is no longer active. The
+3-phase encounter for every fight that hasn't started is pre-rendered on a
+thread pool, or taken from the scheduler's board when it already rendered
+the same encounter (see scheduler.py). Each queue entry keeps its encounter, so delivering a phase
+is an O(1) state transition instead of regenerating everything:
+
+    phase 0 (0%) -> 1 (25%) -> 2 (50%) -> 3 (100%, boss defeated)
+
+Each fight has a deadline: the quest's `deadline` (its calendar event's
+end) if it has one, otherwise the end of the day it was created on (or
+queued on, if later), in the configured `timezone`. Phase due times fall
+at 25%, 50% and 100% of the time between queueing and the deadline. Defeating the boss by the deadline earns the 1.5x XP multiplier.
+The final `advance` returns the quest with its boosted `xp_reward`, ready
+to pipe into resolve_quest.py. A defeated fight stays queued (and can't be
+fought again) until its quest is resolved and leaves `active_quests`.
+
+Usage:
+    python3 scripts/boss_tracker.py sync
+    python3 scripts/boss_tracker.py status
+    python3 scripts/boss_tracker.py advance [quest_id] [--journal]
+    python3 scripts/boss_tracker.py deadline <quest_id> <ISO timestamp>
+
+`advance` without a quest ID moves the fight at the head of the queue.
+With --journal, each phase is also recorded in the quest journal.
+"""
+
+import datetime
+import json
+import os
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, List
+
+from boss_fight import encounter_cache_key, generate_boss_encounter
+from calendar_dates import get_timezone, parse_datetime
+from stable_hash import content_digest
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+QUEST_LOG_PATH = os.path.join(DATA_DIR, 'quest_log.json')
+
+PHASE_PROGRESS = ('0%', '25%', '50%', '100%')
+PHASE_FRACTIONS = (0.25, 0.5, 1.0)
+FINAL_PHASE = len(PHASE_FRACTIONS)
+EARLY_MULTIPLIER = 1.5
+RENDER_WORKERS = 2
+
+
+def _iso(when: datetime.datetime) -> str:
+    return when.astimezone(datetime.timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def default_deadline(quest: Dict[str, Any], tz: datetime.tzinfo, now: datetime.datetime) -> datetime.datetime:
+    """The quest's own deadline, else the end of its creation day.
+
+    Generated quests carry their calendar event's end (or, from the
+    scheduler, the end of their board's day) as `deadline`. Older quests
+    fall back to `created_at`, and to the end of `now`'s day when that
+    has already passed.
+    """
+    day = now
+    if quest.get('deadline'):
+        try:
+            return parse_datetime(quest['deadline'], datetime.timezone.utc)
+        except ValueError:
+            pass
+    if quest.get('created_at'):
+        try:
+            day = max(parse_datetime(quest['created_at'], datetime.timezone.utc), now)
+        except ValueError:
+            pass
+    local = day.astimezone(tz)
+    return datetime.datetime(local.year, local.month, local.day, tzinfo=tz) + datetime.timedelta(days=1)
+
+
+def phase_due(queued_at: datetime.datetime, deadline: datetime.datetime) -> List[str]:
+    span = max(deadline - queued_at, datetime.timedelta(0))
+    return [_iso(queued_at + span * fraction) for fraction in PHASE_FRACTIONS]
+
+
+class BossTracker:
+    """The boss queue of a quest log, with encounters and phase state."""
+
+    def __init__(self, quest_log: Dict[str, Any], character_sheet: Dict[str, Any] = None, tz: datetime.tzinfo = None):
+        self.quest_log = quest_log
+        self.character_sheet = character_sheet or {}
+        self.tz = tz or get_timezone()
+        self.lock = threading.Lock()
+        active = {quest.get('id'): quest for quest in quest_log.get('active_quests', [])}
+        queue = []
+        for entry in quest_log.get('boss_queue', []):
+            # Older logs queued bare quest IDs
+            if not isinstance(entry, dict):
+                entry = self._new_entry(active[entry]) if entry in active else None
+            if entry is not None:
+                queue.append(entry)
+        self.queue: List[Dict[str, Any]] = queue
+        quest_log['boss_queue'] = queue
+        self._index = {entry['id']: entry for entry in queue}
+
+    def _new_entry(self, quest: Dict[str, Any], now: datetime.datetime = None) -> Dict[str, Any]:
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        deadline = default_deadline(quest, self.tz, now)
+        return {
+            "id": quest['id'],
+            "quest": dict(quest),
+            "queued_at": _iso(now),
+            "deadline": _iso(deadline),
+            "phase_due": phase_due(now, deadline),
+            "phase": 0,
+            "progress": PHASE_PROGRESS[0],
+            "phase_completed_at": [],
+            "encounter": None,
+            "encounter_key": None,
+            "defeated": False
+        }
+
+    def sync(self, quests: List[Dict[str, Any]] = None, now: datetime.datetime = None) -> Dict[str, List[str]]:
+        """Queue new active boss quests and drop fights that are no longer active."""
+        quests = quests if quests is not None else self.quest_log.get('active_quests', [])
+        active_ids = {quest.get('id') for quest in quests if quest.get('status', 'active') == 'active'}
+        queued, dropped = [], []
+        with self.lock:
+            for quest in quests:
+                if quest.get('is_boss') and quest.get('id') in active_ids and quest['id'] not in self._index:
+                    entry = self._index[quest['id']] = self._new_entry(quest, now)
+                    self.queue.append(entry)
+                    queued.append(quest['id'])
+            for entry in list(self.queue):
+                if entry['id'] not in active_ids:
+                    self._remove(entry)
+                    dropped.append(entry['id'])
+        return {"queued": queued, "dropped": dropped}
+
+    def _remove(self, entry: Dict[str, Any]):
+        self._index.pop(entry['id'], None)
+        self.queue.remove(entry)
+
+    def _render(self, entry: Dict[str, Any], key: str):
+        encounter = generate_boss_encounter(entry['quest'], self.character_sheet)
+        with self.lock:
+            # A fight that started meanwhile keeps the encounter it started with
+            if entry['phase'] == 0 or entry['encounter'] is None:
+                entry['encounter'], entry['encounter_key'] = encounter, key
+
+    def prerender(self, executor: ThreadPoolExecutor, rendered: Dict[str, Dict[str, Any]] = None) -> List[Future]:
+        """Render encounters for fights that haven't started, on `executor`.
+
+        Encounters are re-rendered if the quest or player level changed
+        since they were rendered; fights in progress are left alone.
+        `rendered` maps encounter keys to encounters already rendered
+        elsewhere, which are adopted instead.
+        """
+        rendered = rendered or {}
+        futures = []
+        with self.lock:
+            pending = []
+            for entry in self.queue:
+                key = content_digest(encounter_cache_key(entry['quest'], self.character_sheet))
+                if entry['encounter'] is not None and (entry['phase'] > 0 or entry['encounter_key'] == key):
+                    continue
+                if key in rendered:
+                    entry['encounter'], entry['encounter_key'] = rendered[key], key
+                else:
+                    pending.append((entry, key))
+        for entry, key in pending:
+            futures.append(executor.submit(self._render, entry, key))
+        return futures
+
+    def fight(self, quest_id: str = None) -> Dict[str, Any]:
+        if quest_id:
+            entry = self._index.get(quest_id)
+        else:
+            entry = next((entry for entry in self.queue if not entry.get('defeated')), None)
+        if entry is None:
+            raise ValueError(f"No boss fight queued for {quest_id}" if quest_id else "The boss queue is empty")
+        return entry
+
+    def set_deadline(self, quest_id: str, deadline: str) -> Dict[str, Any]:
+        with self.lock:
+            entry = self.fight(quest_id)
+            when = parse_datetime(deadline, self.tz)
+            entry['deadline'] = _iso(when)
+            entry['phase_due'] = phase_due(parse_datetime(entry['queued_at']), when)
+        return self.describe(entry)
+
+    def advance(self, quest_id: str = None, now: datetime.datetime = None) -> Dict[str, Any]:
+        """Move a fight to its next phase and return that phase."""
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        with self.lock:
+            entry = self.fight(quest_id)
+            if entry.get('defeated'):
+                raise ValueError(f"Boss fight {entry['id']} is already won; resolve the quest to clear it")
+            if entry['encounter'] is None:
+                entry['encounter'] = generate_boss_encounter(entry['quest'], self.character_sheet)
+                entry['encounter_key'] = content_digest(encounter_cache_key(entry['quest'], self.character_sheet))
+            phase = entry['phase'] + 1
+            entry['phase'] = phase
+            entry['progress'] = PHASE_PROGRESS[phase]
+            entry['phase_completed_at'].append(_iso(now))
+
+            result = {
+                "quest_id": entry['id'],
+                "boss_name": entry['encounter'].get('boss_name'),
+                "phase": phase,
+                "progress": entry['progress'],
+                "encounter_phase": entry['encounter']['phases'][phase - 1],
+                "on_schedule": now <= parse_datetime(entry['phase_due'][phase - 1]),
+                "deadline": entry['deadline'],
+                "defeated": phase == FINAL_PHASE
+            }
+            if phase == FINAL_PHASE:
+                early = now <= parse_datetime(entry['deadline'])
+                multiplier = EARLY_MULTIPLIER if early else 1.0
+                quest = dict(entry['quest'])
+                base_xp = quest.get('xp_reward', 250)
+                quest['xp_reward'] = int(base_xp * multiplier)
+                quest['boss_xp_multiplier'] = multiplier
+                # Resolution flags the completion against the fight's deadline
+                quest['deadline'] = entry['deadline']
+                result.update({"early": early, "xp_multiplier": multiplier, "base_xp": base_xp, "quest": quest})
+                entry['defeated'] = True
+        return result
+
+    def describe(self, entry: Dict[str, Any], now: datetime.datetime = None) -> Dict[str, Any]:
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        deadline = parse_datetime(entry['deadline'])
+        next_due = entry['phase_due'][entry['phase']] if entry['phase'] < FINAL_PHASE else None
+        return {
+            "quest_id": entry['id'],
+            "quest_name": entry['quest'].get('name'),
+            "phase": entry['phase'],
+            "progress": entry['progress'],
+            "deadline": entry['deadline'],
+            "minutes_left": round((deadline - now).total_seconds() / 60),
+            "next_phase_due": next_due,
+            "behind_schedule": next_due is not None and now > parse_datetime(next_due),
+            "encounter_ready": entry['encounter'] is not None,
+            "defeated": entry.get('defeated', False)
+        }
+
+    def status(self, now: datetime.datetime = None) -> List[Dict[str, Any]]:
+        with self.lock:
+            return [self.describe(entry, now) for entry in self.queue]
+
+
+def load_quest_log(path: str = QUEST_LOG_PATH) -> Dict[str, Any]:
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"active_quests": [], "completed_quests": [], "daily_generated": None, "boss_queue": []}
+
+
+def save_quest_log(quest_log: Dict[str, Any], path: str = QUEST_LOG_PATH):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(quest_log, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def board_encounters(day: datetime.date = None) -> Dict[str, Dict[str, Any]]:
+    """Encounters on the scheduler's board for `day`, by encounter key."""
+    from scheduler import load_board
+    board = load_board(day or datetime.datetime.now(get_timezone()).date()) or {}
+    encounters = board.get('boss_encounters', {})
+    return {
+        source['encounter_key']: encounters[source['quest_id']]
+        for source in board.get('sources', {}).values()
+        if source.get('encounter_key') and source['quest_id'] in encounters
+    }
+
+
+def load_character_sheet() -> Dict[str, Any]:
+    try:
+        from character_sheet import CharacterSheetFile, character_from_sheet
+        return character_from_sheet(CharacterSheetFile().load())
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def main():
+    """Main function to sync, inspect and advance boss fights."""
+    try:
+        args = sys.argv[1:]
+        use_journal = '--journal' in args
+        if use_journal:
+            args.remove('--journal')
+        command = args[0] if args else 'status'
+        quest_log = load_quest_log()
+        tracker = BossTracker(quest_log, load_character_sheet())
+
+        if command == 'sync':
+            output = tracker.sync()
+            with ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix='boss-render') as executor:
+                output['rendered'] = len(tracker.prerender(executor, board_encounters()))
+            output['fights'] = tracker.status()
+        elif command == 'status':
+            output = tracker.status()
+        elif command == 'advance':
+            output = tracker.advance(args[1] if len(args) > 1 else None)
+            if use_journal:
+                from quest_journal import QuestJournal
+                QuestJournal().record_boss_phase(output['quest_id'], output['phase'])
+        elif command == 'deadline':
+            if len(args) < 3:
+                raise ValueError("Usage: boss_tracker.py deadline <quest_id> <ISO timestamp>")
+            output = tracker.set_deadline(args[1], args[2])
+        else:
+            raise ValueError(f"Unknown command: {command}")
+
+        if command != 'status':
+            save_quest_log(quest_log)
+        print(json.dumps(output, indent=2, ensure_ascii=False))
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Date handling for calendar events.
+
+Handles timed (`dateTime`) and all-day (`date`) event boundaries, interprets
+naive times in the `timezone` from data/config.json, and lazily expands
+recurring events (common RRULE patterns) as a generator bounded by a time
+window, so an open-ended weekly standup never becomes a huge list.
+
+Supported RRULE parts: FREQ (DAILY, WEEKLY, MONTHLY, YEARLY), INTERVAL,
+COUNT, UNTIL and BYDAY (plain weekdays). EXDATE lines are honored.
+Anything else is expanded as if the unsupported part were absent.
+"""
+
+import datetime
+import json
+import os
+import re
+from typing import Dict, Any, Iterator, Iterable, Optional, Tuple
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python 3.8: fall back to UTC
+    ZoneInfo = None
+
+from instrumentation import timed
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'config.json')
+
+DEFAULT_DURATION_MINUTES = 30
+WEEKDAYS = {'MO': 0, 'TU': 1, 'WE': 2, 'TH': 3, 'FR': 4, 'SA': 5, 'SU': 6}
+
+INSTANCE_STAMP = re.compile(r'_(\d{8}(?:T\d{6}Z)?)$')
+
+_default_tz = None
+
+
+def get_timezone(name: str = None) -> datetime.tzinfo:
+    """Resolve a tz name; None means the configured player timezone."""
+    global _default_tz
+    if name is None:
+        if _default_tz is None:
+            try:
+                with open(CONFIG_PATH, 'r') as f:
+                    name = json.load(f).get('timezone')
+            except (OSError, ValueError):
+                name = None
+            _default_tz = get_timezone(name or 'UTC')
+        return _default_tz
+    if ZoneInfo is None or name == 'UTC':
+        return datetime.timezone.utc
+    try:
+        return ZoneInfo(name)
+    except (KeyError, ValueError):
+        return datetime.timezone.utc
+
+
+def parse_datetime(value: str, tz: datetime.tzinfo = None) -> datetime.datetime:
+    """Parse an ISO timestamp; naive values are taken to be in `tz`."""
+    parsed = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=tz or get_timezone())
+    return parsed
+
+
+def parse_event_time(when: Dict[str, Any], tz: datetime.tzinfo = None) -> Tuple[Optional[datetime.datetime], bool]:
+    """Return (aware datetime, is_all_day) for an event start/end block.
+
+    Timed values are converted into the block's `timeZone` (or `tz`, or the
+    player's timezone) so recurrence follows that zone's DST rules.
+    """
+    if not when:
+        return None, False
+    zone = get_timezone(when['timeZone']) if when.get('timeZone') else (tz or get_timezone())
+    if when.get('dateTime'):
+        return parse_datetime(when['dateTime'], zone).astimezone(zone), False
+    if when.get('date'):
+        day = datetime.date.fromisoformat(when['date'])
+        return datetime.datetime(day.year, day.month, day.day, tzinfo=zone), True
+    return None, False
+
+
+@timed('duration_parse')
+def event_duration_minutes(event: Dict[str, Any], tz: datetime.tzinfo = None) -> int:
+    """Duration of an event in minutes.
+
+    All-day events have no meaningful working duration (a full day would
+    make every birthday a boss fight), so they, and events whose times are
+    missing or unparseable, get DEFAULT_DURATION_MINUTES.
+    """
+    try:
+        start, start_all_day = parse_event_time(event.get('start', {}), tz)
+        end, end_all_day = parse_event_time(event.get('end', {}), tz)
+    except (ValueError, TypeError, AttributeError):
+        return DEFAULT_DURATION_MINUTES
+    if start is None or end is None or start_all_day or end_all_day:
+        return DEFAULT_DURATION_MINUTES
+    return int((end - start).total_seconds() / 60)
+
+
+def parse_rrule(rule: str) -> Dict[str, str]:
+    """Split 'RRULE:FREQ=WEEKLY;BYDAY=MO' into its parts."""
+    if ':' in rule:
+        rule = rule.split(':', 1)[1]
+    return dict(part.split('=', 1) for part in rule.split(';') if '=' in part)
+
+
+def _parse_rrule_time(value: str, tz: datetime.tzinfo) -> datetime.datetime:
+    """Parse the compact RRULE/EXDATE form (20260215 or 20260215T090000Z)."""
+    utc = value.endswith('Z')
+    value = value.rstrip('Z')
+    if 'T' in value:
+        parsed = datetime.datetime.strptime(value, '%Y%m%dT%H%M%S')
+    else:
+        parsed = datetime.datetime.strptime(value, '%Y%m%d')
+    return parsed.replace(tzinfo=datetime.timezone.utc if utc else tz)
+
+
+def _add_months(value: datetime.datetime, months: int) -> Optional[datetime.datetime]:
+    """Same day-of-month `months` later, or None if that month lacks it."""
+    month_index = value.month - 1 + months
+    try:
+        return value.replace(year=value.year + month_index // 12, month=month_index % 12 + 1)
+    except ValueError:
+        return None
+
+
+def _candidates(start: datetime.datetime, rule: Dict[str, str], window_start: datetime.datetime,
+                limit: datetime.datetime) -> Iterator[datetime.datetime]:
+    """Ascending local (naive) occurrence times for a rule, up to about `limit`.
+
+    Periods starting after `limit` aren't walked, so a rule whose BYDAY
+    never matches its step ends instead of looping.
+    """
+    freq = rule.get('FREQ', 'DAILY')
+    interval = max(int(rule.get('INTERVAL', 1)), 1)
+    byday = [WEEKDAYS[day[-2:]] for day in rule.get('BYDAY', '').split(',') if day[-2:] in WEEKDAYS]
+    # Without COUNT, skip straight to the window instead of walking from DTSTART
+    skip = 'COUNT' not in rule and window_start > start
+
+    if freq in ('DAILY', 'WEEKLY'):
+        step = datetime.timedelta(days=interval if freq == 'DAILY' else 7 * interval)
+        if freq == 'DAILY' and byday and interval % 7 == 0 and start.weekday() not in byday:
+            # Every step lands on DTSTART's weekday, which BYDAY excludes
+            return
+        if freq == 'WEEKLY' and byday:
+            # Walk week by week from the Monday of DTSTART's week
+            period_start = start - datetime.timedelta(days=start.weekday())
+        else:
+            period_start = start
+        if skip:
+            periods = (window_start - period_start) // step
+            period_start += step * max(periods - 1, 0)
+        while period_start <= limit:
+            if freq == 'WEEKLY' and byday:
+                for weekday in sorted(byday):
+                    candidate = period_start + datetime.timedelta(days=weekday)
+                    if candidate >= start:
+                        yield candidate
+            elif not byday or period_start.weekday() in byday:
+                yield period_start
+            period_start += step
+    elif freq == 'MONTHLY':
+        months = 0
+        if skip:
+            months = max(((window_start.year - start.year) * 12 + window_start.month - start.month) // interval - 1, 0) * interval
+        while _add_months(start.replace(day=1), months) <= limit:
+            candidate = _add_months(start, months)
+            if candidate is not None:
+                yield candidate
+            months += interval
+    elif freq == 'YEARLY':
+        years = 0
+        if skip:
+            years = max((window_start.year - start.year) // interval - 1, 0) * interval
+        while _add_months(start.replace(day=1), 12 * years) <= limit:
+            candidate = _add_months(start, 12 * years)
+            if candidate is not None:
+                yield candidate
+            years += interval
+
+
+def expand_recurring(event: Dict[str, Any], window_start: datetime.datetime, window_end: datetime.datetime, tz: datetime.tzinfo = None) -> Iterator[Dict[str, Any]]:
+    """Yield one event instance per occurrence inside [window_start, window_end).
+
+    Non-recurring events are yielded unchanged. Instances get Google-style
+    IDs ("<id>_<UTC stamp>") and a `recurringEventId` pointing back at the
+    master event.
+    """
+    rules = [line for line in event.get('recurrence', []) if line.startswith('RRULE')]
+    try:
+        start, all_day = parse_event_time(event.get('start', {}), tz)
+        end, _ = parse_event_time(event.get('end', {}), tz)
+    except (TypeError, ValueError):
+        # Unparseable times: pass the event through for the caller to report
+        start = end = None
+    if not rules or start is None:
+        yield event
+        return
+
+    zone = start.tzinfo
+    rule = parse_rrule(rules[0])
+    duration = (end - start) if end is not None else datetime.timedelta(minutes=DEFAULT_DURATION_MINUTES)
+    count = int(rule['COUNT']) if 'COUNT' in rule else None
+    until = _parse_rrule_time(rule['UNTIL'], zone) if 'UNTIL' in rule else None
+
+    excluded = set()
+    for line in event.get('recurrence', []):
+        if line.startswith('EXDATE'):
+            for value in line.split(':', 1)[1].split(','):
+                excluded.add(_parse_rrule_time(value, zone).astimezone(datetime.timezone.utc))
+
+    # Recurrence runs on local wall-clock time so DST shifts don't move events
+    local_start = start.replace(tzinfo=None)
+    local_window_start = window_start.astimezone(zone).replace(tzinfo=None)
+    limit = min(window_end, until) if until is not None else window_end
+    local_limit = limit.astimezone(zone).replace(tzinfo=None)
+
+    emitted = 0
+    for local in _candidates(local_start, rule, local_window_start, local_limit):
+        occurrence = local.replace(tzinfo=zone)
+        if occurrence >= window_end or (until is not None and occurrence > until):
+            return
+        emitted += 1
+        if count is not None and emitted > count:
+            return
+        if occurrence < window_start or occurrence.astimezone(datetime.timezone.utc) in excluded:
+            continue
+
+        instance = dict(event)
+        instance.pop('recurrence', None)
+        stamp = occurrence.astimezone(datetime.timezone.utc)
+        instance['id'] = f"{event.get('id', '')}_{stamp.strftime('%Y%m%d' if all_day else '%Y%m%dT%H%M%SZ')}"
+        instance['recurringEventId'] = event.get('id', '')
+        if all_day:
+            instance['start'] = {'date': occurrence.date().isoformat()}
+            instance['end'] = {'date': (occurrence + duration).date().isoformat()}
+        else:
+            instance['start'] = {'dateTime': occurrence.isoformat()}
+            instance['end'] = {'dateTime': (occurrence + duration).isoformat()}
+        yield instance
+
+
+def instance_in_window(instance_id: str, window_start: datetime.datetime, window_end: datetime.datetime) -> Optional[bool]:
+    """Whether a recurring instance ID from expand_recurring starts inside the window.
+
+    None when the ID carries no instance stamp (not a recurring instance).
+    All-day stamps are the UTC date of local midnight, so they are compared
+    against the UTC dates of the window's local midnights.
+    """
+    match = INSTANCE_STAMP.search(instance_id or '')
+    if match is None:
+        return None
+    stamp = match.group(1)
+    try:
+        start = _parse_rrule_time(stamp, datetime.timezone.utc)
+    except ValueError:
+        return None
+    if 'T' not in stamp:
+        return window_start.astimezone(datetime.timezone.utc).date() <= start.date() < window_end.astimezone(datetime.timezone.utc).date()
+    return window_start <= start < window_end
+
+
+def today_window(tz: datetime.tzinfo = None, days: int = 1) -> Tuple[datetime.datetime, datetime.datetime]:
+    """[local midnight today, + `days`) in the player's timezone."""
+    zone = tz or get_timezone()
+    now = datetime.datetime.now(zone)
+    start = datetime.datetime(now.year, now.month, now.day, tzinfo=zone)
+    return start, start + datetime.timedelta(days=days)
+
+
+def expansion_error(event: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+    """Error record yielded by expand_events in place of an unexpandable event."""
+    return {"type": "expansion_error", "source_id": event.get('id') or None, "error": str(error)}
+
+
+def is_expansion_error(item: Any) -> bool:
+    return isinstance(item, dict) and item.get('type') == 'expansion_error'
+
+
+def expand_events(events: Iterable[Dict[str, Any]], window_start: datetime.datetime = None, window_end: datetime.datetime = None) -> Iterator[Dict[str, Any]]:
+    """Lazily expand recurring events in a stream; others pass through.
+
+    The window defaults to today in the player's timezone and only bounds
+    recurring events. An event whose recurrence can't be expanded is
+    replaced by an expansion_error record (see is_expansion_error), so the
+    caller reports it instead of treating the master event as a quest and
+    the rest of the stream still goes through.
+    """
+    if window_start is None or window_end is None:
+        window_start, window_end = today_window()
+    for event in events:
+        if isinstance(event, dict) and event.get('recurrence'):
+            try:
+                instances = list(expand_recurring(event, window_start, window_end))
+            except Exception as e:
+                instances = [expansion_error(event, e)]
+            yield from instances
+        else:
+            yield event
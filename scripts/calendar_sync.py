@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Incremental calendar sync: only regenerate events that changed.
+
+Keeps a fingerprint (title, description, start/end, updated stamp) per
+calendar `source_id` from the last run and diffs the incoming event list
+against it and the current active quests:
+
+- added: events with no active quest yet
+- changed: events whose fingerprint moved; the quest is regenerated but
+  keeps its existing ID and created_at so downstream caches and message
+  edits still apply
+- cancelled: active quests whose event is marked cancelled, or (on a full
+  sync) no longer appears in the feed; recurring instances from days
+  outside the expansion window are left alone
+
+Unchanged events cost one digest and produce no output. Events without an
+`id` can't be tracked between runs and are always reported as added. An
+event that fails to process is listed under `errors` and keeps its old
+sync state, so the rest of the feed still syncs.
+
+The sync state only remembers events that may still matter: entries with
+no active quest are dropped once the event is missing from a full sync or
+has ended, so finished events and past recurring instances don't pile up.
+
+Usage:
+    python3 scripts/calendar_sync.py [--partial] [--store] [--dry-run] [events.json] < events.json
+
+Recurring events are expanded to today's instances first (see
+calendar_dates.py). Active quests come from data/quest_log.json (or the SQLite store with
+--store, which also applies the diff). --partial means the feed is only a
+window of the calendar, so missing events are not treated as cancelled.
+"""
+
+import datetime
+import json
+import os
+import sys
+from typing import Dict, Any, List, Iterable, Optional, Tuple
+
+from generate_quests import generate_quest_from_event, iter_events
+from calendar_dates import expand_events, instance_in_window, is_expansion_error, parse_event_time, today_window
+from stable_hash import content_digest
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+QUEST_LOG_PATH = os.path.join(DATA_DIR, 'quest_log.json')
+SYNC_STATE_PATH = os.environ.get('QUESTBOARD_SYNC_STATE', os.path.join(DATA_DIR, 'sync_state.json'))
+
+
+def event_fingerprint(event: Dict[str, Any]) -> str:
+    """Digest of the event fields that affect the generated quest."""
+    return content_digest({
+        "title": event.get('title', event.get('summary')),
+        "description": event.get('description', ''),
+        "start": event.get('start', {}),
+        "end": event.get('end', {}),
+        "updated": event.get('updated')
+    })
+
+
+def event_end(event: Dict[str, Any]) -> Optional[str]:
+    """When the event ends (or starts, without an end), as UTC ISO; None if unknown."""
+    for field in ('end', 'start'):
+        try:
+            when, _ = parse_event_time(event.get(field) or {})
+        except (TypeError, ValueError, AttributeError):
+            continue
+        if when is not None:
+            return when.astimezone(datetime.timezone.utc).isoformat()
+    return None
+
+
+def _fingerprint_of(entry: Any) -> Optional[str]:
+    # Older state files stored the bare fingerprint
+    return entry.get('fingerprint') if isinstance(entry, dict) else entry
+
+
+def load_sync_state(path: str = SYNC_STATE_PATH) -> Dict[str, Any]:
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_sync_state(state: Dict[str, Any], path: str = SYNC_STATE_PATH):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def sync_events(events: Iterable[Dict[str, Any]], active_quests: List[Dict[str, Any]], sync_state: Dict[str, Any],
+                full_sync: bool = True, now: datetime.datetime = None,
+                window: Tuple[datetime.datetime, datetime.datetime] = None) -> Dict[str, Any]:
+    """Diff events against the last sync and the active quests.
+
+    `window` is the range recurring events were expanded over (default
+    today, as expand_events does); a full sync only cancels recurring
+    instances that start inside it, since the feed can't contain the rest.
+
+    Returns {"added", "changed", "cancelled", "unchanged", "errors",
+    "sync_state"}; the caller persists the new sync_state.
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    window_start, window_end = window or today_window()
+    active_by_source = {quest['source_id']: quest for quest in active_quests if quest.get('source_id')}
+    new_state = dict(sync_state)
+    seen = set()
+    added, changed, cancelled, errors = [], [], [], []
+    unchanged = 0
+
+    unexpanded = set()
+    for event in events:
+        if is_expansion_error(event):
+            # Its instances are missing from the feed, not cancelled
+            errors.append({"source_id": event['source_id'], "error": event['error']})
+            if event['source_id']:
+                unexpanded.add(f"{event['source_id']}_")
+            continue
+        source_id = event.get('id', '') if isinstance(event, dict) else ''
+        try:
+            if not source_id:
+                added.append(generate_quest_from_event(event))
+                continue
+
+            seen.add(source_id)
+            existing = active_by_source.get(source_id)
+
+            if event.get('status') == 'cancelled':
+                if existing is not None:
+                    cancelled.append(existing)
+                new_state.pop(source_id, None)
+                continue
+
+            fingerprint = event_fingerprint(event)
+            previous = _fingerprint_of(sync_state.get(source_id))
+
+            if existing is None:
+                if previous is None:
+                    added.append(generate_quest_from_event(event))
+                # Otherwise the quest was already completed; don't resurrect it
+            elif previous is None or previous == fingerprint:
+                # Unchanged, or first sync after adopting existing quests
+                unchanged += 1
+            else:
+                quest = generate_quest_from_event(event)
+                quest['id'] = existing['id']
+                quest['created_at'] = existing['created_at']
+                changed.append(quest)
+            new_state[source_id] = {"fingerprint": fingerprint, "ends": event_end(event)}
+        except Exception as e:
+            errors.append({"source_id": source_id or None, "error": str(e)})
+
+    if full_sync:
+        for source_id, quest in active_by_source.items():
+            if source_id in seen or source_id.startswith(tuple(unexpanded)):
+                continue
+            if instance_in_window(source_id, window_start, window_end) is False:
+                # A recurring instance from another day; the expanded feed never has it
+                continue
+            cancelled.append(quest)
+            new_state.pop(source_id, None)
+
+    # Forget events nothing refers to any more: gone from a full feed, or over
+    cutoff = now.astimezone(datetime.timezone.utc).isoformat()
+    for source_id, entry in list(new_state.items()):
+        if source_id in seen or source_id in active_by_source or source_id.startswith(tuple(unexpanded)):
+            continue
+        ends = entry.get('ends') if isinstance(entry, dict) else None
+        if full_sync or (ends is not None and ends < cutoff):
+            del new_state[source_id]
+
+    return {
+        "added": added,
+        "changed": changed,
+        "cancelled": cancelled,
+        "unchanged": unchanged,
+        "errors": errors,
+        "sync_state": new_state
+    }
+
+
+def main():
+    """Main function to sync calendar events into quests incrementally."""
+    try:
+        args = sys.argv[1:]
+        flags = {arg for arg in args if arg.startswith('--')}
+        args = [arg for arg in args if not arg.startswith('--')]
+
+        if args:
+            f = open(args[0], 'r')
+        else:
+            f = sys.stdin
+
+        store = None
+        if '--store' in flags:
+            from quest_store import QuestStore
+            store = QuestStore()
+            active_quests = store.active_quests()
+        else:
+            try:
+                with open(QUEST_LOG_PATH, 'r') as log_file:
+                    active_quests = json.load(log_file).get('active_quests', [])
+            except (OSError, ValueError):
+                active_quests = []
+
+        try:
+            diff = sync_events(expand_events(iter_events(f)), active_quests, load_sync_state(), full_sync='--partial' not in flags)
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+        sync_state = diff.pop('sync_state')
+        if '--dry-run' not in flags:
+            save_sync_state(sync_state)
+            if store is not None:
+                for quest in diff['cancelled']:
+                    quest['status'] = 'cancelled'
+                store.save_quests(diff['added'] + diff['changed'] + diff['cancelled'])
+        if store is not None:
+            store.close()
+
+        print(json.dumps(diff, indent=2))
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
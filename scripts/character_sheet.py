@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""
+Owner of the data/character_sheet.md format: parse, render and patch.
+
+The sheet is laid out so that the Quest History table comes last, right
+after a reserved padding comment:
+
+    # ⚔️ Character Sheet
+    **Level:** 4 ...          <- header fields
+    ## Stats / ## Achievements / ## Session Stats
+    <!--        -->            <- padding
+    ## Quest History
+    | Date | Quest | ...      <- grows at the end of the file
+
+Header, stats, achievements and session-stat updates rewrite only the
+bytes in front of the history, using the padding as slack so the history's
+offset never moves; completed quests are appended to the end of the file.
+Only when the padding runs out (or on the first write to a sheet in the
+old layout) is the whole file rewritten, with fresh padding.
+
+Updates read only the bytes in front of the history, so their cost does
+not grow with the Quest History. A head patch is first written whole to
+a sidecar (<sheet>.head) and replayed from there if a crash interrupts
+the in-place write, so a torn head is repaired on the next access.
+
+Parsed sheets are cached per path, keyed by the file's mtime and size, so
+reading the sheet back after our own writes never reparses the history.
+
+Usage:
+    python3 scripts/character_sheet.py show [path]
+    python3 scripts/character_sheet.py apply [path] < resolve_quest_output.json
+"""
+
+import json
+import os
+import re
+import sys
+from typing import Dict, Any, List, Optional, Tuple
+
+CHARACTER_SHEET_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'character_sheet.md'
+)
+
+PADDING_BYTES = 1024
+HEAD_READ_BYTES = 8192
+PADDING_OPEN = '<!--'
+PADDING_CLOSE = '-->\n\n'
+
+HISTORY_HEADING = 'Quest History'
+HISTORY_COLUMNS = ('Date', 'Quest', 'Difficulty', 'XP', 'Category')
+HISTORY_HEADER = (
+    "| Date | Quest | Difficulty | XP | Category |\n"
+    "|------|-------|-----------|-----|----------|\n"
+)
+HISTORY_PLACEHOLDER = "| —    | —     | —         | —   | —        |\n"
+STATS_HEADER = (
+    "| Stat | Value | Source |\n"
+    "|------|-------|--------|\n"
+)
+
+FIELD_PATTERN = re.compile(r'^\*\*(.+?):\*\*\s?(.*?)\s*$')
+CELL_SPLIT = re.compile(r'(?<!\\)\|')
+
+# path -> (stamp, sheet, history offset, history has rows, history parsed)
+_cache: Dict[str, Tuple[Optional[Tuple[int, int]], Dict[str, Any], Optional[int], bool, bool]] = {}
+
+
+def empty_sheet() -> Dict[str, Any]:
+    """A level 1 sheet matching the shipped template."""
+    return {
+        'title': '⚔️ Character Sheet',
+        'fields': {
+            'Name': 'Adventurer',
+            'Class': 'Unclassed (assigned at Level 3)',
+            'Level': '1',
+            'XP': '0 / 100',
+            'Title': 'Novice Questgiver'
+        },
+        'stats': {stat: {'value': 10, 'source': source} for stat, source in (
+            ('STR', 'Exercise'), ('DEX', 'Quick tasks'), ('CON', 'Long tasks'),
+            ('INT', 'Coding'), ('WIS', 'Research'), ('CHA', 'Social')
+        )},
+        'achievements': ['🏅 *First Steps* — Complete your first quest'],
+        'session': {
+            'Total Quests Completed': '0',
+            'Current Streak': '0 days',
+            'Favorite Category': 'N/A'
+        },
+        'sections': [],
+        'history': []
+    }
+
+
+# Parsing
+
+def _cells(line: str) -> List[str]:
+    cells = CELL_SPLIT.split(line.strip())
+    return [cell.strip().replace('\\|', '|') for cell in cells[1:-1]]
+
+
+def _escape_cell(value: Any) -> str:
+    return str(value).replace('|', '\\|').replace('\n', ' ')
+
+
+def _table_rows(lines: List[str]) -> List[List[str]]:
+    """Data rows of a markdown table (header and separator skipped)."""
+    rows = [line for line in lines if line.lstrip().startswith('|')]
+    return [_cells(line) for line in rows[2:]]
+
+
+def parse_history_row(line: str) -> Optional[Dict[str, Any]]:
+    cells = _cells(line)
+    if len(cells) < len(HISTORY_COLUMNS) or all(cell in ('—', '') for cell in cells):
+        return None
+    row = dict(zip(('date', 'quest', 'difficulty', 'xp', 'category'), cells))
+    try:
+        row['xp'] = int(row['xp'])
+    except ValueError:
+        pass
+    return row
+
+
+def parse_sheet(text: str) -> Dict[str, Any]:
+    """Parse sheet markdown into a dict (see empty_sheet for the shape)."""
+    sheet = {
+        'title': '', 'fields': {}, 'stats': {}, 'achievements': [],
+        'session': {}, 'sections': [], 'history': []
+    }
+    heading = None
+    body: List[str] = []
+
+    def flush():
+        if heading is None:
+            for line in body:
+                if line.startswith('# '):
+                    sheet['title'] = line[2:].strip()
+                    continue
+                match = FIELD_PATTERN.match(line)
+                if match:
+                    sheet['fields'][match.group(1)] = match.group(2)
+        elif heading == 'Stats':
+            for cells in _table_rows(body):
+                if len(cells) >= 2:
+                    try:
+                        value = int(cells[1])
+                    except ValueError:
+                        value = cells[1]
+                    sheet['stats'][cells[0]] = {'value': value, 'source': cells[2] if len(cells) > 2 else ''}
+        elif heading == HISTORY_HEADING:
+            rows = [line for line in body if line.lstrip().startswith('|')][2:]
+            sheet['history'] = [row for row in map(parse_history_row, rows) if row is not None]
+        elif heading == 'Achievements':
+            sheet['achievements'] = [line[2:].strip() for line in body if line.startswith('- ')]
+        elif heading == 'Session Stats':
+            for line in body:
+                if line.startswith('- ') and ':' in line:
+                    label, value = line[2:].split(':', 1)
+                    sheet['session'][label.strip()] = value.strip()
+        else:
+            content = [line for line in body if not line.startswith(PADDING_OPEN)]
+            while content and not content[-1].strip():
+                content.pop()
+            sheet['sections'].append({'heading': heading, 'lines': content})
+
+    for line in text.splitlines():
+        if line.startswith('## '):
+            flush()
+            heading = line[3:].strip()
+            body = []
+        else:
+            body.append(line)
+    flush()
+    return sheet
+
+
+def history_offset(data: bytes) -> Optional[int]:
+    """Byte offset of the history heading if the file has the padded layout.
+
+    The padded layout has the padding comment directly in front of the
+    Quest History heading, and Quest History as the last section.
+    """
+    marker = (PADDING_CLOSE + '## ' + HISTORY_HEADING + '\n').encode()
+    index = data.rfind(marker)
+    if index < 0 or b'\n## ' in data[index + len(marker):]:
+        return None
+    line_start = data.rfind(b'\n', 0, index) + 1
+    if not data.startswith(PADDING_OPEN.encode(), line_start):
+        return None
+    return index + len(PADDING_CLOSE)
+
+
+# Rendering
+
+def render_head(sheet: Dict[str, Any]) -> str:
+    """Everything in front of the padding: header, stats and other sections."""
+    parts = [f"# {sheet.get('title') or '⚔️ Character Sheet'}\n\n"]
+    parts += [f"**{label}:** {value}  \n" for label, value in sheet['fields'].items()]
+    parts.append("\n## Stats\n" + STATS_HEADER)
+    parts += [f"| {stat:<4} | {str(entry['value']):<5} | {entry['source']} |\n" for stat, entry in sheet['stats'].items()]
+    parts.append("\n## Achievements\n")
+    parts += [f"- {achievement}\n" for achievement in sheet['achievements']]
+    parts.append("\n## Session Stats\n")
+    parts += [f"- {label}: {value}\n" for label, value in sheet['session'].items()]
+    for section in sheet.get('sections', []):
+        parts.append(f"\n## {section['heading']}\n")
+        parts += [line + "\n" for line in section['lines']]
+    parts.append("\n")
+    return ''.join(parts)
+
+
+def render_history_row(row: Dict[str, Any]) -> str:
+    return "| " + " | ".join(_escape_cell(row.get(key, '')) for key in ('date', 'quest', 'difficulty', 'xp', 'category')) + " |\n"
+
+
+def _padding(size: int) -> str:
+    return PADDING_OPEN + ' ' * (size - len(PADDING_OPEN) - len(PADDING_CLOSE)) + PADDING_CLOSE
+
+
+def render_sheet(sheet: Dict[str, Any], padding: int = PADDING_BYTES) -> str:
+    """Full sheet in the padded layout."""
+    history = ''.join(map(render_history_row, sheet['history'])) or HISTORY_PLACEHOLDER
+    return render_head(sheet) + _padding(padding) + f"## {HISTORY_HEADING}\n" + HISTORY_HEADER + history
+
+
+# Bridging to the scripts
+
+def _int_prefix(value: str, default: int) -> int:
+    match = re.match(r'\s*(\d+)', value or '')
+    return int(match.group(1)) if match else default
+
+
+def character_from_sheet(sheet: Dict[str, Any]) -> Dict[str, Any]:
+    """The character_sheet input resolve_quest.py and boss_fight.py expect.
+
+    Stat values on the sheet already include category bonuses, so they are
+    not passed on as base stats (resolve_quest.py would add them twice).
+    """
+    fields = sheet['fields']
+    character_class = (fields.get('Class') or 'Unclassed').split(' (')[0].strip()
+    return {
+        'name': fields.get('Name', 'Adventurer'),
+        'class': character_class,
+        'level': _int_prefix(fields.get('Level'), 1),
+        'xp': _int_prefix(fields.get('XP'), 0),
+        'title': fields.get('Title', '')
+    }
+
+
+def apply_resolution(sheet: Dict[str, Any], result: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Fold a resolve_quest.py result into the sheet.
+
+    Accepts a single result or a batch result. Updates the header, stats
+    and session stats in place and returns (sheet, new history rows); the
+    rows are not added to sheet['history'] so the caller can append them.
+    """
+    results = result.get('results', [result])
+    final = results[-1]
+    aggregates = result.get('aggregates') or final.get('aggregates') or {}
+
+    fields = sheet['fields']
+    character_class = final.get('class', 'Unclassed')
+    fields['Class'] = 'Unclassed (assigned at Level 3)' if character_class == 'Unclassed' else character_class
+    fields['Level'] = str(final['new_level'])
+    fields['XP'] = f"{final['new_total_xp']} / {final['new_total_xp'] + final.get('xp_to_next_level', 0)}"
+    if final.get('title'):
+        fields['Title'] = final['title']
+    for stat, value in final.get('updated_stats', {}).items():
+        entry = sheet['stats'].setdefault(stat, {'value': value, 'source': ''})
+        entry['value'] = value
+
+    total = aggregates.get('total_completed', final.get('total_quests_completed'))
+    if total is not None:
+        sheet['session']['Total Quests Completed'] = str(total)
+    counts = aggregates.get('category_counts') or {}
+    if counts:
+        sheet['session']['Favorite Category'] = max(counts, key=counts.get).title()
+
+    # Present when resolve_quest.py ran with --achievements
+    achievements = result.get('achievements')
+    if achievements:
+        sheet['session']['Current Streak'] = f"{achievements['streak']} day{'s' if achievements['streak'] != 1 else ''}"
+        if achievements.get('all_unlocked'):
+            sheet['achievements'] = [
+                f"{entry['emoji']} *{entry['name']}* — {entry['description']}" for entry in achievements['all_unlocked']
+            ]
+
+    rows = []
+    for item in results:
+        quest = item.get('quest_completed', {})
+        rows.append({
+            'date': (quest.get('completed_at') or '')[:10],
+            'quest': quest.get('name', 'Unknown Quest'),
+            'difficulty': str(quest.get('difficulty', '—')).title(),
+            'xp': item.get('xp_gained', quest.get('xp_reward', 0)),
+            'category': str(quest.get('category', 'misc')).title()
+        })
+    return sheet, rows
+
+
+class CharacterSheetFile:
+    """A character sheet on disk with patch-in-place updates."""
+
+    def __init__(self, path: str = CHARACTER_SHEET_PATH):
+        self.path = os.path.abspath(path)
+
+    def _stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            info = os.stat(self.path)
+        except OSError:
+            return None
+        return (info.st_mtime_ns, info.st_size)
+
+    @property
+    def _sidecar(self) -> str:
+        return self.path + '.head'
+
+    def _recover(self):
+        """Finish a head patch that a crash interrupted."""
+        try:
+            with open(self._sidecar, 'r', encoding='utf-8') as f:
+                pending = json.load(f)
+        except FileNotFoundError:
+            return
+        except ValueError:
+            pending = None
+        if pending is not None:
+            fd = os.open(self.path, os.O_WRONLY)
+            try:
+                os.pwrite(fd, pending['head'].encode('utf-8'), 0)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        os.unlink(self._sidecar)
+
+    def _entry(self, full: bool = True) -> Tuple[Dict[str, Any], Optional[int], bool]:
+        """(sheet, history offset, history has rows), reparsed only if the file changed.
+
+        With full=False only the head is read when the file has the padded
+        layout, and the returned sheet's history is left empty.
+        """
+        self._recover()
+        stamp = self._stamp()
+        cached = _cache.get(self.path)
+        if cached is not None and cached[0] == stamp and (cached[4] or not full):
+            return cached[1], cached[2], cached[3]
+        if stamp is None:
+            sheet, offset, has_rows, parsed = empty_sheet(), None, False, True
+        elif full:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            sheet, offset, parsed = parse_sheet(data.decode('utf-8')), history_offset(data), True
+            has_rows = bool(sheet['history'])
+        else:
+            sheet, offset, has_rows, parsed = self._read_head(stamp[1])
+        _cache[self.path] = (stamp, sheet, offset, has_rows, parsed)
+        return sheet, offset, has_rows
+
+    def _read_head(self, size: int) -> Tuple[Dict[str, Any], Optional[int], bool, bool]:
+        """Parse just the bytes in front of the history, growing the read until found."""
+        with open(self.path, 'rb') as f:
+            data, chunk, offset = b'', HEAD_READ_BYTES, None
+            while True:
+                block = f.read(chunk)
+                data += block
+                offset = history_offset(data)
+                if offset is not None or not block:
+                    break
+                chunk *= 2
+            if offset is None:
+                # Old layout: all of it has been read anyway
+                sheet = parse_sheet(data.decode('utf-8'))
+                return sheet, None, bool(sheet['history']), True
+            # Anything longer than the empty table has rows; otherwise check
+            empty = (f"## {HISTORY_HEADING}\n" + HISTORY_HEADER + HISTORY_PLACEHOLDER).encode('utf-8')
+            if size - offset > len(empty):
+                has_rows = True
+            else:
+                f.seek(offset)
+                lines = f.read().decode('utf-8').splitlines()[3:]
+                has_rows = any(parse_history_row(line) for line in lines)
+        return parse_sheet(data[:offset].decode('utf-8')), offset, has_rows, False
+
+    def _remember(self, sheet: Dict[str, Any], offset: Optional[int], has_rows: bool, parsed: bool = True):
+        _cache[self.path] = (self._stamp(), sheet, offset, has_rows, parsed)
+
+    def load(self) -> Dict[str, Any]:
+        """The parsed sheet. Treat it as read-only; use the update methods."""
+        return self._entry()[0]
+
+    def _full_sheet(self, head: Dict[str, Any]) -> Dict[str, Any]:
+        """`head` with the history read back in, for a whole-file rewrite."""
+        history = self._entry()[0]['history']
+        return dict(head, history=list(history))
+
+    def rewrite(self, sheet: Dict[str, Any] = None):
+        """Write the whole sheet atomically in the padded layout."""
+        sheet = sheet if sheet is not None else self.load()
+        head = render_head(sheet).encode('utf-8')
+        content = render_sheet(sheet).encode('utf-8')
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._remember(sheet, len(head) + PADDING_BYTES, bool(sheet['history']))
+
+    def _patch_head(self, sheet: Dict[str, Any], offset: Optional[int], has_rows: bool) -> Dict[str, Any]:
+        """Rewrite the bytes in front of the history, or everything if needed.
+
+        Returns the sheet as written (with its history read back in if the
+        whole file had to be rewritten).
+        """
+        head = render_head(sheet)
+        if offset is None or len(head.encode('utf-8')) + len(PADDING_OPEN) + len(PADDING_CLOSE) > offset:
+            sheet = self._full_sheet(sheet)
+            self.rewrite(sheet)
+            return sheet
+        block = head + _padding(offset - len(head.encode('utf-8')))
+        # Journal the block first so a crash mid-pwrite is repaired by _recover
+        tmp_path = self._sidecar + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'head': block}, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._sidecar)
+        fd = os.open(self.path, os.O_WRONLY)
+        try:
+            os.pwrite(fd, block.encode('utf-8'), 0)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.unlink(self._sidecar)
+        self._remember(sheet, offset, has_rows, _cache[self.path][4])
+        return sheet
+
+    def update(self, fields: Dict[str, Any] = None, stats: Dict[str, int] = None,
+               session: Dict[str, Any] = None, achievements: List[str] = None) -> Dict[str, Any]:
+        """Patch header fields, stat values, session stats or achievements."""
+        sheet, offset, has_rows = self._entry(full=False)
+        for label, value in (fields or {}).items():
+            sheet['fields'][label] = str(value)
+        for stat, value in (stats or {}).items():
+            sheet['stats'].setdefault(stat, {'value': value, 'source': ''})['value'] = value
+        for label, value in (session or {}).items():
+            sheet['session'][label] = str(value)
+        if achievements is not None:
+            sheet['achievements'] = list(achievements)
+        return self._patch_head(sheet, offset, has_rows)
+
+    def append_history(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Append Quest History rows at the end of the file."""
+        sheet, offset, has_rows = self._entry(full=False)
+        return self._append(sheet, offset, has_rows, rows)
+
+    def _append(self, sheet: Dict[str, Any], offset: Optional[int], has_rows: bool,
+                rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        parsed = _cache[self.path][4]
+        if offset is None or not has_rows:
+            # Old layout, or the placeholder row still has to go
+            sheet = self._full_sheet(sheet)
+            sheet['history'].extend(rows)
+            self.rewrite(sheet)
+            return sheet
+        with open(self.path, 'ab') as f:
+            f.write(''.join(map(render_history_row, rows)).encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        if parsed:
+            sheet['history'].extend(rows)
+        self._remember(sheet, offset, True, parsed)
+        return sheet
+
+    def record_resolution(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply a resolve_quest.py result: patch the head, append history.
+
+        Only the head is read, so the returned sheet's history is complete
+        only if the sheet was already loaded whole.
+        """
+        sheet, offset, has_rows = self._entry(full=False)
+        sheet, rows = apply_resolution(sheet, result)
+        if offset is not None and has_rows:
+            sheet = self._patch_head(sheet, offset, has_rows)
+            return self._append(sheet, offset, has_rows, rows)
+        sheet = self._full_sheet(sheet)
+        sheet['history'].extend(rows)
+        self.rewrite(sheet)
+        return sheet
+
+
+def main():
+    """Main function to show or update the character sheet."""
+    try:
+        args = sys.argv[1:]
+        command = args[0] if args else 'show'
+        sheet_file = CharacterSheetFile(args[1] if len(args) > 1 else CHARACTER_SHEET_PATH)
+
+        if command == 'show':
+            sheet = sheet_file.load()
+            output = dict(
+                character_from_sheet(sheet),
+                stats={stat: entry['value'] for stat, entry in sheet['stats'].items()},
+                history_rows=len(sheet['history'])
+            )
+        elif command == 'apply':
+            sheet = sheet_file.record_resolution(json.load(sys.stdin))
+            output = character_from_sheet(sheet)
+        else:
+            raise ValueError(f"Unknown command: {command}")
+
+        print(json.dumps(output, indent=2, ensure_ascii=False))
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
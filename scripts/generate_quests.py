@@ -3,40 +3,158 @@
 Generate RPG quests from calendar events and tasks.
 Accepts JSON input via stdin or as file argument.
 Outputs JSON array of quest objects.
+
+With --stream, events are read incrementally (NDJSON, a bare JSON array or
+the Google Calendar {"items": [...]} envelope) and each quest is written as
+one NDJSON line as soon as it is generated, so memory stays flat.
+
+With --store, generated quests are also saved to the SQLite quest store
+(see quest_store.py). With --journal, they are appended to the quest
+journal (see quest_journal.py).
+
+Recurring events (RRULE) are expanded lazily into instances that fall
+today in the configured timezone; --days N widens the window to N days.
+All-day events are supported (see calendar_dates.py).
+
+With --cache, quests for events seen before (same content, same keyword
+table and templates) are served from the content-addressed cache (see
+quest_cache.py); only the ID and creation time are minted fresh.
+
+With --workers N, events are split into chunks and generated across a pool
+of N processes. Output order matches input order and throughput is
+reported on stderr.
+
+With --profile (or QUESTBOARD_PROFILE), per-stage timings are reported on
+exit (see instrumentation.py).
 """
 
 import json
+import os
 import sys
 import datetime
 import re
-from typing import List, Dict, Any
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterator, IO, Optional, Set, Tuple
+
+from narration_templates import registry
+from stable_hash import stable_hash, content_digest
+from quest_cache import ContentCache
+from instrumentation import timed, span, incr, strip_profile_args
+from calendar_dates import (
+    DEFAULT_DURATION_MINUTES, parse_datetime, parse_event_time, event_duration_minutes, expand_events, is_expansion_error,
+    today_window
+)
+
+CATEGORY_KEYWORDS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'category_keywords.json'
+)
+
+# Used when data/category_keywords.json is missing or unreadable
+DEFAULT_CATEGORY_KEYWORDS = {
+    'coding': ['code', 'programming', 'development', 'debug', 'refactor', 'commit', 'pull request', 'merge', 'review'],
+    'meeting': ['meeting', 'call', 'sync', 'standup', 'review', 'discussion', 'interview', 'presentation'],
+    'writing': ['write', 'document', 'email', 'report', 'blog', 'documentation', 'proposal'],
+    'exercise': ['gym', 'workout', 'run', 'exercise', 'fitness', 'yoga', 'sports', 'training'],
+    'research': ['research', 'study', 'learn', 'read', 'investigate', 'analysis', 'explore']
+}
+
+STREAM_CHUNK_SIZE = 64 * 1024
+BULK_CHUNK_SIZE = 500
+
+def load_category_keywords(path: str = CATEGORY_KEYWORDS_PATH) -> Dict[str, List[str]]:
+    """Load the category keyword table; key order is category priority."""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return DEFAULT_CATEGORY_KEYWORDS
+
+WORD_PATTERN = re.compile(r'\w+')
+VOWELS = 'aeiou'
+
+def word_forms(word: str) -> Set[str]:
+    """A keyword plus its plural, -ing and -ed forms.
+
+    Inflection follows the word's own spelling (run -> runs, running;
+    write -> writing; study -> studies, studying) rather than blind
+    suffixes, so 'run' doesn't turn into 'runes'.
+    """
+    forms = {word}
+    if word.endswith(('s', 'x', 'z', 'ch', 'sh')):
+        forms.add(word + 'es')
+    elif len(word) > 1 and word[-1] == 'y' and word[-2] not in VOWELS:
+        forms.update((word[:-1] + 'ies', word[:-1] + 'ied'))
+    else:
+        forms.add(word + 's')
+    if word.endswith('e') and not word.endswith('ee'):
+        stem = word[:-1]
+        forms.add(word + 'd')
+    else:
+        stem = word
+        forms.add(word + 'ed')
+    forms.add(stem + 'ing')
+    # Consonant-vowel-consonant endings may double (run -> running, debug ->
+    # debugging); keep the plain form too for words that don't (refactoring)
+    if (len(word) >= 3 and word[-1] not in VOWELS + 'wxy' and word[-2] in VOWELS
+            and word[-3] not in VOWELS):
+        forms.update((word + word[-1] + 'ing', word + word[-1] + 'ed'))
+    return forms
+
+def compile_category_classifier(keywords: Dict[str, List[str]]) -> Dict[str, List[Tuple[int, Tuple[str, ...]]]]:
+    """Compile the keyword table into a word-level lookup index.
+
+    Every keyword is expanded into its inflected forms (see word_forms; for
+    phrases, the last word is inflected, so 'pull request' also matches
+    'pull requests'). Each form's first word maps to (category priority,
+    remaining words) entries, best priority first. Matching is per whole
+    word, so 'run' no longer fires on 'brunch' or 'rerun', and one dict
+    lookup per word replaces a substring scan per keyword.
+    """
+    index = {}
+    for priority, words in enumerate(keywords.values()):
+        for keyword in words:
+            *head, last = keyword.lower().split()
+            for form in word_forms(last):
+                first, *rest = head + [form]
+                entry = (priority, tuple(rest))
+                if entry not in index.setdefault(first, []):
+                    index[first].append(entry)
+    for entries in index.values():
+        entries.sort()
+    return index
 
+CATEGORY_KEYWORDS = {}
+CATEGORY_NAMES = []
+CATEGORY_INDEX = {}
+
+def set_category_keywords(keywords: Dict[str, List[str]]):
+    """Rebuild the classifier from a keyword table."""
+    global CATEGORY_KEYWORDS, CATEGORY_NAMES, CATEGORY_INDEX
+    CATEGORY_KEYWORDS = keywords
+    CATEGORY_NAMES = list(keywords)
+    CATEGORY_INDEX = compile_category_classifier(keywords)
+
+set_category_keywords(load_category_keywords())
+
+@timed('categorize')
 def categorize_event(title: str, description: str = "") -> str:
     """Categorize calendar event into quest type."""
-    title_lower = title.lower()
-    desc_lower = description.lower()
-    
-    # Keywords for each category
-    coding_keywords = ['code', 'programming', 'development', 'debug', 'refactor', 'commit', 'pull request', 'merge', 'review']
-    meeting_keywords = ['meeting', 'call', 'sync', 'standup', 'review', 'discussion', 'interview', 'presentation']
-    writing_keywords = ['write', 'document', 'email', 'report', 'blog', 'documentation', 'proposal']
-    exercise_keywords = ['gym', 'workout', 'run', 'exercise', 'fitness', 'yoga', 'sports', 'training']
-    research_keywords = ['research', 'study', 'learn', 'read', 'investigate', 'analysis', 'explore']
-    
-    text = f"{title_lower} {desc_lower}"
-    
-    if any(keyword in text for keyword in coding_keywords):
-        return 'coding'
-    elif any(keyword in text for keyword in meeting_keywords):
-        return 'meeting'
-    elif any(keyword in text for keyword in writing_keywords):
-        return 'writing'
-    elif any(keyword in text for keyword in exercise_keywords):
-        return 'exercise'
-    elif any(keyword in text for keyword in research_keywords):
-        return 'research'
-    else:
-        return 'misc'
+    words = WORD_PATTERN.findall(f"{title} {description}".lower())
+    best = len(CATEGORY_NAMES)
+    for position, word in enumerate(words):
+        entries = CATEGORY_INDEX.get(word)
+        if not entries:
+            continue
+        for priority, rest in entries:
+            if priority >= best:
+                break
+            if not rest or tuple(words[position + 1:position + 1 + len(rest)]) == rest:
+                best = priority
+                break
+        if best == 0:
+            break
+    return CATEGORY_NAMES[best] if best < len(CATEGORY_NAMES) else 'misc'
 
 def determine_difficulty(duration_minutes: int) -> str:
     """Determine quest difficulty based on duration."""
@@ -49,6 +167,7 @@ def determine_difficulty(duration_minutes: int) -> str:
     else:
         return 'boss'
 
+@timed('xp_level')
 def calculate_xp(difficulty: str) -> int:
     """Calculate XP reward based on difficulty."""
     xp_map = {
@@ -59,56 +178,11 @@ def calculate_xp(difficulty: str) -> int:
     }
     return xp_map.get(difficulty, 25)
 
+@timed('naming')
 def generate_quest_name(title: str, category: str, difficulty: str) -> str:
     """Generate RPG-style quest name from event title."""
     title_lower = title.lower()
     
-    # Quest name templates by category
-    quest_templates = {
-        'coding': [
-            "The {task} of Code",
-            "Debugging the {task}",
-            "The {task} Algorithm",
-            "Refactoring the {task}",
-            "The {task} Protocol"
-        ],
-        'meeting': [
-            "The Council of {task}",
-            "The {task} Summit",
-            "Negotiations with {task}",
-            "The {task} Tribunal",
-            "Assembly of the {task}"
-        ],
-        'writing': [
-            "The {task} Scrolls",
-            "Scribing the {task}",
-            "The {task} Manuscript",
-            "Chronicles of {task}",
-            "The {task} Tome"
-        ],
-        'exercise': [
-            "The {task} Trial",
-            "The {task} Gauntlet",
-            "The {task} Challenge",
-            "The {task} Marathon",
-            "The {task} Expedition"
-        ],
-        'research': [
-            "The {task} Investigation",
-            "Uncovering {task}",
-            "The {task} Archive",
-            "The {task} Discovery",
-            "The {task} Enigma"
-        ],
-        'misc': [
-            "The {task} Quest",
-            "The {task} Journey",
-            "The {task} Mission",
-            "The {task} Task",
-            "The {task} Endeavor"
-        ]
-    }
-    
     # Extract key words from title
     words = re.findall(r'\b\w+\b', title)
     if len(words) > 3:
@@ -121,70 +195,74 @@ def generate_quest_name(title: str, category: str, difficulty: str) -> str:
     else:
         task_name = "Unknown"
     
-    templates = quest_templates.get(category, quest_templates['misc'])
-    template = templates[hash(title) % len(templates)]
-    
-    return template.format(task=task_name)
+    template = registry.pick(title, 'quest_names', category, fallback='misc')
+    return template(task=task_name)
 
+@timed('naming')
 def generate_flavor_text(title: str, category: str, difficulty: str) -> str:
     """Generate D&D style flavor text for the quest."""
-    flavor_templates = {
-        'coding': [
-            "The ancient codebase calls for your expertise. Will you answer its digital summons?",
-            "Bugs lurk in the shadows of the repository. Only a brave programmer can cleanse this darkness.",
-            "The compiler demands tribute. Offer your skills and claim your reward."
-        ],
-        'meeting': [
-            "Stakeholders gather in the conference room of destiny. Your presence is requested.",
-            "The council convenes to discuss matters of great importance. Prepare your arguments.",
-            "Voices echo through the halls of commerce. Will your words carry the day?"
-        ],
-        'writing': [
-            "The blank page stares back, challenging you to fill it with wisdom.",
-            "Words wait to be born from your mind. Give them life and purpose.",
-            "The quill is poised, the parchment ready. What tales will you tell?"
-        ],
-        'exercise': [
-            "The body is a temple that must be maintained. Begin your ritual of strength.",
-            "Muscles ache for the challenge of exertion. Answer their call.",
-            "The path of fitness is long, but every step brings you closer to greatness."
-        ],
-        'research': [
-            "Knowledge lies hidden in the archives of the ancients. Seek it out.",
-            "The truth waits to be discovered. Will you be the one to uncover it?",
-            "Books and scrolls hold the secrets of the past. Dive into their depths."
-        ],
-        'misc': [
-            "A task awaits completion. Will you answer the call?",
-            "The path forward is unclear, but your resolve is strong.",
-            "Adventure calls in unexpected ways. Answer with courage."
-        ]
-    }
-    
-    templates = flavor_templates.get(category, flavor_templates['misc'])
-    return templates[hash(title) % len(templates)]
+    return registry.pick(title, 'flavor_text', category, fallback='misc')()
 
+@timed('duration_parse')
 def parse_duration(start_time: str, end_time: str) -> int:
     """Parse ISO datetime strings and return duration in minutes."""
     try:
-        start = datetime.datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-        end = datetime.datetime.fromisoformat(end_time.replace('Z', '+00:00'))
-        duration = end - start
-        return int(duration.total_seconds() / 60)
-    except:
+        start = parse_datetime(start_time)
+        end = parse_datetime(end_time)
+    except (ValueError, TypeError, AttributeError):
         # Default to 30 minutes if parsing fails
-        return 30
+        return DEFAULT_DURATION_MINUTES
+    return int((end - start).total_seconds() / 60)
+
+def generator_fingerprint() -> str:
+    """Digest of everything besides the event that shapes a quest."""
+    return content_digest({"keywords": CATEGORY_KEYWORDS, "templates": registry.fingerprint})
+
+def generate_quest_id(title: str, seq: int = None) -> Dict[str, str]:
+    """Mint a quest ID and creation timestamp."""
+    now = datetime.datetime.now()
+    quest_id = f"quest_{now.strftime('%Y%m%d_%H%M%S')}_{stable_hash(title) % 1000:03d}"
+    if seq is not None:
+        quest_id = f"{quest_id}_{seq}"
+    return {"id": quest_id, "created_at": now.isoformat() + "Z"}
+
+def event_deadline(event: Dict[str, Any]) -> Optional[str]:
+    """When the event ends, as a UTC ISO timestamp (None if unknown)."""
+    try:
+        end, _ = parse_event_time(event.get('end', {}))
+    except (ValueError, TypeError, AttributeError):
+        return None
+    if end is None:
+        return None
+    return end.astimezone(datetime.timezone.utc).isoformat().replace('+00:00', 'Z')
+
+def generate_quest_from_event(event: Dict[str, Any], seq: int = None, cache: ContentCache = None) -> Dict[str, Any]:
+    """Generate a quest object from a calendar event.
+
+    `seq` is the event's position in a bulk run; when given it is appended
+    to the quest ID so IDs minted in the same second never collide.
+
+    With a `cache`, the derived fields are looked up by the digest of the
+    event; only the ID and creation time are minted fresh on a hit.
+    """
+    if cache is not None:
+        key = {"generator": generator_fingerprint(), "event": event}
+        cached = cache.get('quests', key)
+        if cached is None:
+            quest = generate_quest_from_event(event, seq)
+            cache.put('quests', key, quest)
+            return quest
+        fresh = generate_quest_id(cached['original_title'], seq)
+        cached['id'] = fresh['id']
+        cached['created_at'] = fresh['created_at']
+        return cached
 
-def generate_quest_from_event(event: Dict[str, Any]) -> Dict[str, Any]:
-    """Generate a quest object from a calendar event."""
     title = event.get('title', 'Unknown Task')
     description = event.get('description', '')
-    start_time = event.get('start', {}).get('dateTime', '')
-    end_time = event.get('end', {}).get('dateTime', '')
     event_id = event.get('id', '')
     
-    # Calculate duration
-    duration = parse_duration(start_time, end_time)
+    # Calculate duration (all-day and unparseable events get the default)
+    duration = event_duration_minutes(event)
     
     # Determine quest properties
     category = categorize_event(title, description)
@@ -195,11 +273,10 @@ def generate_quest_from_event(event: Dict[str, Any]) -> Dict[str, Any]:
     is_boss = difficulty == 'boss'
     
     # Generate unique ID
-    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-    quest_id = f"quest_{timestamp}_{hash(title) % 1000:03d}"
+    stamp = generate_quest_id(title, seq)
     
     return {
-        "id": quest_id,
+        "id": stamp['id'],
         "name": quest_name,
         "description": flavor_text,
         "difficulty": difficulty,
@@ -208,22 +285,217 @@ def generate_quest_from_event(event: Dict[str, Any]) -> Dict[str, Any]:
         "is_boss": is_boss,
         "source": "google_calendar",
         "source_id": event_id,
-        "created_at": datetime.datetime.now().isoformat() + "Z",
+        "created_at": stamp['created_at'],
         "completed_at": None,
         "status": "active",
         "original_title": title,
-        "duration_minutes": duration
+        "duration_minutes": duration,
+        "deadline": event_deadline(event)
     }
 
+class JsonStreamReader:
+    """Incremental reader for a sequence of JSON values on a text stream."""
+
+    def __init__(self, stream: IO[str], chunk_size: int = STREAM_CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Read another chunk, discarding consumed input. False at EOF."""
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        """Consume a single structural character."""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' but found '{found or 'EOF'}'")
+        self.pos += 1
+
+    def decode(self) -> Any:
+        """Decode one complete JSON value, reading more input as needed."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the very end of the buffer may still be incomplete
+            if end == len(self.buffer) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def iter_array(self) -> Iterator[Any]:
+        """Yield the elements of the array at the cursor one at a time."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.decode()
+            if self.peek() == ',':
+                self.pos += 1
+                continue
+            self.expect(']')
+            return
+
+
+def iter_events(stream: IO[str]) -> Iterator[Dict[str, Any]]:
+    """Yield calendar events from a stream without loading it all at once.
+
+    Accepts any sequence of top-level JSON values (so NDJSON works), where
+    each value is an event, a list of events or an {"items": [...]} envelope.
+    Envelope items are streamed; the other envelope keys are skipped.
+    """
+    reader = JsonStreamReader(stream)
+    while True:
+        first = reader.peek()
+        if not first:
+            return
+        if first == '[':
+            yield from reader.iter_array()
+        elif first == '{':
+            reader.expect('{')
+            fields = {}
+            saw_items = False
+            while reader.peek() != '}':
+                key = reader.decode()
+                reader.expect(':')
+                if key == 'items' and reader.peek() == '[':
+                    saw_items = True
+                    yield from reader.iter_array()
+                else:
+                    fields[key] = reader.decode()
+                if reader.peek() == ',':
+                    reader.pos += 1
+            reader.expect('}')
+            if not saw_items:
+                # Single event
+                yield fields
+        else:
+            raise ValueError(f"Unexpected input starting with '{first}'")
+
+
+def report_expansion_error(record: Dict[str, Any]):
+    print(f"Error expanding recurring event {record['source_id']}: {record['error']}", file=sys.stderr)
+
+
+def generate_quests_stream(events: Iterator[Dict[str, Any]], cache: ContentCache = None) -> Iterator[Dict[str, Any]]:
+    """Yield a quest per event, skipping (and reporting) events that fail."""
+    for event in events:
+        if is_expansion_error(event):
+            report_expansion_error(event)
+            continue
+        try:
+            yield generate_quest_from_event(event, cache=cache)
+        except Exception as e:
+            print(f"Error processing event: {e}", file=sys.stderr)
+            continue
+
+
+def stream_main(args: List[str], cache: ContentCache = None, window: Tuple[datetime.datetime, datetime.datetime] = (None, None)):
+    """Streaming variant of main: events in, NDJSON quests out."""
+    if args:
+        f = open(args[0], 'r')
+    else:
+        f = sys.stdin
+    try:
+        for quest in generate_quests_stream(expand_events(iter_events(f), *window), cache):
+            with span('output_serialize'):
+                line = json.dumps(quest) + "\n"
+            sys.stdout.write(line)
+            sys.stdout.flush()
+            incr('quests_generated')
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def _generate_chunk(start: int, events: List[Dict[str, Any]], cache: ContentCache = None) -> List[Dict[str, Any]]:
+    """Worker entry point: generate one chunk, isolating per-event errors."""
+    quests = []
+    for offset, event in enumerate(events):
+        try:
+            quests.append(generate_quest_from_event(event, seq=start + offset, cache=cache))
+        except Exception as e:
+            print(f"Error processing event: {e}", file=sys.stderr)
+            continue
+    return quests
+
+def generate_quests_bulk(events: List[Dict[str, Any]], workers: int, chunk_size: int = BULK_CHUNK_SIZE, cache: ContentCache = None) -> List[Dict[str, Any]]:
+    """Generate quests for many events across a process pool, preserving order."""
+    starts = list(range(0, len(events), chunk_size))
+    chunks = [events[start:start + chunk_size] for start in starts]
+    quests = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_quests in executor.map(_generate_chunk, starts, chunks, [cache] * len(starts)):
+            quests.extend(chunk_quests)
+    return quests
+
 def main():
     """Main function to process input and generate quests."""
     try:
+        args = strip_profile_args(sys.argv[1:])
+        cache = None
+        if '--cache' in args:
+            args.remove('--cache')
+            cache = ContentCache()
+
+        # Recurring events are expanded over today (or --days N from today)
+        window = today_window()
+        if '--days' in args:
+            index = args.index('--days')
+            window = today_window(days=int(args[index + 1]))
+            del args[index:index + 2]
+
+        if '--stream' in args:
+            args.remove('--stream')
+            stream_main(args, cache, window)
+            return
+
+        use_store = '--store' in args
+        if use_store:
+            args.remove('--store')
+        use_journal = '--journal' in args
+        if use_journal:
+            args.remove('--journal')
+
+        workers = None
+        if '--workers' in args:
+            index = args.index('--workers')
+            workers = int(args[index + 1])
+            del args[index:index + 2]
+
         # Read input from stdin or argument
-        if len(sys.argv) > 1:
-            with open(sys.argv[1], 'r') as f:
-                data = json.load(f)
-        else:
-            data = json.load(sys.stdin)
+        with span('input_parse'):
+            if args:
+                with open(args[0], 'r') as f:
+                    data = json.load(f)
+            else:
+                data = json.load(sys.stdin)
         
         quests = []
         
@@ -237,17 +509,45 @@ def main():
         else:
             # Single event
             events = [data]
+        events = list(expand_events(events, *window))
+        for record in filter(is_expansion_error, events):
+            report_expansion_error(record)
+        events = [event for event in events if not is_expansion_error(event)]
         
-        for event in events:
-            try:
-                quest = generate_quest_from_event(event)
-                quests.append(quest)
-            except Exception as e:
-                print(f"Error processing event: {e}", file=sys.stderr)
-                continue
+        if workers:
+            started = time.perf_counter()
+            quests = generate_quests_bulk(events, workers, cache=cache)
+            elapsed = time.perf_counter() - started
+            rate = len(events) / elapsed if elapsed > 0 else 0.0
+            print(f"Generated {len(quests)} quests from {len(events)} events in {elapsed:.2f}s ({rate:.0f} events/sec)", file=sys.stderr)
+        else:
+            for event in events:
+                try:
+                    quest = generate_quest_from_event(event, cache=cache)
+                    quests.append(quest)
+                except Exception as e:
+                    print(f"Error processing event: {e}", file=sys.stderr)
+                    continue
         
+        if use_store:
+            from quest_store import QuestStore
+            with QuestStore() as store:
+                store.save_quests(quests)
+                for quest in quests:
+                    if quest.get('is_boss'):
+                        store.enqueue_boss(quest['id'])
+                store.set_meta('daily_generated', datetime.datetime.now().isoformat() + "Z")
+        if use_journal:
+            from quest_journal import QuestJournal
+            QuestJournal().record_generated(quests)
+
+        incr('events_processed', len(events))
+        incr('quests_generated', len(quests))
+
         # Output JSON array of quests
-        print(json.dumps(quests, indent=2))
+        with span('output_serialize'):
+            output = json.dumps(quests, indent=2)
+        print(output)
         
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Offline auto-completion detector: match local git history to active quests.
+
+Active quests are indexed once by the tokens of their `original_title`
+(full weight) and `name` (half weight), each weighted by inverse document
+frequency across the active quests. Commits are streamed from `git log`
+and scored against only the quests sharing a token with them, so a scan
+costs O(commit tokens) rather than O(commits x quests). A commit matches a
+quest when it covers at least MATCH_THRESHOLD of the quest's title weight
+with at least MIN_SHARED_TOKENS tokens, and was made no earlier than the
+day the quest was created. Each quest takes its best-scoring commit, and
+all matches are resolved together with resolve_quest_batch.
+
+The last scanned HEAD of each repository, and the quests that were active
+at the time, are remembered in data/git_scan_state.json
+(QUESTBOARD_GIT_STATE to override). Later runs read only commits after
+that HEAD, plus - for quests added since - the older history back to their
+creation day; history older than the oldest active quest is never read at
+all (`git log --since`).
+
+Usage:
+    python3 scripts/git_detector.py [--store] [--dry-run] [--author PATTERN] [repo ...]
+
+Repositories default to `git_repositories` in data/config.json. Output is
+{"matches": [...], "resolution": <resolve_quest_batch result>}. Without
+--store the agent writes the result back as for resolve_quest.py; with
+--store completions are recorded in the quest store. --dry-run reports
+matches without resolving them or advancing the scan state.
+"""
+
+import datetime
+import json
+import math
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, Any, List, Iterator, Optional, Tuple
+
+from calendar_dates import get_timezone, parse_datetime
+from resolve_quest import resolve_quest_batch
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+CONFIG_PATH = os.path.join(DATA_DIR, 'config.json')
+QUEST_LOG_PATH = os.path.join(DATA_DIR, 'quest_log.json')
+SCAN_STATE_PATH = os.environ.get('QUESTBOARD_GIT_STATE', os.path.join(DATA_DIR, 'git_scan_state.json'))
+
+MATCH_THRESHOLD = 0.6
+MIN_SHARED_TOKENS = 2
+NAME_WEIGHT = 0.5
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+STEM_SUFFIXES = ('ing', 'ed', 'es', 's')
+STOPWORDS = frozenset("""
+    a an and are as at be by for from in into is it of on or the to with without via vs
+    this that these those our your my we you i
+    quest task session meeting sync call
+    wip fix fixes fixed update updates updated add adds added change changes changed misc minor
+    chore bump merge merged branch pull request main master
+""".split())
+
+FIELD_SEPARATOR = '\x1f'
+RECORD_SEPARATOR = '\x1e'
+LOG_FORMAT = f"%H{FIELD_SEPARATOR}%ct{FIELD_SEPARATOR}%an{FIELD_SEPARATOR}%s{FIELD_SEPARATOR}%b{RECORD_SEPARATOR}"
+
+
+def stem(token: str) -> str:
+    for suffix in STEM_SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> set:
+    """Normalized content tokens of a title or commit message."""
+    return {stem(token) for token in TOKEN_PATTERN.findall((text or '').lower()) if len(token) > 1 and token not in STOPWORDS}
+
+
+class QuestIndex:
+    """Inverted token index over the active quests."""
+
+    def __init__(self, quests: List[Dict[str, Any]], tz: datetime.tzinfo = None):
+        self.quests = quests
+        self.tz = tz or get_timezone()
+        token_sets = []
+        document_frequency: Dict[str, int] = {}
+        for quest in quests:
+            title_tokens = tokenize(quest.get('original_title') or '')
+            name_tokens = tokenize(quest.get('name') or '') - title_tokens
+            token_sets.append((title_tokens, name_tokens))
+            for token in title_tokens | name_tokens:
+                document_frequency[token] = document_frequency.get(token, 0) + 1
+
+        count = max(len(quests), 1)
+        # token -> [(quest position, weight)]
+        self.postings: Dict[str, List[Tuple[int, float]]] = {}
+        self.title_weight: List[float] = []
+        self.token_count: List[int] = []
+        self.not_before: List[Optional[float]] = []
+        for position, (title_tokens, name_tokens) in enumerate(token_sets):
+            weights = {}
+            for tokens, factor in ((title_tokens, 1.0), (name_tokens, NAME_WEIGHT)):
+                for token in tokens:
+                    weight = weights[token] = factor * math.log(1 + count / document_frequency[token])
+                    self.postings.setdefault(token, []).append((position, weight))
+            # Quests without a usable original title are scored on their name
+            self.title_weight.append(sum(weights[token] for token in title_tokens) or sum(weights.values()))
+            self.token_count.append(len(weights))
+            self.not_before.append(self._day_start(quests[position].get('created_at')))
+
+    def _day_start(self, created_at: Optional[str]) -> Optional[float]:
+        """Epoch seconds of local midnight on the day the quest was created."""
+        if not created_at:
+            return None
+        try:
+            created = parse_datetime(created_at, datetime.timezone.utc).astimezone(self.tz)
+        except ValueError:
+            return None
+        return created.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+    def earliest(self, positions: set = None) -> Optional[float]:
+        """Oldest creation day among `positions` (None if any is unknown)."""
+        stamps = [stamp for position, stamp in enumerate(self.not_before) if positions is None or position in positions]
+        return None if not stamps or None in stamps else min(stamps)
+
+    def score(self, text: str, committed_at: float = None, positions: set = None) -> List[Tuple[int, float, int]]:
+        """(quest position, score, shared tokens) for quests the text matches."""
+        matched: Dict[int, List[float]] = {}
+        for token in tokenize(text):
+            for position, weight in self.postings.get(token, ()):
+                if positions is not None and position not in positions:
+                    continue
+                entry = matched.get(position)
+                if entry is None:
+                    matched[position] = [weight, 1]
+                else:
+                    entry[0] += weight
+                    entry[1] += 1
+
+        results = []
+        for position, (weight, shared) in matched.items():
+            total = self.title_weight[position]
+            if not total:
+                continue
+            not_before = self.not_before[position]
+            if committed_at is not None and not_before is not None and committed_at < not_before:
+                continue
+            score = min(weight / total, 1.0)
+            if score >= MATCH_THRESHOLD and shared >= min(MIN_SHARED_TOKENS, self.token_count[position]):
+                results.append((position, score, shared))
+        return results
+
+
+def iter_commits(repo: str, revision: str, since_time: float = None, author: str = None) -> Iterator[Dict[str, Any]]:
+    """Stream commits (newest first) from `git log` without buffering them all."""
+    command = ['git', '-C', repo, 'log', '--no-merges', f'--format={LOG_FORMAT}']
+    if since_time is not None:
+        command.append(f'--since={int(since_time)}')
+    if author:
+        command.append(f'--author={author}')
+    command.append(revision)
+
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, errors='replace')
+    buffer = ''
+    try:
+        while True:
+            chunk = process.stdout.read(64 * 1024)
+            if not chunk:
+                break
+            buffer += chunk
+            *records, buffer = buffer.split(RECORD_SEPARATOR)
+            for record in records:
+                fields = record.lstrip('\n').split(FIELD_SEPARATOR)
+                if len(fields) < 5:
+                    continue
+                yield {
+                    'sha': fields[0],
+                    'committed_at': int(fields[1]),
+                    'author': fields[2],
+                    'subject': fields[3],
+                    'body': fields[4].strip()
+                }
+    finally:
+        process.stdout.close()
+        process.wait()
+
+
+def _git(repo: str, *args: str) -> Optional[str]:
+    try:
+        completed = subprocess.run(['git', '-C', repo, *args], capture_output=True, text=True)
+    except OSError:
+        return None
+    return completed.stdout.strip() if completed.returncode == 0 else None
+
+
+def scan_repository(repo: str, index: QuestIndex, last_head: str = None, new_positions: set = None, author: str = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Score unscanned commits in one repo; returns (candidates, new HEAD).
+
+    Commits after `last_head` are scored against every quest. Quests that
+    appeared since the last scan (`new_positions`) are also scored against
+    the already-scanned history, back to the day they were created.
+    """
+    head = _git(repo, 'rev-parse', '--verify', '-q', 'HEAD')
+    if head is None:
+        return [], last_head
+    if last_head and _git(repo, 'merge-base', '--is-ancestor', last_head, head) is None:
+        # History was rewritten; rescan (still bounded by --since)
+        last_head = None
+
+    passes = []
+    if last_head is None:
+        passes.append((head, None))
+    else:
+        if last_head != head:
+            passes.append((f'{last_head}..{head}', None))
+        if new_positions:
+            passes.append((last_head, new_positions))
+
+    candidates = []
+    for revision, positions in passes:
+        for commit in iter_commits(repo, revision, index.earliest(positions), author):
+            text = f"{commit['subject']}\n{commit['body']}"
+            for position, score, shared in index.score(text, commit['committed_at'], positions):
+                candidates.append({
+                    'position': position,
+                    'score': score,
+                    'shared_tokens': shared,
+                    'repo': repo,
+                    'commit': commit['sha'],
+                    'subject': commit['subject'],
+                    'committed_at': commit['committed_at']
+                })
+    return candidates, head
+
+
+def detect_completions(repos: List[str], quests: List[Dict[str, Any]], scan_state: Dict[str, Any], author: str = None) -> Tuple[List[Tuple[Dict[str, Any], Dict[str, Any]]], Dict[str, Any]]:
+    """Best commit per quest across all repos, plus the updated scan state.
+
+    Returns [(quest, match)] ordered by commit time, and the scan state to
+    save once the matches have been resolved.
+    """
+    index = QuestIndex(quests)
+    seen_ids = set(scan_state.get('quest_ids', []))
+    new_positions = {position for position, quest in enumerate(quests) if quest.get('id') not in seen_ids}
+    heads = dict(scan_state.get('repos', {}))
+    best: Dict[int, Dict[str, Any]] = {}
+    for repo in repos:
+        repo = os.path.abspath(os.path.expanduser(repo))
+        candidates, head = scan_repository(repo, index, heads.get(repo), new_positions, author)
+        if head:
+            heads[repo] = head
+        for candidate in candidates:
+            current = best.get(candidate['position'])
+            if current is None or (candidate['score'], candidate['committed_at']) > (current['score'], current['committed_at']):
+                best[candidate['position']] = candidate
+
+    matches = []
+    for match in sorted(best.values(), key=lambda match: match['committed_at']):
+        quest = quests[match.pop('position')]
+        match.update({'quest_id': quest.get('id'), 'quest_name': quest.get('name'), 'score': round(match['score'], 3)})
+        matches.append((quest, match))
+    new_state = {'repos': heads, 'quest_ids': sorted(quest.get('id') for quest in quests if quest.get('id'))}
+    return matches, new_state
+
+
+def load_scan_state(path: str = SCAN_STATE_PATH) -> Dict[str, Any]:
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'repos': {}, 'quest_ids': []}
+
+
+def save_scan_state(state: Dict[str, Any], path: str = SCAN_STATE_PATH):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def main():
+    """Main function to detect completions from local git history."""
+    try:
+        args = sys.argv[1:]
+        flags = {arg for arg in args if arg in ('--store', '--dry-run')}
+        author = None
+        if '--author' in args:
+            index = args.index('--author')
+            author = args[index + 1]
+            del args[index:index + 2]
+        repos = [arg for arg in args if not arg.startswith('--')]
+        if not repos:
+            try:
+                with open(CONFIG_PATH, 'r') as f:
+                    repos = json.load(f).get('git_repositories', [])
+            except (OSError, ValueError):
+                repos = []
+
+        store = None
+        if '--store' in flags:
+            from quest_store import QuestStore
+            store = QuestStore()
+            quests = store.active_quests()
+            # Aggregates are read inside the completion transaction
+            aggregates = None
+        else:
+            try:
+                with open(QUEST_LOG_PATH, 'r') as f:
+                    quest_log = json.load(f)
+            except (OSError, ValueError):
+                quest_log = {}
+            quests = quest_log.get('active_quests', [])
+            aggregates = quest_log.get('aggregates')
+
+        matches, scan_state = detect_completions(repos, quests, load_scan_state(), author)
+        output = {'matches': [match for _, match in matches], 'resolution': None}
+
+        if '--dry-run' not in flags:
+            if matches:
+                from character_sheet import CharacterSheetFile, character_from_sheet
+                character_sheet = character_from_sheet(CharacterSheetFile().load())
+                completed = [quest for quest, _ in matches]
+                if store is not None:
+                    resolution = store.complete(completed, lambda batch, stored: resolve_quest_batch(
+                        batch, character_sheet, aggregates=stored))
+                else:
+                    resolution = resolve_quest_batch(completed, character_sheet, aggregates=aggregates)
+                output['resolution'] = resolution
+            save_scan_state(scan_state)
+        if store is not None:
+            store.close()
+
+        print(json.dumps(output, indent=2))
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Opt-in stage timing and counters.
+
+Enabled by `--profile` on the command line (JSON report on stderr),
+`--profile=metrics.prom` (Prometheus text-format file), or the
+QUESTBOARD_PROFILE environment variable ("1" for stderr, or a .prom path).
+The report is written when the process exits.
+
+Hot functions are wrapped with @timed(stage) when their module is
+imported. When profiling is off the decorator returns the function
+unchanged and span()/incr() are no-ops, so disabled instrumentation costs
+nothing on the hot paths. Work done in --workers subprocesses is not
+included in the report.
+"""
+
+import atexit
+import contextlib
+import functools
+import json
+import os
+import sys
+import time
+from typing import Dict, Any, List, Callable, Optional
+
+PROFILE_ENV = 'QUESTBOARD_PROFILE'
+METRIC_PREFIX = 'questboard'
+
+
+def _profile_target(argv: List[str], environ: Dict[str, str]) -> Optional[str]:
+    """'-' for stderr JSON, a file path for Prometheus text, or None."""
+    for arg in argv:
+        if arg == '--profile':
+            return '-'
+        if arg.startswith('--profile='):
+            return arg.split('=', 1)[1] or '-'
+    value = environ.get(PROFILE_ENV, '')
+    if value in ('', '0'):
+        return None
+    return '-' if value == '1' else value
+
+
+PROFILE_TARGET = _profile_target(sys.argv[1:], os.environ)
+ENABLED = PROFILE_TARGET is not None
+
+# stage -> [calls, total seconds, max seconds]
+_stages: Dict[str, List[float]] = {}
+_counters: Dict[str, int] = {}
+_started = time.perf_counter()
+
+
+def strip_profile_args(args: List[str]) -> List[str]:
+    """Drop --profile flags from an argument list before positional parsing."""
+    return [arg for arg in args if arg != '--profile' and not arg.startswith('--profile=')]
+
+
+def _record(stage: str, elapsed: float):
+    entry = _stages.get(stage)
+    if entry is None:
+        _stages[stage] = [1, elapsed, elapsed]
+    else:
+        entry[0] += 1
+        entry[1] += elapsed
+        if elapsed > entry[2]:
+            entry[2] = elapsed
+
+
+def timed(stage: str) -> Callable[[Callable], Callable]:
+    """Decorator: time every call to the function under `stage`."""
+    def decorate(func: Callable) -> Callable:
+        if not ENABLED:
+            return func
+
+        perf_counter = time.perf_counter
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(stage, perf_counter() - started)
+        return wrapper
+    return decorate
+
+
+@contextlib.contextmanager
+def _span(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(stage, time.perf_counter() - started)
+
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+def span(stage: str):
+    """Context manager timing a block under `stage`."""
+    return _span(stage) if ENABLED else _NULL_SPAN
+
+
+def incr(counter: str, value: int = 1):
+    """Add to a named counter."""
+    if ENABLED:
+        _counters[counter] = _counters.get(counter, 0) + value
+
+
+def report() -> Dict[str, Any]:
+    """Everything recorded so far, JSON-ready."""
+    return {
+        "wall_seconds": time.perf_counter() - _started,
+        "stages": {
+            stage: {
+                "calls": int(calls),
+                "total_seconds": total,
+                "mean_us": total / calls * 1e6,
+                "max_us": longest * 1e6
+            }
+            for stage, (calls, total, longest) in sorted(_stages.items())
+        },
+        "counters": dict(sorted(_counters.items()))
+    }
+
+
+def prometheus_text(data: Dict[str, Any] = None) -> str:
+    """Render a report in the Prometheus text exposition format."""
+    data = data or report()
+    lines = [
+        f"# HELP {METRIC_PREFIX}_stage_seconds_total Time spent in each stage.",
+        f"# TYPE {METRIC_PREFIX}_stage_seconds_total counter",
+    ]
+    lines += [f'{METRIC_PREFIX}_stage_seconds_total{{stage="{stage}"}} {stats["total_seconds"]:.9f}' for stage, stats in data['stages'].items()]
+    lines += [
+        f"# HELP {METRIC_PREFIX}_stage_calls_total Calls to each stage.",
+        f"# TYPE {METRIC_PREFIX}_stage_calls_total counter",
+    ]
+    lines += [f'{METRIC_PREFIX}_stage_calls_total{{stage="{stage}"}} {stats["calls"]}' for stage, stats in data['stages'].items()]
+    lines += [
+        f"# HELP {METRIC_PREFIX}_stage_max_seconds Slowest single call of each stage.",
+        f"# TYPE {METRIC_PREFIX}_stage_max_seconds gauge",
+    ]
+    lines += [f'{METRIC_PREFIX}_stage_max_seconds{{stage="{stage}"}} {stats["max_us"] / 1e6:.9f}' for stage, stats in data['stages'].items()]
+    for counter, value in data['counters'].items():
+        lines += [f"# TYPE {METRIC_PREFIX}_{counter}_total counter", f"{METRIC_PREFIX}_{counter}_total {value}"]
+    lines += [
+        f"# TYPE {METRIC_PREFIX}_wall_seconds gauge",
+        f"{METRIC_PREFIX}_wall_seconds {data['wall_seconds']:.9f}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def emit(target: str = None):
+    """Write the report to stderr ('-') or a Prometheus text file."""
+    target = target or PROFILE_TARGET
+    if target == '-':
+        print(json.dumps({"profile": report()}), file=sys.stderr)
+    else:
+        tmp_path = target + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(prometheus_text())
+        os.replace(tmp_path, target)
+
+
+if ENABLED:
+    atexit.register(emit)
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Rolling-window leaderboards fed by quest resolutions.
+
+Every resolve_quest_completion result (or batch result) is recorded once
+per player. Each player keeps a 7-slot ring buffer of per-day XP and
+per-category completion counts, bucketed by day in the configured
+timezone, plus all-time totals. Each leaderboard (XP or a category's
+completion count, over daily / weekly / all_time) keeps every player's
+current score and a lazily cleaned max-heap, so a top-K query pops K
+entries instead of sorting or touching raw history.
+
+Windows roll forward when a newer day is first seen: daily boards are
+cleared, and only players whose buckets fall out of the 7-day window
+have their weekly scores recomputed (O(7) each).
+
+Usage:
+    python3 scripts/leaderboard.py record <player_id> < resolve_quest_output.json
+    python3 scripts/leaderboard.py top [daily|weekly|all_time] [category] [k]
+
+State is kept in data/leaderboard.json (QUESTBOARD_LEADERBOARD to override).
+"""
+
+import datetime
+import heapq
+import json
+import os
+import sys
+from typing import Dict, Any, List, Optional, Tuple
+
+from calendar_dates import get_timezone, parse_datetime
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+LEADERBOARD_PATH = os.environ.get('QUESTBOARD_LEADERBOARD', os.path.join(DATA_DIR, 'leaderboard.json'))
+
+RING_DAYS = 7
+WINDOWS = {'daily': 1, 'weekly': RING_DAYS}
+ALL_TIME = 'all_time'
+XP = 'xp'
+DEFAULT_K = 10
+
+
+class TopKBoard:
+    """Current score per player plus a max-heap with lazy deletion."""
+
+    def __init__(self):
+        self.scores: Dict[str, int] = {}
+        self._heap: List[Tuple[int, str]] = []
+
+    def set(self, player_id: str, score: int):
+        if score <= 0:
+            self.scores.pop(player_id, None)
+            return
+        if self.scores.get(player_id) == score:
+            return
+        self.scores[player_id] = score
+        heapq.heappush(self._heap, (-score, player_id))
+        if len(self._heap) > 2 * len(self.scores) + 64:
+            # Too many stale entries; rebuild from the live scores
+            self._heap = [(-value, player) for player, value in self.scores.items()]
+            heapq.heapify(self._heap)
+
+    def clear(self):
+        self.scores.clear()
+        self._heap.clear()
+
+    def top(self, k: int = DEFAULT_K) -> List[Tuple[str, int]]:
+        """Highest `k` scores, ties broken by player ID."""
+        result, keep, seen = [], [], set()
+        while self._heap and len(result) < k:
+            entry = heapq.heappop(self._heap)
+            score, player_id = -entry[0], entry[1]
+            if player_id in seen or self.scores.get(player_id) != score:
+                continue  # stale or duplicate entry, drop it
+            seen.add(player_id)
+            result.append((player_id, score))
+            keep.append(entry)
+        for entry in keep:
+            heapq.heappush(self._heap, entry)
+        return result
+
+
+class PlayerWindow:
+    """Per-day ring buffer of one player's XP and category counts."""
+
+    __slots__ = ('days', 'xp', 'categories', 'total_xp', 'total_categories')
+
+    def __init__(self):
+        self.days: List[Optional[int]] = [None] * RING_DAYS
+        self.xp = [0] * RING_DAYS
+        self.categories: List[Dict[str, int]] = [{} for _ in range(RING_DAYS)]
+        self.total_xp = 0
+        self.total_categories: Dict[str, int] = {}
+
+    def add(self, day: int, xp: int, category: str, in_window: bool):
+        self.total_xp += xp
+        self.total_categories[category] = self.total_categories.get(category, 0) + 1
+        if not in_window:
+            return
+        slot = day % RING_DAYS
+        if self.days[slot] != day:
+            # Reusing a slot from a day that has rolled off
+            self.days[slot] = day
+            self.xp[slot] = 0
+            self.categories[slot] = {}
+        self.xp[slot] += xp
+        self.categories[slot][category] = self.categories[slot].get(category, 0) + 1
+
+    def _slots(self, today: int, span: int):
+        return [slot for slot, day in enumerate(self.days) if day is not None and today - span < day <= today]
+
+    def window_xp(self, today: int, span: int) -> int:
+        return sum(self.xp[slot] for slot in self._slots(today, span))
+
+    def window_categories(self, today: int, span: int) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for slot in self._slots(today, span):
+            for category, count in self.categories[slot].items():
+                counts[category] = counts.get(category, 0) + count
+        return counts
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PlayerWindow":
+        window = cls()
+        for field in cls.__slots__:
+            setattr(window, field, data[field])
+        return window
+
+
+class Leaderboards:
+    """Daily, weekly and all-time XP and per-category leaderboards."""
+
+    def __init__(self, tz: datetime.tzinfo = None, today: int = None):
+        self.tz = tz or get_timezone()
+        self.today = today if today is not None else self.day_of(datetime.datetime.now(self.tz))
+        self.players: Dict[str, PlayerWindow] = {}
+        self._boards: Dict[Tuple[str, str], TopKBoard] = {}
+        # Players with a bucket on each day still inside the weekly window
+        self._active: Dict[int, set] = {}
+
+    def day_of(self, when: datetime.datetime) -> int:
+        """Day ordinal of `when` in the leaderboard timezone."""
+        return when.astimezone(self.tz).date().toordinal()
+
+    def board(self, metric: str, window: str) -> TopKBoard:
+        board = self._boards.get((metric, window))
+        if board is None:
+            board = self._boards[(metric, window)] = TopKBoard()
+        return board
+
+    def _refresh(self, player_id: str, windows: List[str]):
+        """Recompute one player's windowed scores from the ring buffer."""
+        player = self.players[player_id]
+        for window in windows:
+            span = WINDOWS[window]
+            self.board(XP, window).set(player_id, player.window_xp(self.today, span))
+            counts = player.window_categories(self.today, span)
+            for (metric, board_window), board in self._boards.items():
+                if board_window == window and metric != XP and metric not in counts:
+                    board.set(player_id, 0)
+            for category, count in counts.items():
+                self.board(category, window).set(player_id, count)
+
+    def advance(self, day: int):
+        """Roll the windows forward to `day`."""
+        if day <= self.today:
+            return
+        self.today = day
+        for (metric, window), board in self._boards.items():
+            if window == 'daily':
+                board.clear()
+        expired = [bucket for bucket in self._active if bucket <= day - RING_DAYS]
+        affected = set()
+        for bucket in expired:
+            affected |= self._active.pop(bucket)
+        for player_id in affected:
+            self._refresh(player_id, ['weekly'])
+
+    def record_completion(self, player_id: str, xp: int, category: str, when: datetime.datetime = None):
+        """Add one completion to the player's buckets and the boards."""
+        day = self.day_of(when) if when is not None else self.today
+        if day > self.today:
+            self.advance(day)
+        in_window = day > self.today - RING_DAYS
+
+        player = self.players.get(player_id)
+        if player is None:
+            player = self.players[player_id] = PlayerWindow()
+        player.add(day, xp, category, in_window)
+
+        self.board(XP, ALL_TIME).set(player_id, player.total_xp)
+        self.board(category, ALL_TIME).set(player_id, player.total_categories[category])
+        if in_window:
+            self._active.setdefault(day, set()).add(player_id)
+            self._refresh(player_id, [window for window, span in WINDOWS.items() if day > self.today - span])
+
+    def record(self, player_id: str, result: Dict[str, Any]):
+        """Record a resolve_quest_completion (or resolve_quest_batch) result."""
+        for item in result.get('results', [result]):
+            quest = item.get('quest_completed', {})
+            when = None
+            if quest.get('completed_at'):
+                try:
+                    when = parse_datetime(quest['completed_at'], datetime.timezone.utc)
+                except ValueError:
+                    when = None
+            self.record_completion(
+                player_id, item.get('xp_gained', quest.get('xp_reward', 0)), quest.get('category', 'misc'), when
+            )
+
+    def top(self, window: str = 'weekly', category: str = None, k: int = DEFAULT_K,
+            now: datetime.datetime = None) -> List[Dict[str, Any]]:
+        """Top `k` players by XP, or by completions in `category`, as of `now`."""
+        if window != ALL_TIME and window not in WINDOWS:
+            raise ValueError(f"Unknown window: {window}")
+        # Roll expired windows off even if nobody has completed anything today
+        self.advance(self.day_of(now or datetime.datetime.now(self.tz)))
+        metric = category or XP
+        if (metric, window) not in self._boards:
+            return []
+        return [
+            {"rank": rank, "player_id": player_id, "score": score}
+            for rank, (player_id, score) in enumerate(self.board(metric, window).top(k), 1)
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "today": self.today,
+            "players": {player_id: player.to_dict() for player_id, player in self.players.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], tz: datetime.tzinfo = None) -> "Leaderboards":
+        boards = cls(tz, today=data.get('today'))
+        for player_id, player_data in data.get('players', {}).items():
+            player = boards.players[player_id] = PlayerWindow.from_dict(player_data)
+            boards.board(XP, ALL_TIME).set(player_id, player.total_xp)
+            for category, count in player.total_categories.items():
+                boards.board(category, ALL_TIME).set(player_id, count)
+            for day in player.days:
+                if day is not None and day > boards.today - RING_DAYS:
+                    boards._active.setdefault(day, set()).add(player_id)
+            boards._refresh(player_id, list(WINDOWS))
+        # Roll the restored state forward to the current day
+        boards.advance(boards.day_of(datetime.datetime.now(boards.tz)))
+        return boards
+
+
+def load_leaderboards(path: str = LEADERBOARD_PATH) -> Leaderboards:
+    try:
+        with open(path, 'r') as f:
+            return Leaderboards.from_dict(json.load(f))
+    except (OSError, ValueError):
+        return Leaderboards()
+
+
+def save_leaderboards(boards: Leaderboards, path: str = LEADERBOARD_PATH):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(boards.to_dict(), f)
+    os.replace(tmp_path, path)
+
+
+def main():
+    """Main function to record resolutions and query leaderboards."""
+    try:
+        args = sys.argv[1:]
+        command = args[0] if args else 'top'
+        boards = load_leaderboards()
+
+        if command == 'record':
+            if len(args) < 2:
+                raise ValueError("Usage: leaderboard.py record <player_id> < resolve_quest_output.json")
+            boards.record(args[1], json.load(sys.stdin))
+            save_leaderboards(boards)
+            output = {window: boards.top(window, k=DEFAULT_K) for window in list(WINDOWS) + [ALL_TIME]}
+        elif command == 'top':
+            window = args[1] if len(args) > 1 else 'weekly'
+            category = args[2] if len(args) > 2 and args[2] != XP else None
+            k = int(args[3]) if len(args) > 3 else DEFAULT_K
+            output = boards.top(window, category, k)
+        else:
+            raise ValueError(f"Unknown command: {command}")
+
+        print(json.dumps(output, indent=2))
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
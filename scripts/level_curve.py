@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+XP level curve shared by the resolver and analytics.
+
+Levels 1-10 follow the table in references/rpg_system.md; every level after
+10 costs a flat 1000 XP, so the curve is unbounded. Single lookups use
+bisect over the precomputed table plus a closed-form tail; levels_from_xp
+maps a whole array of XP values at once (with NumPy when it's installed).
+
+Usage:
+    python3 scripts/level_curve.py <xp> [<xp> ...]
+"""
+
+import bisect
+import json
+import sys
+from typing import List, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# LEVEL_THRESHOLDS[i] is the total XP needed to reach level i + 1
+LEVEL_THRESHOLDS = [0, 100, 300, 600, 1000, 1500, 2100, 2800, 3600, 4500]
+MAX_TABLE_LEVEL = len(LEVEL_THRESHOLDS)
+TAIL_XP_PER_LEVEL = 1000
+
+
+def xp_for_level(level: int) -> int:
+    """Total XP needed to reach `level`."""
+    if level <= 1:
+        return 0
+    if level <= MAX_TABLE_LEVEL:
+        return LEVEL_THRESHOLDS[level - 1]
+    return LEVEL_THRESHOLDS[-1] + (level - MAX_TABLE_LEVEL) * TAIL_XP_PER_LEVEL
+
+
+def level_from_xp(xp: int) -> int:
+    """Level reached with `xp` total XP."""
+    if xp >= LEVEL_THRESHOLDS[-1]:
+        return MAX_TABLE_LEVEL + int(xp - LEVEL_THRESHOLDS[-1]) // TAIL_XP_PER_LEVEL
+    return max(bisect.bisect_right(LEVEL_THRESHOLDS, xp), 1)
+
+
+def xp_to_next_level(level: int, xp: int) -> int:
+    """XP still needed to go from `level` to `level + 1`."""
+    return xp_for_level(level + 1) - xp
+
+
+def levels_from_xp(xp_values: Sequence[int]) -> List[int]:
+    """Vectorized level_from_xp over an array of XP totals.
+
+    Returns a NumPy array when NumPy is available (and a list otherwise).
+    """
+    if np is None:
+        return [level_from_xp(xp) for xp in xp_values]
+
+    xp_array = np.asarray(xp_values, dtype=np.int64)
+    levels = np.searchsorted(np.asarray(LEVEL_THRESHOLDS, dtype=np.int64), xp_array, side='right')
+    tail = xp_array >= LEVEL_THRESHOLDS[-1]
+    levels[tail] = MAX_TABLE_LEVEL + (xp_array[tail] - LEVEL_THRESHOLDS[-1]) // TAIL_XP_PER_LEVEL
+    return np.maximum(levels, 1)
+
+
+def main():
+    """Print level and XP-to-next for each XP total given."""
+    try:
+        xp_values = [int(arg) for arg in sys.argv[1:]]
+        result = [
+            {"xp": xp, "level": level, "xp_to_next_level": xp_to_next_level(level, xp)}
+            for xp, level in zip(xp_values, levels_from_xp(xp_values))
+        ]
+        print(json.dumps(result, indent=2, default=int))
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Multi-player quest engine: one Quest Board per player, asyncio front end.
+
+Each player's state lives in its own journal directory (see
+quest_journal.py), sharded by a stable hash of the player ID so no single
+directory holds thousands of entries:
+
+    data/players/<shard>/<player_id>/journal.ndjson
+
+Completions for different players run concurrently on a thread pool;
+completions for the same player are serialized by a per-player asyncio
+lock (and, across processes, by the journal's file lock), so every
+completion sees the previous one's XP and none is lost.
+
+Usage:
+    python3 scripts/multiplayer.py serve [socket_path]
+    python3 scripts/multiplayer.py load [--players N] [--completions N] [--concurrency N] [--dir path]
+
+`serve` speaks the same JSON-lines protocol as questboard.py, with a
+"player_id" in every request's params:
+    -> {"id": 1, "method": "complete", "params": {"player_id": "ana", "quest": {...}}}
+    -> {"id": 2, "method": "generate", "params": {"player_id": "ana", "events": [...]}}
+    -> {"id": 3, "method": "state", "params": {"player_id": "ana"}}
+    -> {"id": 4, "method": "leaderboard", "params": {"window": "weekly", "category": "coding", "k": 10}}
+
+Every completion is also recorded in in-memory team leaderboards (see
+leaderboard.py).
+
+`load` runs the built-in load generator in-process against a throwaway
+directory (no sockets) and prints p50/p99 latency, throughput and whether
+any XP was lost.
+"""
+
+import asyncio
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+
+from generate_quests import generate_quest_from_event
+from leaderboard import Leaderboards, DEFAULT_K
+from quest_journal import QuestJournal
+from stable_hash import stable_hash
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+DEFAULT_PLAYERS_DIR = os.environ.get('QUESTBOARD_PLAYERS_DIR', os.path.join(DATA_DIR, 'players'))
+DEFAULT_SOCKET_PATH = os.environ.get('QUESTBOARD_MULTIPLAYER_SOCKET', os.path.join(DATA_DIR, 'multiplayer.sock'))
+
+SHARD_COUNT = 256
+DEFAULT_WORKERS = 32
+UNSAFE_CHARS = re.compile(r'[^A-Za-z0-9_.@-]')
+
+
+def player_directory(root: str, player_id: str) -> str:
+    """Sharded state directory for one player."""
+    if not player_id:
+        raise ValueError("player_id is required")
+    shard = f"{stable_hash(player_id) % SHARD_COUNT:02x}"
+    # Keep IDs readable but never let them escape the shard directory
+    name = UNSAFE_CHARS.sub('_', player_id).lstrip('.') or '_'
+    if name != player_id:
+        name = f"{name}-{stable_hash(player_id):08x}"
+    return os.path.join(root, shard, name)
+
+
+def generate_quests(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [generate_quest_from_event(event) for event in events]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class MultiPlayerEngine:
+    """Per-player journals behind per-player asyncio locks."""
+
+    def __init__(self, root: str = DEFAULT_PLAYERS_DIR, workers: int = DEFAULT_WORKERS, leaderboards: Leaderboards = None):
+        self.root = root
+        self.leaderboards = leaderboards if leaderboards is not None else Leaderboards()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='player')
+        self._journals: Dict[str, QuestJournal] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def journal(self, player_id: str) -> QuestJournal:
+        journal = self._journals.get(player_id)
+        if journal is None:
+            directory = player_directory(self.root, player_id)
+            os.makedirs(directory, exist_ok=True)
+            journal = self._journals[player_id] = QuestJournal(directory)
+        return journal
+
+    async def _run(self, player_id: str, method: str, *args: Any) -> Any:
+        """Run a journal call on the pool, one at a time per player."""
+        lock = self._locks.get(player_id)
+        if lock is None:
+            lock = self._locks[player_id] = asyncio.Lock()
+        async with lock:
+            journal = self.journal(player_id)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, getattr(journal, method), *args)
+
+    async def complete(self, player_id: str, quest: Dict[str, Any], stats: Dict[str, int] = None) -> Dict[str, Any]:
+        """Resolve one completion for a player (see QuestJournal.complete)."""
+        result = await self._run(player_id, 'complete', quest, stats)
+        # Runs on the event loop thread, so the boards need no lock
+        self.leaderboards.record(player_id, result)
+        return result
+
+    async def generate(self, player_id: str, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Generate quests from events and journal them for the player."""
+        # Generation is CPU-bound; keep it off the event loop
+        loop = asyncio.get_running_loop()
+        quests = await loop.run_in_executor(self.executor, generate_quests, events)
+        await self._run(player_id, 'record_generated', quests)
+        return quests
+
+    async def state(self, player_id: str) -> Dict[str, Any]:
+        return await self._run(player_id, 'state')
+
+    async def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Dispatch one protocol request to the engine."""
+        request_id = request.get('id')
+        params = request.get('params') or {}
+        method = request.get('method')
+        try:
+            player_id = params.get('player_id', '')
+            if method == 'complete':
+                result = await self.complete(player_id, params.get('quest', {}), params.get('stats'))
+            elif method == 'generate':
+                result = await self.generate(player_id, params.get('events', []))
+            elif method == 'state':
+                result = await self.state(player_id)
+            elif method == 'leaderboard':
+                result = self.leaderboards.top(params.get('window', 'weekly'), params.get('category'), params.get('k', DEFAULT_K))
+            else:
+                raise ValueError(f"Unknown method: {method}")
+            return {"id": request_id, "result": result}
+        except Exception as e:
+            return {"id": request_id, "error": str(e)}
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+async def _handle_connection(engine: MultiPlayerEngine, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Serve JSON-lines requests; responses may come back out of order."""
+    pending = set()
+    write_lock = asyncio.Lock()
+
+    async def respond(request: Dict[str, Any]):
+        response = await engine.handle(request)
+        async with write_lock:
+            writer.write((json.dumps(response) + "\n").encode())
+            await writer.drain()
+
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                request = None
+                async with write_lock:
+                    writer.write((json.dumps({"id": None, "error": f"Invalid JSON: {e}"}) + "\n").encode())
+                    await writer.drain()
+            if request is not None:
+                task = asyncio.ensure_future(respond(request))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
+    finally:
+        writer.close()
+
+
+async def serve(socket_path: str = DEFAULT_SOCKET_PATH, root: str = DEFAULT_PLAYERS_DIR):
+    """Run the multi-player engine on a Unix socket until interrupted."""
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    engine = MultiPlayerEngine(root)
+    server = await asyncio.start_unix_server(
+        lambda reader, writer: _handle_connection(engine, reader, writer), path=socket_path
+    )
+    print(f"Multi-player quest engine listening on {socket_path}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        engine.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+LOAD_QUESTS = [
+    {"name": "The Morning Missive", "category": "writing", "xp_reward": 25},
+    {"name": "The Council of Stakeholders", "category": "meeting", "xp_reward": 50},
+    {"name": "Refactoring the Legacy Crypt", "category": "coding", "xp_reward": 100},
+    {"name": "The Gauntlet of Iron", "category": "exercise", "xp_reward": 50},
+    {"name": "The Dragon of Quarterly Reports", "category": "writing", "xp_reward": 250},
+]
+
+
+async def run_load(engine: MultiPlayerEngine, players: int = 1000, completions: int = 5, concurrency: int = 1000) -> Dict[str, Any]:
+    """Fire `completions` completions for each of `players` players at once.
+
+    Up to `concurrency` requests are in flight. Latency is measured per
+    completion from submission to result, including time spent waiting
+    behind the same player's earlier completions. Afterwards every
+    player's XP is checked against the sum of what was awarded.
+    """
+    gate = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    expected: Dict[str, int] = {}
+
+    async def one(player_id: str, index: int):
+        quest = dict(LOAD_QUESTS[index % len(LOAD_QUESTS)], id=f"{player_id}_q{index}")
+        async with gate:
+            started = time.perf_counter()
+            await engine.complete(player_id, quest)
+            latencies.append(time.perf_counter() - started)
+
+    tasks = []
+    for player in range(players):
+        player_id = f"player{player:05d}"
+        expected[player_id] = 0
+        for index in range(completions):
+            expected[player_id] += LOAD_QUESTS[index % len(LOAD_QUESTS)]['xp_reward']
+            tasks.append(one(player_id, index))
+
+    started = time.perf_counter()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    lost = 0
+    for player_id, xp in expected.items():
+        state = await engine.state(player_id)
+        lost += xp - state['xp']
+
+    latencies.sort()
+    return {
+        "players": players,
+        "completions": len(latencies),
+        "seconds": elapsed,
+        "completions_per_sec": len(latencies) / elapsed if elapsed > 0 else None,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+        "lost_xp": lost
+    }
+
+
+def load_main(args: List[str]):
+    """Run the load generator and print its report."""
+    options = {'--players': '1000', '--completions': '5', '--concurrency': '1000', '--workers': str(DEFAULT_WORKERS)}
+    directory = None
+    for flag in list(options) + ['--dir']:
+        if flag in args:
+            index = args.index(flag)
+            if flag == '--dir':
+                directory = args[index + 1]
+            else:
+                options[flag] = args[index + 1]
+
+    root = directory or tempfile.mkdtemp(prefix='questboard-load-')
+    engine = MultiPlayerEngine(root, workers=int(options['--workers']))
+    try:
+        report = asyncio.run(run_load(
+            engine,
+            players=int(options['--players']),
+            completions=int(options['--completions']),
+            concurrency=int(options['--concurrency'])
+        ))
+    finally:
+        engine.close()
+        if directory is None:
+            shutil.rmtree(root, ignore_errors=True)
+
+    print(json.dumps(report, indent=2))
+    if report['lost_xp']:
+        sys.exit(1)
+
+
+def main():
+    """Main function to run the multi-player server or load generator."""
+    try:
+        args = sys.argv[1:]
+        command = args[0] if args else None
+
+        if command == 'serve':
+            try:
+                asyncio.run(serve(args[1] if len(args) > 1 else DEFAULT_SOCKET_PATH))
+            except KeyboardInterrupt:
+                pass
+        elif command == 'load':
+            load_main(args[1:])
+        else:
+            print(__doc__, file=sys.stderr)
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Narration client: sends narration prompts to `model_narration` with
+caching, request coalescing and micro-batching.
+
+- Cache: a disk-backed LRU with a TTL (SQLite in data/cache/narration.db,
+  QUESTBOARD_NARRATION_CACHE to override), keyed by the digest of the
+  normalized prompt (Unicode-normalized, case-folded, whitespace-collapsed)
+  together with the model and narration style. Repeat prompts cost nothing.
+  Cache reads and writes run on their own thread, never on the event loop,
+  and a cache locked by another process for too long counts as a miss.
+- Coalescing: concurrent requests for the same digest share one in-flight
+  model call.
+- Micro-batching: prompts arriving within BATCH_WINDOW seconds of each
+  other are packed into one chat request that asks for a JSON array of
+  narrations, one per prompt. If the reply can't be unpacked, the batch
+  falls back to one request per prompt.
+
+The model is reached over an OpenAI-compatible chat completions endpoint
+(QUESTBOARD_NARRATION_URL, default OpenRouter; key in OPENROUTER_API_KEY).
+`stub` runs a local stand-in server that answers instantly (or after
+--latency ms) without any network access.
+
+Usage:
+    python3 scripts/narration_client.py narrate < resolve_or_boss_output.json
+    python3 scripts/narration_client.py stub [port] [--latency MS]
+    python3 scripts/narration_client.py stats
+    python3 scripts/narration_client.py clear
+
+`narrate` adds a `narrated` block next to each `narration_prompts` block
+(resolve_quest.py output, single or batch) and to each boss phase
+(boss_fight.py output).
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from stable_hash import content_digest
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+CONFIG_PATH = os.path.join(DATA_DIR, 'config.json')
+CACHE_PATH = os.environ.get('QUESTBOARD_NARRATION_CACHE', os.path.join(DATA_DIR, 'cache', 'narration.db'))
+NARRATION_URL = os.environ.get('QUESTBOARD_NARRATION_URL', 'https://openrouter.ai/api/v1/chat/completions')
+
+DEFAULT_MODEL = 'anthropic/claude-sonnet-4-5'
+DEFAULT_STYLE = 'epic_humorous'
+CACHE_TTL = 7 * 24 * 3600
+CACHE_MAX_ENTRIES = 5000
+BATCH_WINDOW = 0.02
+MAX_BATCH = 8
+REQUEST_TIMEOUT = 60
+DEFAULT_STUB_PORT = 8765
+
+SYSTEM_PROMPT = (
+    "You are the Quest Master. Retell the given quest event as a short, vivid "
+    "D&D dungeon master narration in a {style} style. Reply with the narration only."
+)
+PACKED_MARKER = "NARRATE-BATCH:"
+PACKED_INSTRUCTIONS = (
+    PACKED_MARKER + " The user message is a JSON array of prompts. Narrate each one "
+    "independently and reply with only a JSON array of strings, one narration per "
+    "prompt, in the same order."
+)
+
+
+def normalize_prompt(text: str) -> str:
+    """Canonical form of a prompt for cache keys."""
+    return ' '.join(unicodedata.normalize('NFKC', text or '').casefold().split())
+
+
+def prompt_digest(prompt: str, model: str, style: str) -> str:
+    return content_digest({"prompt": normalize_prompt(prompt), "model": model, "style": style})
+
+
+class NarrationCache:
+    """LRU + TTL narration store in SQLite, shared between processes."""
+
+    def __init__(self, path: str = CACHE_PATH, ttl: float = CACHE_TTL, max_entries: int = CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Used from the client's cache thread; `lock` serializes access
+        self.conn = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS narrations ("
+            "digest TEXT PRIMARY KEY, text TEXT NOT NULL, created_at REAL NOT NULL, used_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_narrations_used_at ON narrations (used_at)")
+
+    def get(self, digest: str) -> Optional[str]:
+        """Cached narration, or None if missing or older than the TTL.
+
+        A database locked by another process past the timeout is a miss.
+        """
+        now = time.time()
+        with self.lock:
+            try:
+                row = self.conn.execute("SELECT text, created_at FROM narrations WHERE digest = ?", (digest,)).fetchone()
+                if row is None:
+                    return None
+                if now - row[1] > self.ttl:
+                    self.conn.execute("DELETE FROM narrations WHERE digest = ?", (digest,))
+                    return None
+                self.conn.execute("UPDATE narrations SET used_at = ? WHERE digest = ?", (now, digest))
+            except sqlite3.OperationalError:
+                return None
+        return row[0]
+
+    def put_many(self, entries: List[Tuple[str, str]]):
+        """Store (digest, text) pairs, then evict expired and least recently used entries."""
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO narrations (digest, text, created_at, used_at) VALUES (?, ?, ?, ?)",
+                [(digest, text, now, now) for digest, text in entries]
+            )
+            self.conn.execute("DELETE FROM narrations WHERE created_at < ?", (now - self.ttl,))
+            excess = self.conn.execute("SELECT COUNT(*) FROM narrations").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self.conn.execute(
+                    "DELETE FROM narrations WHERE digest IN (SELECT digest FROM narrations ORDER BY used_at LIMIT ?)",
+                    (excess,)
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            count, oldest = self.conn.execute("SELECT COUNT(*), MIN(created_at) FROM narrations").fetchone()
+        return {"entries": count, "max_entries": self.max_entries, "ttl_seconds": self.ttl,
+                "oldest_age_seconds": round(time.time() - oldest, 1) if oldest else None}
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM narrations")
+
+    def close(self):
+        self.conn.close()
+
+
+class ChatTransport:
+    """Blocking POST to an OpenAI-compatible chat completions endpoint."""
+
+    def __init__(self, url: str = NARRATION_URL, api_key: str = None, timeout: float = REQUEST_TIMEOUT):
+        self.url = url
+        self.api_key = api_key if api_key is not None else os.environ.get('OPENROUTER_API_KEY', '')
+        self.timeout = timeout
+
+    def complete(self, model: str, messages: List[Dict[str, str]]) -> str:
+        headers = {'Content-Type': 'application/json'}
+        if self.api_key:
+            headers['Authorization'] = f'Bearer {self.api_key}'
+        request = urllib.request.Request(
+            self.url, data=json.dumps({"model": model, "messages": messages}).encode(), headers=headers, method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            body = json.load(response)
+        return body['choices'][0]['message']['content']
+
+
+class NarrationClient:
+    """Cached, coalescing, micro-batching narration requests (asyncio)."""
+
+    def __init__(self, transport: ChatTransport = None, cache: NarrationCache = None, model: str = None,
+                 style: str = None, batch_window: float = BATCH_WINDOW, max_batch: int = MAX_BATCH, workers: int = 4):
+        config = load_config()
+        self.transport = transport or ChatTransport()
+        self.cache = cache if cache is not None else NarrationCache()
+        self.model = model or config.get('model_narration', DEFAULT_MODEL)
+        self.style = style or config.get('narration_style', DEFAULT_STYLE)
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='narration')
+        # Cache reads and writes block on SQLite locks held by other processes;
+        # they get their own thread so they neither stall the event loop nor
+        # queue behind slow model calls
+        self.cache_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='narration-cache')
+        self.counters = {"requests": 0, "cache_hits": 0, "coalesced": 0, "model_calls": 0, "batch_fallbacks": 0}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pending: List[Tuple[str, str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Strong references to in-flight sends, so they can't be collected mid-call
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def narrate(self, prompt: str) -> str:
+        """Narration for one prompt."""
+        self.counters['requests'] += 1
+        digest = prompt_digest(prompt, self.model, self.style)
+        loop = asyncio.get_running_loop()
+        cached = await loop.run_in_executor(self.cache_executor, self.cache.get, digest)
+        if cached is not None:
+            self.counters['cache_hits'] += 1
+            return cached
+
+        future = self._inflight.get(digest)
+        if future is not None:
+            self.counters['coalesced'] += 1
+        else:
+            future = self._inflight[digest] = loop.create_future()
+            self._pending.append((digest, prompt, future))
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        # A cancelled caller must not cancel the call other callers share
+        return await asyncio.shield(future)
+
+    async def narrate_many(self, prompts: List[str]) -> List[str]:
+        return list(await asyncio.gather(*(self.narrate(prompt) for prompt in prompts)))
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: List[Tuple[str, str, asyncio.Future]]):
+        loop = asyncio.get_running_loop()
+        try:
+            texts, calls, fell_back = await loop.run_in_executor(
+                self.executor, self._complete_batch, [prompt for _, prompt, _ in batch]
+            )
+        except Exception as e:
+            for digest, _, future in batch:
+                self._inflight.pop(digest, None)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.counters['model_calls'] += calls
+        self.counters['batch_fallbacks'] += fell_back
+        try:
+            await loop.run_in_executor(
+                self.cache_executor, self.cache.put_many, [(digest, text) for (digest, _, _), text in zip(batch, texts)]
+            )
+        except Exception as e:
+            # The narrations are still good; only the cache missed out
+            print(f"Error caching narrations: {e}", file=sys.stderr)
+        for (digest, _, future), text in zip(batch, texts):
+            self._inflight.pop(digest, None)
+            if not future.done():
+                future.set_result(text)
+
+    def _messages(self, prompt: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT.format(style=self.style.replace('_', ' '))},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _complete_batch(self, prompts: List[str]) -> Tuple[List[str], int, bool]:
+        """Runs on the worker pool: one packed model call, or one per prompt.
+
+        Returns (narrations, model calls made, whether packing fell back).
+        """
+        calls = 0
+        if len(prompts) > 1:
+            calls += 1
+            messages = self._messages(json.dumps(prompts, ensure_ascii=False))
+            messages[0]['content'] += ' ' + PACKED_INSTRUCTIONS
+            reply = self.transport.complete(self.model, messages)
+            try:
+                texts = json.loads(reply[reply.index('['):reply.rindex(']') + 1])
+            except ValueError:
+                texts = None
+            if isinstance(texts, list) and len(texts) == len(prompts) and all(isinstance(text, str) for text in texts):
+                return texts, calls, False
+        texts = []
+        for prompt in prompts:
+            calls += 1
+            texts.append(self.transport.complete(self.model, self._messages(prompt)).strip())
+        return texts, calls, len(prompts) > 1
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.cache_executor.shutdown(wait=True)
+
+
+def load_config() -> Dict[str, Any]:
+    try:
+        with open(CONFIG_PATH, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def prompt_slots(data: Any) -> List[Tuple[Dict[str, Any], str, str]]:
+    """(target dict, key, prompt) for every narration prompt in a script's output."""
+    slots = []
+    for result in (data.get('results') or [data]) if isinstance(data, dict) else []:
+        prompts = result.get('narration_prompts')
+        if isinstance(prompts, dict):
+            target = prompts.setdefault('narrated', {})
+            slots += [(target, key, prompts[key]) for key in ('victory', 'level_up') if prompts.get(key)]
+        for phase in result.get('phases') or []:
+            if phase.get('narration'):
+                slots.append((phase, 'narrated', phase['narration']))
+    return slots
+
+
+async def narrate_output(client: NarrationClient, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill in the `narrated` fields of a resolve_quest.py/boss_fight.py result."""
+    slots = prompt_slots(data)
+    texts = await client.narrate_many([prompt for _, _, prompt in slots])
+    for (target, key, _), text in zip(slots, texts):
+        target[key] = text
+    return data
+
+
+class StubModelServer:
+    """Local stand-in for the chat completions endpoint (no network).
+
+    Replies are deterministic; packed batch requests get a JSON array.
+    `requests` and `prompts` count what was received.
+    """
+
+    def __init__(self, port: int = 0, latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+        self.prompts = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                reply = stub.reply(body.get('messages', []))
+                payload = json.dumps({"choices": [{"message": {"role": "assistant", "content": reply}}]}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1/chat/completions"
+
+    def reply(self, messages: List[Dict[str, str]]) -> str:
+        system = messages[0]['content'] if messages else ''
+        user = messages[-1]['content'] if messages else ''
+        prompts = json.loads(user) if PACKED_MARKER in system else [user]
+        with self._lock:
+            self.requests += 1
+            self.prompts += len(prompts)
+        if self.latency:
+            time.sleep(self.latency)
+        texts = [f"The bards recount: {prompt}" for prompt in prompts]
+        return json.dumps(texts) if PACKED_MARKER in system else texts[0]
+
+    def start(self) -> "StubModelServer":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    """Main function to narrate script output or run the stub model server."""
+    try:
+        args = sys.argv[1:]
+        command = args[0] if args else 'narrate'
+
+        if command == 'narrate':
+            data = json.load(sys.stdin)
+            client = NarrationClient()
+            try:
+                output = asyncio.run(narrate_output(client, data))
+            finally:
+                client.close()
+            print(json.dumps(output, indent=2, ensure_ascii=False))
+        elif command == 'stub':
+            latency = 0.0
+            if '--latency' in args:
+                index = args.index('--latency')
+                latency = float(args[index + 1]) / 1000
+                del args[index:index + 2]
+            stub = StubModelServer(int(args[1]) if len(args) > 1 else DEFAULT_STUB_PORT, latency)
+            print(f"Stub narration model listening on {stub.url}", file=sys.stderr)
+            try:
+                stub.server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                stub.server.server_close()
+        elif command == 'stats':
+            print(json.dumps(NarrationCache().stats(), indent=2))
+        elif command == 'clear':
+            NarrationCache().clear()
+        else:
+            raise ValueError(f"Unknown command: {command}")
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
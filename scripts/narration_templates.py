@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Narration template registry.
+
+All quest names, flavor text, victory lines, boss names and boss phase
+narration live in data/narration_templates.json. The file is read on first
+use, and each template list is compiled into bound formatters the first
+time its section (or boss type) is asked for, so rendering is a lookup
+plus one format call.
+
+Placeholders: {task} in quest names, {xp} in victory lines, {level} and
+{title} in the level-up line, and {boss}, {BOSS} (lower/upper-cased boss
+name) and {quest_name} in boss narration.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Any, List, Callable
+
+from stable_hash import stable_hash, content_digest
+
+TEMPLATES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'narration_templates.json'
+)
+
+Formatter = Callable[..., str]
+
+
+class TemplateRegistry:
+    """Lazily loaded, lazily compiled narration templates."""
+
+    def __init__(self, path: str = TEMPLATES_PATH):
+        self.path = path
+        self._data = None
+        self._fingerprint = None
+        self._compiled: Dict[tuple, List[Formatter]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        self._data = json.load(f)
+        return self._data
+
+    @property
+    def fingerprint(self) -> str:
+        """Digest of the template data, for cache keys."""
+        if self._fingerprint is None:
+            self._fingerprint = content_digest(self.data)
+        return self._fingerprint
+
+    def templates(self, *path: str, fallback: str = None) -> List[Formatter]:
+        """Compiled formatters at `path`, e.g. ('bosses', 'code_lich', '1').
+
+        If the last key is missing and `fallback` is given, the sibling
+        `fallback` entry is used instead.
+        """
+        compiled = self._compiled.get(path)
+        if compiled is None:
+            node = self.data
+            for key in path[:-1]:
+                node = node[key]
+            raw = node.get(path[-1])
+            if raw is None and fallback is not None:
+                raw = node[fallback]
+            if isinstance(raw, str):
+                raw = [raw]
+            compiled = [template.format for template in raw]
+            self._compiled[path] = compiled
+        return compiled
+
+    def template(self, *path: str) -> Formatter:
+        """The single compiled formatter at `path`."""
+        return self.templates(*path)[0]
+
+    def pick(self, seed: str, *path: str, fallback: str = None) -> Formatter:
+        """Deterministically choose one formatter from the list at `path`."""
+        choices = self.templates(*path, fallback=fallback)
+        return choices[stable_hash(seed) % len(choices)]
+
+    def boss_phase(self, boss_type: str, phase: int) -> Dict[str, Any]:
+        """Compiled phase for one boss, built on first use and cached.
+
+        The boss name is baked into the templates at compile time, so the
+        narration formatters only take `quest_name` and the victory message
+        only takes `xp`. Unknown boss types use the 'default' narration.
+        """
+        key = ('boss_phase', boss_type, phase)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            settings = self.data['boss_phases'][str(phase)]
+            templates = self.data['bosses'].get(boss_type, self.data['bosses']['default'])[str(phase)]
+            boss_name = self.data['boss_names'].get(boss_type, "The Unknown Boss")
+            names = {'boss': boss_name.lower(), 'BOSS': boss_name.upper()}
+            compiled = dict(settings)
+            compiled['narration'] = [_bake(template, names).format for template in templates]
+            compiled['challenge'] = settings['challenge'].format
+            if 'victory_message' in settings:
+                compiled['victory_message'] = _bake(settings['victory_message'], names).format
+            self._compiled[key] = compiled
+        return compiled
+
+
+def _bake(template: str, fields: Dict[str, str]) -> str:
+    """Substitute some fields now, leaving the others for format() later."""
+    for name, value in fields.items():
+        template = template.replace('{' + name + '}', value.replace('{', '{{').replace('}', '}}'))
+    return template
+
+
+registry = TemplateRegistry()
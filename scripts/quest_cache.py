@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Content-addressed on-disk cache for generated quests and boss encounters.
+
+Entries are keyed by the stable digest of everything that went into them,
+so re-running generation over unchanged input is a cache hit and any
+change to the input (or to the templates/keywords) is a miss.
+
+Layout: <directory>/<kind>/<digest[:2]>/<digest>.json
+
+Usage:
+    python3 scripts/quest_cache.py stats
+    python3 scripts/quest_cache.py clear
+"""
+
+import json
+import os
+import shutil
+import sys
+from typing import Any, Optional
+
+from stable_hash import content_digest
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'QUESTBOARD_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'cache')
+)
+
+
+class ContentCache:
+    """Digest-keyed JSON files; safe to share between processes."""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, kind: str, digest: str) -> str:
+        return os.path.join(self.directory, kind, digest[:2], digest + '.json')
+
+    def get(self, kind: str, key: Any) -> Optional[Any]:
+        """Cached value for `key`, or None on a miss."""
+        try:
+            with open(self._path(kind, content_digest(key)), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, kind: str, key: Any, value: Any):
+        """Store `value` under `key` (atomic rename, last writer wins)."""
+        path = self._path(kind, content_digest(key))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+
+    def stats(self) -> dict:
+        """Entry counts per kind."""
+        counts = {}
+        if os.path.isdir(self.directory):
+            for kind in sorted(os.listdir(self.directory)):
+                kind_dir = os.path.join(self.directory, kind)
+                counts[kind] = sum(len(files) for _, _, files in os.walk(kind_dir))
+        return counts
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def main():
+    """Main function for cache inspection and maintenance."""
+    try:
+        command = sys.argv[1] if len(sys.argv) > 1 else 'stats'
+        cache = ContentCache()
+        if command == 'stats':
+            print(json.dumps(cache.stats(), indent=2))
+        elif command == 'clear':
+            cache.clear()
+        else:
+            raise ValueError(f"Unknown command: {command}")
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Append-only, fsync'd journal of quest events with periodic snapshots.
+
+Every state change is one small appended JSON line (quest generated, quest
+completed, boss phase advanced) instead of a full rewrite of quest_log.json
+or character_sheet.md. Current state is the last snapshot plus a replay of
+the journal records after it. Writers hold an exclusive file lock, so two
+concurrent completions are serialized and neither loses XP.
+
+Once the journal tail grows past SNAPSHOT_INTERVAL records, a snapshot is
+written and the journal is compacted down to the records it doesn't cover,
+on a background thread after the triggering write has returned.
+
+Replayed state is kept in memory, keyed by the journal file and the byte
+offset read up to, so a long-lived QuestJournal only reads and applies the
+records appended since its last access (by any process). A new snapshot
+or a compacted journal from another process triggers a full replay.
+
+Usage:
+    python3 scripts/quest_journal.py state
+    python3 scripts/quest_journal.py snapshot
+    python3 scripts/quest_journal.py compact
+"""
+
+import contextlib
+import copy
+import datetime
+import fcntl
+import json
+import os
+import sys
+import threading
+from typing import Dict, Any, List, Iterator, Optional, Tuple
+
+from resolve_quest import (
+    resolve_quest_completion, resolve_quest_batch, update_aggregates, empty_aggregates, get_level_from_xp
+)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+DEFAULT_JOURNAL_DIR = os.environ.get('QUESTBOARD_JOURNAL_DIR', DATA_DIR)
+
+SNAPSHOT_INTERVAL = 500
+
+
+def empty_state() -> Dict[str, Any]:
+    """State before any journal record has been applied."""
+    return {
+        'seq': 0,
+        'xp': 0,
+        'level': 1,
+        'class': 'Unclassed',
+        'aggregates': empty_aggregates(),
+        'active_quests': {},
+        'boss_progress': {},
+        'completed_ids': {}
+    }
+
+
+def apply_record(state: Dict[str, Any], record: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply one journal record to state in place and return it."""
+    data = record.get('data', {})
+    kind = record.get('type')
+
+    if kind == 'generated':
+        for quest in data.get('quests', []):
+            state['active_quests'][quest['id']] = quest
+    elif kind == 'completed':
+        quest = data['quest']
+        state['xp'] += data.get('xp_gained', quest.get('xp_reward', 25))
+        state['level'] = get_level_from_xp(state['xp'])
+        state['aggregates'] = update_aggregates(state['aggregates'], quest)
+        state['class'] = data.get('class', state['class'])
+        state['aggregates']['class'] = state['class']
+        state['active_quests'].pop(quest.get('id'), None)
+        state['boss_progress'].pop(quest.get('id'), None)
+        state.setdefault('completed_ids', {})[quest.get('id')] = record['seq']
+    elif kind == 'boss_phase':
+        state['boss_progress'][data['quest_id']] = data['phase']
+
+    state['seq'] = record['seq']
+    return state
+
+
+class QuestJournal:
+    """Journal + snapshot pair living in one directory."""
+
+    def __init__(self, directory: str = DEFAULT_JOURNAL_DIR, snapshot_interval: int = SNAPSHOT_INTERVAL):
+        self.directory = directory
+        self.journal_path = os.path.join(directory, 'journal.ndjson')
+        self.snapshot_path = os.path.join(directory, 'snapshot.json')
+        self.lock_path = os.path.join(directory, 'journal.lock')
+        self.snapshot_interval = snapshot_interval
+        self._compactor = None
+        # Replay cache: state, records since the snapshot, and where it was read from
+        self._cache: Optional[Dict[str, Any]] = None
+        self._cache_lock = threading.RLock()
+
+    @contextlib.contextmanager
+    def _locked(self, exclusive: bool = True) -> Iterator[None]:
+        """Hold the cross-process journal lock."""
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # Reading
+
+    def _load_snapshot(self) -> Dict[str, Any]:
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return empty_state()
+
+    def _read_records(self, after_seq: int = 0) -> Iterator[Dict[str, Any]]:
+        """Yield journal records newer than `after_seq`.
+
+        A torn final line (crash mid-append) is ignored rather than fatal.
+        """
+        try:
+            f = open(self.journal_path, 'r')
+        except OSError:
+            return
+        with f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('seq', 0) > after_seq:
+                    yield record
+
+    @staticmethod
+    def _stamp(path: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            info = os.stat(path)
+        except OSError:
+            return None
+        return (info.st_ino, info.st_mtime_ns, info.st_size)
+
+    def _read_from(self, offset: int, after_seq: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Records after `offset` newer than `after_seq`, and the offset read up to.
+
+        Stops before an unterminated final line, which is either still being
+        written or torn (the next append terminates it).
+        """
+        try:
+            with open(self.journal_path, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+        except OSError:
+            return [], offset
+        end = data.rfind(b"\n") + 1
+        records = []
+        for line in data[:end].splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get('seq', 0) > after_seq:
+                records.append(record)
+        return records, offset + end
+
+    def _replay(self) -> Tuple[Dict[str, Any], int]:
+        """Snapshot + journal tail; also returns how many records were replayed.
+
+        Starts from the cached state when the snapshot and journal file are
+        the ones it was built from, so only newly appended records are read.
+        """
+        with self._cache_lock:
+            snapshot = self._stamp(self.snapshot_path)
+            journal = self._stamp(self.journal_path)
+            inode = journal[0] if journal else None
+            cache = self._cache
+            if (cache is None or cache['snapshot'] != snapshot or cache['inode'] != inode
+                    or (journal[2] if journal else 0) < cache['offset']):
+                cache = {'state': self._load_snapshot(), 'replayed': 0, 'offset': 0,
+                         'snapshot': snapshot, 'inode': inode}
+            records, cache['offset'] = self._read_from(cache['offset'], cache['state']['seq'])
+            for record in records:
+                apply_record(cache['state'], record)
+            cache['replayed'] += len(records)
+            self._cache = cache
+            return cache['state'], cache['replayed']
+
+    def state(self) -> Dict[str, Any]:
+        """Rebuild current state from the last snapshot and the journal tail."""
+        with self._locked(exclusive=False), self._cache_lock:
+            return copy.deepcopy(self._replay()[0])
+
+    # Writing
+
+    @staticmethod
+    def _check_not_completed(state: Dict[str, Any], quests: List[Dict[str, Any]]):
+        """Reject quests whose ID is already completed (or repeated in the batch)."""
+        completed = state.get('completed_ids', {})
+        seen = set()
+        for quest in quests:
+            quest_id = quest.get('id')
+            if quest_id in completed or quest_id in seen:
+                raise ValueError(f"Quest {quest_id} is already completed")
+            seen.add(quest_id)
+
+    def _append(self, records: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Append records in one write and fsync; returns the journal's (inode, size)."""
+        payload = ''.join(json.dumps(record) + "\n" for record in records).encode()
+        fd = os.open(self.journal_path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            size = os.fstat(fd).st_size
+            if size and os.pread(fd, 1, size - 1) != b"\n":
+                # Terminate a torn line so it can't swallow this record
+                payload = b"\n" + payload
+            os.write(fd, payload)
+            os.fsync(fd)
+            info = os.fstat(fd)
+        finally:
+            os.close(fd)
+        return info.st_ino, info.st_size
+
+    def _record(self, state: Dict[str, Any], kind: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        record = {
+            'seq': state['seq'] + 1,
+            'type': kind,
+            'ts': datetime.datetime.now().isoformat() + "Z",
+            'data': data
+        }
+        apply_record(state, record)
+        return record
+
+    def _commit(self, state: Dict[str, Any], records: List[Dict[str, Any]], replayed: int):
+        with self._cache_lock:
+            try:
+                inode, size = self._append(records)
+            except Exception:
+                # `state` already has the records applied; rebuild it next time
+                self._cache = None
+                raise
+            if self._cache is not None and self._cache['state'] is state:
+                self._cache.update(inode=inode, offset=size, replayed=replayed + len(records))
+        if replayed + len(records) >= self.snapshot_interval:
+            self.compact_in_background()
+
+    def record_generated(self, quests: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Journal a batch of newly generated quests."""
+        with self._locked():
+            state, replayed = self._replay()
+            record = self._record(state, 'generated', {'quests': quests})
+            self._commit(state, [record], replayed)
+        return state
+
+    def record_boss_phase(self, quest_id: str, phase: int) -> Dict[str, Any]:
+        """Journal a boss fight moving to `phase`."""
+        with self._locked():
+            state, replayed = self._replay()
+            record = self._record(state, 'boss_phase', {'quest_id': quest_id, 'phase': phase})
+            self._commit(state, [record], replayed)
+        return state
+
+    def complete(self, quest: Dict[str, Any], stats: Dict[str, int] = None) -> Dict[str, Any]:
+        """Resolve a completion against journaled state and append it.
+
+        Read, resolve and append all happen under the exclusive lock, so
+        concurrent completions see each other's XP. A quest ID that is
+        already completed is rejected, so a retried request can't award
+        its XP twice.
+        """
+        with self._locked():
+            state, replayed = self._replay()
+            self._check_not_completed(state, [quest])
+            character_sheet = {
+                'xp': state['xp'],
+                'level': state['level'],
+                'class': state['class']
+            }
+            if stats:
+                character_sheet['stats'] = stats
+            result = resolve_quest_completion(quest, character_sheet, aggregates=state['aggregates'])
+            record = self._record(state, 'completed', {
+                'quest': result['quest_completed'],
+                'xp_gained': result['xp_gained'],
+                'class': result['class']
+            })
+            self._commit(state, [record], replayed)
+        return result
+
+    def complete_batch(self, quests: List[Dict[str, Any]], stats: Dict[str, int] = None) -> Dict[str, Any]:
+        """Resolve an ordered burst of completions (see resolve_quest_batch) and append them together."""
+        with self._locked():
+            state, replayed = self._replay()
+            self._check_not_completed(state, quests)
+            character_sheet = {
+                'xp': state['xp'],
+                'level': state['level'],
+                'class': state['class']
+            }
+            if stats:
+                character_sheet['stats'] = stats
+            result = resolve_quest_batch(quests, character_sheet, aggregates=state['aggregates'])
+            records = [
+                self._record(state, 'completed', {
+                    'quest': item['quest_completed'],
+                    'xp_gained': item['xp_gained'],
+                    'class': item['class']
+                })
+                for item in result['results']
+            ]
+            self._commit(state, records, replayed)
+        return result
+
+    # Snapshots and compaction
+
+    def _write_atomic(self, path: str, content: str):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Write a snapshot of current state (the journal is left alone)."""
+        with self._locked(), self._cache_lock:
+            state = self._replay()[0]
+            self._write_atomic(self.snapshot_path, json.dumps(state))
+            self._cache.update(snapshot=self._stamp(self.snapshot_path), replayed=0)
+            return copy.deepcopy(state)
+
+    def compact(self) -> Dict[str, Any]:
+        """Snapshot current state and drop journal records it covers."""
+        with self._locked(), self._cache_lock:
+            state = self._replay()[0]
+            self._write_atomic(self.snapshot_path, json.dumps(state))
+            tail = ''.join(json.dumps(record) + "\n" for record in self._read_records(state['seq']))
+            self._write_atomic(self.journal_path, tail)
+            # The cached state is the snapshot; resume from the new journal's start
+            journal = self._stamp(self.journal_path)
+            self._cache.update(snapshot=self._stamp(self.snapshot_path), inode=journal[0] if journal else None,
+                               offset=0, replayed=0)
+            return copy.deepcopy(state)
+
+    def compact_in_background(self):
+        """Compact on a worker thread unless one is already running."""
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self.compact, name='journal-compactor')
+        self._compactor.start()
+
+
+def main():
+    """Main function for journal inspection and maintenance."""
+    try:
+        command = sys.argv[1] if len(sys.argv) > 1 else 'state'
+        journal = QuestJournal()
+
+        if command == 'state':
+            result = journal.state()
+        elif command == 'snapshot':
+            result = journal.snapshot()
+        elif command == 'compact':
+            result = journal.compact()
+        else:
+            raise ValueError(f"Unknown command: {command}")
+
+        print(json.dumps(result, indent=2))
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
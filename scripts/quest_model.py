@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Compact quest representations for large histories.
+
+`Quest` is a typed record with __slots__ and interned enum-like values
+(category, difficulty, status, source). `QuestTable` stores many quests
+column-wise: enum columns as small integer codes, numbers in `array`
+buffers, and text in plain lists, so a multi-year history costs a fraction
+of the equivalent list of dicts and stat passes run over flat arrays.
+
+Both convert losslessly to and from the JSON quest shape produced by
+generate_quests.py, including missing keys, nulls and unknown extra keys.
+"""
+
+import sys
+from array import array
+from typing import Dict, Any, List, Iterable, Iterator, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Field order matches generate_quest_from_event's output
+FIELDS = (
+    'id', 'name', 'description', 'difficulty', 'xp_reward', 'category',
+    'is_boss', 'source', 'source_id', 'created_at', 'completed_at', 'status',
+    'original_title', 'duration_minutes', 'deadline'
+)
+ENUM_FIELDS = ('difficulty', 'category', 'status', 'source')
+INT_FIELDS = ('xp_reward', 'duration_minutes')
+TEXT_FIELDS = ('id', 'name', 'description', 'source_id', 'created_at', 'completed_at', 'original_title', 'deadline')
+
+_MISSING = object()
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Quest:
+    """A single quest with fixed attributes instead of a per-quest dict."""
+
+    __slots__ = FIELDS + ('extra',)
+
+    def __init__(self, **fields: Any):
+        for field in FIELDS:
+            value = fields.pop(field, _MISSING)
+            if field in ENUM_FIELDS:
+                value = _intern(value)
+            setattr(self, field, value)
+        # Keys outside the known shape are kept so round-trips are lossless
+        self.extra = fields or None
+
+    @classmethod
+    def from_dict(cls, quest: Dict[str, Any]) -> "Quest":
+        return cls(**quest)
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {}
+        for field in FIELDS:
+            value = getattr(self, field)
+            if value is not _MISSING:
+                result[field] = value
+        if self.extra:
+            result.update(self.extra)
+        return result
+
+    def get(self, field: str, default: Any = None) -> Any:
+        """dict.get-style access so Quest can stand in for a quest dict."""
+        value = getattr(self, field, _MISSING) if field in FIELDS else (self.extra or {}).get(field, _MISSING)
+        return default if value is _MISSING else value
+
+    def __getitem__(self, field: str) -> Any:
+        value = self.get(field, _MISSING)
+        if value is _MISSING:
+            raise KeyError(field)
+        return value
+
+    def __setitem__(self, field: str, value: Any):
+        if field in FIELDS:
+            setattr(self, field, _intern(value) if field in ENUM_FIELDS else value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[field] = value
+
+    def __contains__(self, field: str) -> bool:
+        return self.get(field, _MISSING) is not _MISSING
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Quest) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"Quest(id={self.get('id')!r}, name={self.get('name')!r}, status={self.get('status')!r})"
+
+
+class QuestTable:
+    """Column-oriented store for a large number of quests."""
+
+    def __init__(self, quests: Iterable[Any] = ()):
+        # Enum columns: integer codes into a per-column vocabulary
+        self._vocab = {field: [] for field in ENUM_FIELDS}
+        self._codes = {field: {} for field in ENUM_FIELDS}
+        self._enum = {field: array('H') for field in ENUM_FIELDS}
+        self._ints = {field: array('q') for field in INT_FIELDS}
+        self._text: Dict[str, List[Optional[str]]] = {field: [] for field in TEXT_FIELDS}
+        # 0 = False, 1 = True, 2 = null
+        self._is_boss = array('b')
+        # Bit i set when FIELDS[i] was absent from the source dict
+        self._missing = array('L')
+        self._extra: Dict[int, Dict[str, Any]] = {}
+        self.extend(quests)
+
+    def __len__(self) -> int:
+        return len(self._missing)
+
+    def _code(self, field: str, value: Any) -> int:
+        codes = self._codes[field]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self._vocab[field])
+            self._vocab[field].append(_intern(value))
+        return code
+
+    def append(self, quest: Any):
+        """Add one quest (a dict or a Quest)."""
+        if isinstance(quest, Quest):
+            quest = quest.to_dict()
+        missing = 0
+        for index, field in enumerate(FIELDS):
+            if field not in quest:
+                missing |= 1 << index
+        row = len(self)
+
+        for field in ENUM_FIELDS:
+            self._enum[field].append(self._code(field, quest.get(field)))
+        for field in INT_FIELDS:
+            value = quest.get(field)
+            if value is None or isinstance(value, bool) or not isinstance(value, int):
+                # Rare: non-integer or null value; keep it verbatim
+                self._extra.setdefault(row, {})[field] = value
+                value = 0
+            self._ints[field].append(value)
+        for field in TEXT_FIELDS:
+            self._text[field].append(quest.get(field))
+        is_boss = quest.get('is_boss')
+        self._is_boss.append(2 if is_boss is None else int(bool(is_boss)))
+        if is_boss is not None and not isinstance(is_boss, bool):
+            self._extra.setdefault(row, {})['is_boss'] = is_boss
+        self._missing.append(missing)
+
+        extra = {key: value for key, value in quest.items() if key not in FIELDS}
+        if extra:
+            self._extra.setdefault(row, {})['__extra__'] = extra
+
+    def extend(self, quests: Iterable[Any]):
+        for quest in quests:
+            self.append(quest)
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """Rebuild the original JSON-shaped dict for one row."""
+        if index < 0:
+            index += len(self)
+        missing = self._missing[index]
+        overrides = self._extra.get(index, {})
+        result = {}
+        for bit, field in enumerate(FIELDS):
+            if missing & (1 << bit):
+                continue
+            if field in overrides:
+                result[field] = overrides[field]
+            elif field in ENUM_FIELDS:
+                result[field] = self._vocab[field][self._enum[field][index]]
+            elif field in INT_FIELDS:
+                result[field] = self._ints[field][index]
+            elif field == 'is_boss':
+                flag = self._is_boss[index]
+                result[field] = None if flag == 2 else bool(flag)
+            else:
+                result[field] = self._text[field][index]
+        if '__extra__' in overrides:
+            result.update(overrides['__extra__'])
+        return result
+
+    def __getitem__(self, index: int) -> Quest:
+        return Quest.from_dict(self.row(index))
+
+    def __iter__(self) -> Iterator[Quest]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [self.row(index) for index in range(len(self))]
+
+    # Analytics over the flat columns
+
+    def column(self, field: str) -> Any:
+        """A numeric or code column; a NumPy view when NumPy is installed."""
+        if field in ENUM_FIELDS:
+            values = self._enum[field]
+        elif field in INT_FIELDS:
+            values = self._ints[field]
+        elif field == 'is_boss':
+            values = self._is_boss
+        else:
+            raise KeyError(f"{field} is not a numeric column")
+        if np is not None:
+            return np.frombuffer(values, dtype=values.typecode) if len(values) else np.array([], dtype=values.typecode)
+        return values
+
+    def value_counts(self, field: str) -> Dict[Any, int]:
+        """Occurrences of each value of an enum column."""
+        codes = self._enum[field]
+        vocab = self._vocab[field]
+        if np is not None and len(codes):
+            counts = np.bincount(self.column(field), minlength=len(vocab))
+        else:
+            counts = [0] * len(vocab)
+            for code in codes:
+                counts[code] += 1
+        return {vocab[code]: int(count) for code, count in enumerate(counts) if count}
+
+    def category_counts(self) -> Dict[str, int]:
+        """Quests per category, with quest.get('category', 'misc') semantics."""
+        counts = self.value_counts('category')
+        bit = 1 << FIELDS.index('category')
+        absent = sum(1 for missing in self._missing if missing & bit)
+        if absent:
+            # Absent keys were coded as None; move them to 'misc'
+            counts[None] -= absent
+            if not counts[None]:
+                del counts[None]
+            counts['misc'] = counts.get('misc', 0) + absent
+        return counts
+
+    def total_xp(self) -> int:
+        return int(sum(self._ints['xp_reward']))
+
+    def xp_by_category(self) -> Dict[Any, int]:
+        """Total XP reward per category value."""
+        vocab = self._vocab['category']
+        totals = [0] * len(vocab)
+        for code, xp in zip(self._enum['category'], self._ints['xp_reward']):
+            totals[code] += xp
+        return {vocab[code]: total for code, total in enumerate(totals) if total}
+
+
+def quests_from_dicts(quests: Iterable[Dict[str, Any]]) -> List[Quest]:
+    return [Quest.from_dict(quest) for quest in quests]
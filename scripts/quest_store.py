@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Indexed SQLite storage for quests, replacing the flat arrays in
+data/quest_log.json.
+
+Quests are stored whole as JSON, with the fields we query on (id,
+source_id, status, category, created_at, completed_at, name) copied into
+indexed columns. The aggregate counters and boss queue live alongside.
+
+Usage:
+    python3 scripts/quest_store.py migrate [quest_log.json]
+    python3 scripts/quest_store.py history [limit]
+    python3 scripts/quest_store.py today [YYYY-MM-DD]
+    python3 scripts/quest_store.py source <source_id>
+"""
+
+import datetime
+import json
+import os
+import sqlite3
+import sys
+from typing import Callable, Dict, Any, List, Optional
+
+from resolve_quest import build_aggregates, empty_aggregates
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+QUEST_LOG_PATH = os.path.join(DATA_DIR, 'quest_log.json')
+DEFAULT_DB_PATH = os.environ.get('QUESTBOARD_DB', os.path.join(DATA_DIR, 'quest_log.db'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quests (
+    id TEXT PRIMARY KEY,
+    source_id TEXT,
+    name TEXT,
+    status TEXT NOT NULL,
+    category TEXT,
+    created_at TEXT,
+    completed_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_quests_source_id ON quests (source_id);
+CREATE INDEX IF NOT EXISTS idx_quests_name ON quests (name);
+CREATE INDEX IF NOT EXISTS idx_quests_status_created ON quests (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_quests_category ON quests (category);
+CREATE INDEX IF NOT EXISTS idx_quests_completed_at ON quests (completed_at);
+
+CREATE TABLE IF NOT EXISTS boss_queue (
+    position INTEGER PRIMARY KEY AUTOINCREMENT,
+    quest_id TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class QuestStore:
+    """Quest log backed by an indexed SQLite database."""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Writes
+
+    def save_quest(self, quest: Dict[str, Any]):
+        """Insert or replace a single quest."""
+        self.save_quests([quest])
+
+    def save_quests(self, quests: List[Dict[str, Any]]):
+        """Insert or replace quests in one transaction."""
+        with self.conn:
+            self._write_quests(quests)
+
+    def _write_quests(self, quests: List[Dict[str, Any]]):
+        rows = [
+            (
+                quest['id'],
+                quest.get('source_id') or None,
+                quest.get('name'),
+                quest.get('status', 'active'),
+                quest.get('category'),
+                quest.get('created_at'),
+                quest.get('completed_at'),
+                json.dumps(quest)
+            )
+            for quest in quests
+        ]
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO quests "
+            "(id, source_id, name, status, category, created_at, completed_at, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+    def _write_meta(self, key: str, value: Any):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            (key, json.dumps(value))
+        )
+
+    def record_completion(self, quest: Dict[str, Any], aggregates: Dict[str, Any]):
+        """Persist a resolved quest and the updated aggregates atomically.
+
+        Raises ValueError if the stored quest is no longer active, so the
+        same completion can't be counted twice.
+        """
+        self.record_completions([quest], aggregates)
+
+    def record_completions(self, quests: List[Dict[str, Any]], aggregates: Dict[str, Any]):
+        """Persist a batch of resolved quests and the final aggregates atomically."""
+        with self.conn:
+            # Take the write lock before the status check so two completions
+            # of the same quest can't both pass it
+            self.conn.execute("BEGIN IMMEDIATE")
+            self._check_active(quests)
+            self._write_completions(quests, aggregates)
+
+    def complete(self, quests: List[Dict[str, Any]],
+                 resolve: Callable[[List[Dict[str, Any]], Dict[str, Any]], Dict[str, Any]]) -> Dict[str, Any]:
+        """Resolve completions against the stored aggregates and persist them.
+
+        `resolve(quests, aggregates)` returns a resolve_quest_batch result
+        (or a resolve_quest_completion result for a single quest). The
+        aggregates are read, resolved and written back under one write
+        lock, so concurrent completions don't overwrite each other's
+        counters.
+        """
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self._check_active(quests)
+            result = resolve(quests, self.get_aggregates())
+            completed = [item['quest_completed'] for item in result.get('results', [result])]
+            self._write_completions(completed, result['aggregates'])
+        return result
+
+    def _check_active(self, quests: List[Dict[str, Any]]):
+        for quest in quests:
+            row = self.conn.execute("SELECT status FROM quests WHERE id = ?", (quest['id'],)).fetchone()
+            if row is not None and row[0] != 'active':
+                raise ValueError(f"Quest {quest['id']} is already {row[0]}")
+
+    def _write_completions(self, quests: List[Dict[str, Any]], aggregates: Dict[str, Any]):
+        self._write_quests(quests)
+        self._write_meta('aggregates', aggregates)
+        self.conn.executemany("DELETE FROM boss_queue WHERE quest_id = ?", [(quest['id'],) for quest in quests])
+
+    def enqueue_boss(self, quest_id: str):
+        """Append a boss quest to the queue (no-op if already queued)."""
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO boss_queue (quest_id) VALUES (?)", (quest_id,))
+
+    def set_meta(self, key: str, value: Any):
+        with self.conn:
+            self._write_meta(key, value)
+
+    # Reads
+
+    def _fetch(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        return [json.loads(row[0]) for row in self.conn.execute(sql, params)]
+
+    def _fetch_one(self, sql: str, params: tuple = ()) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(sql, params).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def get_aggregates(self) -> Dict[str, Any]:
+        return self.get_meta('aggregates', empty_aggregates())
+
+    def quest_by_id(self, quest_id: str) -> Optional[Dict[str, Any]]:
+        return self._fetch_one("SELECT data FROM quests WHERE id = ?", (quest_id,))
+
+    def quest_by_source_id(self, source_id: str) -> Optional[Dict[str, Any]]:
+        """Most recently created quest for a calendar event."""
+        return self._fetch_one(
+            "SELECT data FROM quests WHERE source_id = ? ORDER BY created_at DESC LIMIT 1",
+            (source_id,)
+        )
+
+    def quest_by_name(self, name: str, status: str = 'active') -> Optional[Dict[str, Any]]:
+        """Look up a quest by its RPG name or original title (for /complete)."""
+        quest = self._fetch_one(
+            "SELECT data FROM quests WHERE name = ? AND status = ? ORDER BY created_at DESC LIMIT 1",
+            (name, status)
+        )
+        if quest is None:
+            # Fall back to the original event title, which isn't indexed
+            for candidate in self.active_quests():
+                if candidate.get('original_title') == name:
+                    return candidate
+        return quest
+
+    def active_quests(self) -> List[Dict[str, Any]]:
+        return self._fetch("SELECT data FROM quests WHERE status = 'active' ORDER BY created_at")
+
+    def active_quests_for_day(self, day: datetime.date = None) -> List[Dict[str, Any]]:
+        """Active quests created on the given day (default today)."""
+        day = day or datetime.date.today()
+        start = day.isoformat()
+        end = (day + datetime.timedelta(days=1)).isoformat()
+        return self._fetch(
+            "SELECT data FROM quests WHERE status = 'active' AND created_at >= ? AND created_at < ? "
+            "ORDER BY created_at",
+            (start, end)
+        )
+
+    def recent_completions(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Last `limit` completed quests, newest first (for /history)."""
+        return self._fetch(
+            "SELECT data FROM quests WHERE completed_at IS NOT NULL ORDER BY completed_at DESC LIMIT ?",
+            (limit,)
+        )
+
+    def completions_by_category(self, category: str) -> List[Dict[str, Any]]:
+        return self._fetch(
+            "SELECT data FROM quests WHERE category = ? AND completed_at IS NOT NULL ORDER BY completed_at",
+            (category,)
+        )
+
+    def boss_queue(self) -> List[Dict[str, Any]]:
+        return self._fetch(
+            "SELECT q.data FROM boss_queue b JOIN quests q ON q.id = b.quest_id ORDER BY b.position"
+        )
+
+    def next_boss(self) -> Optional[Dict[str, Any]]:
+        return self._fetch_one(
+            "SELECT q.data FROM boss_queue b JOIN quests q ON q.id = b.quest_id ORDER BY b.position LIMIT 1"
+        )
+
+    def find_quest(self, lookup: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Resolve a {"quest_id" | "source_id" | "quest_name": ...} reference."""
+        if lookup.get('quest_id'):
+            return self.quest_by_id(lookup['quest_id'])
+        if lookup.get('source_id'):
+            return self.quest_by_source_id(lookup['source_id'])
+        if lookup.get('quest_name'):
+            return self.quest_by_name(lookup['quest_name'])
+        return None
+
+
+def migrate_from_json(json_path: str = QUEST_LOG_PATH, db_path: str = DEFAULT_DB_PATH) -> Dict[str, int]:
+    """One-shot import of quest_log.json into the SQLite store."""
+    with open(json_path, 'r') as f:
+        quest_log = json.load(f)
+
+    active = quest_log.get('active_quests', [])
+    completed = quest_log.get('completed_quests', [])
+    aggregates = quest_log.get('aggregates') or build_aggregates(completed)
+
+    with QuestStore(db_path) as store:
+        store.save_quests(active + completed)
+        for entry in quest_log.get('boss_queue', []):
+            quest_id = entry.get('id') if isinstance(entry, dict) else entry
+            if quest_id:
+                store.enqueue_boss(quest_id)
+        store.set_meta('aggregates', aggregates)
+        store.set_meta('daily_generated', quest_log.get('daily_generated'))
+
+    return {
+        "active_quests": len(active),
+        "completed_quests": len(completed),
+        "boss_queue": len(quest_log.get('boss_queue', []))
+    }
+
+
+def main():
+    """Main function for store maintenance and queries."""
+    try:
+        if len(sys.argv) < 2:
+            print(__doc__, file=sys.stderr)
+            sys.exit(1)
+
+        command = sys.argv[1]
+        arg = sys.argv[2] if len(sys.argv) > 2 else None
+
+        if command == 'migrate':
+            result = migrate_from_json(arg or QUEST_LOG_PATH)
+        else:
+            with QuestStore() as store:
+                if command == 'history':
+                    result = store.recent_completions(int(arg) if arg else 10)
+                elif command == 'today':
+                    day = datetime.date.fromisoformat(arg) if arg else None
+                    result = store.active_quests_for_day(day)
+                elif command == 'source' and arg:
+                    result = store.quest_by_source_id(arg)
+                else:
+                    raise ValueError(f"Unknown command: {command}")
+
+        print(json.dumps(result, indent=2))
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Resident quest engine daemon and thin client.
+
+`questboard.py serve` keeps the quest engine loaded and listens on a local
+Unix socket speaking a JSON-lines protocol. Every other subcommand is a
+drop-in replacement for the matching script invocation: it reads the same
+stdin payload, forwards it to the daemon and prints the same JSON output.
+If no daemon is running the client falls back to resolving in-process.
+
+The engine loads data/quest_log.json and data/character_sheet.md once at
+startup. Responses are the scripts' output and nothing is written back (the
+agent persists results as usual); with --write-through the daemon instead
+writes every completion to both files itself, so a restart picks up where
+it left off.
+
+Usage:
+    python3 scripts/questboard.py serve [--schedule] [--write-through] [socket_path]
+    python3 scripts/questboard.py generate [file] < calendar_events.json
+    python3 scripts/questboard.py resolve < resolve_input.json
+    python3 scripts/questboard.py boss < boss_input.json
+    python3 scripts/questboard.py board [YYYY-MM-DD]
+
+With --schedule the daemon also runs the board scheduler (see
+scheduler.py), which has each day's board rendered before
+`quest_generation_time`; `board` returns a stored board (default today).
+
+Add --profile to report per-stage timings on exit (see instrumentation.py);
+for `serve` the report covers every request the daemon handled.
+
+Protocol (one JSON object per line, in both directions):
+    -> {"id": 1, "method": "generate", "params": <generate_quests.py input>}
+    <- {"id": 1, "result": [...]}
+    <- {"id": 1, "error": "message"}
+"""
+
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from typing import Dict, Any, List
+
+from calendar_dates import expand_events, is_expansion_error
+from generate_quests import generate_quest_from_event, report_expansion_error
+from resolve_quest import resolve_quest_completion, resolve_quest_batch, build_aggregates
+from boss_fight import generate_boss_encounter
+from character_sheet import CHARACTER_SHEET_PATH, CharacterSheetFile, character_from_sheet
+from instrumentation import strip_profile_args
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), 'data')
+QUEST_LOG_PATH = os.path.join(DATA_DIR, 'quest_log.json')
+
+DEFAULT_SOCKET_PATH = os.environ.get(
+    'QUESTBOARD_SOCKET',
+    os.path.join(DATA_DIR, 'questboard.sock')
+)
+
+
+def events_from_payload(data: Any) -> List[Dict[str, Any]]:
+    """Normalize the accepted calendar input shapes into a list of events."""
+    if isinstance(data, dict) and 'items' in data:
+        # Google Calendar API format
+        return data['items']
+    elif isinstance(data, list):
+        # Direct list of events
+        return data
+    else:
+        # Single event
+        return [data]
+
+
+class QuestEngine:
+    """In-memory quest engine shared by every daemon connection."""
+
+    def __init__(self, quest_log_path: str = QUEST_LOG_PATH, character_sheet_path: str = CHARACTER_SHEET_PATH,
+                 write_through: bool = False):
+        self.quest_log_path = quest_log_path
+        self.write_through = write_through
+        self.quest_log = self._load_quest_log()
+        self.sheet_file = CharacterSheetFile(character_sheet_path)
+        self.character_sheet: Dict[str, Any] = self._load_character_sheet()
+        self.lock = threading.Lock()
+
+    def _load_character_sheet(self) -> Dict[str, Any]:
+        try:
+            return character_from_sheet(self.sheet_file.load())
+        except (OSError, ValueError, KeyError):
+            return {}
+
+    def _write_through(self, result: Dict[str, Any], completed: List[Dict[str, Any]]):
+        """Persist completions to the quest log and character sheet (--write-through only)."""
+        if not self.write_through:
+            return
+        done = {quest.get('id') for quest in completed}
+        self.quest_log['active_quests'] = [quest for quest in self.quest_log.get('active_quests', []) if quest.get('id') not in done]
+        tmp_path = self.quest_log_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.quest_log, f, indent=2)
+        os.replace(tmp_path, self.quest_log_path)
+        self.sheet_file.record_resolution(result)
+
+    def _load_quest_log(self) -> Dict[str, Any]:
+        """Load the quest log once at startup, with sensible defaults."""
+        try:
+            with open(self.quest_log_path, 'r') as f:
+                quest_log = json.load(f)
+        except (OSError, ValueError):
+            quest_log = {
+                "active_quests": [],
+                "completed_quests": [],
+                "daily_generated": None,
+                "boss_queue": []
+            }
+        if 'aggregates' not in quest_log:
+            quest_log['aggregates'] = build_aggregates(quest_log.get('completed_quests', []))
+        return quest_log
+
+    def generate(self, params: Any) -> List[Dict[str, Any]]:
+        """Generate quests for every event, isolating per-event failures.
+
+        Recurring events are expanded over today, as generate_quests.py does.
+        """
+        quests = []
+        for event in expand_events(events_from_payload(params)):
+            if is_expansion_error(event):
+                report_expansion_error(event)
+                continue
+            try:
+                quests.append(generate_quest_from_event(event))
+            except Exception as e:
+                print(f"Error processing event: {e}", file=sys.stderr)
+        return quests
+
+    def resolve(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Resolve a completion against the warm character sheet and history.
+
+        `character_sheet` and `aggregates` may be omitted, in which case the
+        daemon's cached copies are used. Either way the cache is updated with
+        the outcome so the next call can send only the quest.
+        """
+        if 'quests' in params:
+            return self.resolve_batch(params)
+        quest = params.get('quest', {})
+        with self.lock:
+            character_sheet = params.get('character_sheet', self.character_sheet)
+            if 'completed_quests' in params:
+                aggregates = params.get('aggregates')
+                result = resolve_quest_completion(quest, character_sheet, params['completed_quests'], aggregates)
+            else:
+                aggregates = params.get('aggregates', self.quest_log['aggregates'])
+                result = resolve_quest_completion(quest, character_sheet, aggregates=aggregates)
+
+            self.quest_log['completed_quests'].append(result['quest_completed'])
+            self.quest_log['aggregates'] = result['aggregates']
+            self._write_through(result, [result['quest_completed']])
+            self.character_sheet = {
+                'xp': result['new_total_xp'],
+                'level': result['new_level'],
+                'class': result['class'],
+                'stats': character_sheet.get('stats', {
+                    'STR': 10, 'DEX': 10, 'CON': 10,
+                    'INT': 10, 'WIS': 10, 'CHA': 10
+                })
+            }
+        return result
+
+    def resolve_batch(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Resolve an ordered burst of completions against the warm state."""
+        with self.lock:
+            character_sheet = params.get('character_sheet', self.character_sheet)
+            aggregates = params.get('aggregates', self.quest_log['aggregates'])
+            result = resolve_quest_batch(params['quests'], character_sheet, params.get('completed_quests'), aggregates)
+
+            completed = [item['quest_completed'] for item in result['results']]
+            self.quest_log['completed_quests'].extend(completed)
+            self.quest_log['aggregates'] = result['aggregates']
+            self._write_through(result, completed)
+            self.character_sheet = {
+                'xp': result['character_sheet']['xp'],
+                'level': result['character_sheet']['level'],
+                'class': result['character_sheet']['class'],
+                'stats': character_sheet.get('stats', {
+                    'STR': 10, 'DEX': 10, 'CON': 10,
+                    'INT': 10, 'WIS': 10, 'CHA': 10
+                })
+            }
+        return result
+
+    def boss(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate a boss encounter, defaulting to the warm character sheet."""
+        quest = params.get('quest', {})
+        character_sheet = params.get('character_sheet', self.character_sheet)
+        return generate_boss_encounter(quest, character_sheet)
+
+    def board(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a pre-rendered board (a pure read of data/boards/)."""
+        import datetime
+        from calendar_dates import get_timezone
+        from scheduler import load_board
+        day = params.get('date') if isinstance(params, dict) else None
+        day = datetime.date.fromisoformat(day) if day else datetime.datetime.now(get_timezone()).date()
+        board = load_board(day)
+        if board is None:
+            raise ValueError(f"No board for {day.isoformat()}")
+        return board
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Dispatch a single protocol request to the matching method."""
+        methods = {
+            'generate': self.generate,
+            'resolve': self.resolve,
+            'boss': self.boss,
+            'board': self.board
+        }
+        method = methods.get(request.get('method'))
+        if method is None:
+            return {"id": request.get('id'), "error": f"Unknown method: {request.get('method')}"}
+        try:
+            return {"id": request.get('id'), "result": method(request.get('params', {}))}
+        except Exception as e:
+            return {"id": request.get('id'), "error": str(e)}
+
+
+class QuestRequestHandler(socketserver.StreamRequestHandler):
+    """Serve JSON-lines requests until the client closes the connection."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                response = {"id": None, "error": f"Invalid JSON: {e}"}
+            else:
+                response = self.server.engine.handle(request)
+            self.wfile.write((json.dumps(response) + "\n").encode())
+            self.wfile.flush()
+
+
+class QuestServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded Unix socket server holding a single warm QuestEngine."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, engine: QuestEngine):
+        self.engine = engine
+        super().__init__(socket_path, QuestRequestHandler)
+
+
+def serve(socket_path: str = DEFAULT_SOCKET_PATH, schedule: bool = False, write_through: bool = False):
+    """Run the daemon until interrupted."""
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = QuestServer(socket_path, QuestEngine(write_through=write_through))
+    scheduler = None
+    if schedule:
+        from scheduler import BoardScheduler
+        scheduler = BoardScheduler().start()
+    print(f"Quest engine listening on {socket_path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if scheduler is not None:
+            scheduler.stop()
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def call(method: str, params: Any, socket_path: str = DEFAULT_SOCKET_PATH) -> Any:
+    """Send one request to the daemon and return its result.
+
+    Raises OSError when no daemon is listening and RuntimeError when the
+    daemon reports an error.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        with sock.makefile('rwb') as stream:
+            stream.write((json.dumps({"id": 1, "method": method, "params": params}) + "\n").encode())
+            stream.flush()
+            response = json.loads(stream.readline())
+    if 'error' in response:
+        raise RuntimeError(response['error'])
+    return response['result']
+
+
+def main():
+    """Main function to run the daemon or act as a thin client."""
+    try:
+        args = strip_profile_args(sys.argv[1:])
+        if not args:
+            print(__doc__, file=sys.stderr)
+            sys.exit(1)
+
+        command = args[0]
+        if command == 'serve':
+            schedule = '--schedule' in args
+            write_through = '--write-through' in args
+            args = [arg for arg in args if arg not in ('--schedule', '--write-through')]
+            serve(args[1] if len(args) > 1 else DEFAULT_SOCKET_PATH, schedule, write_through)
+            return
+
+        if command not in ('generate', 'resolve', 'boss', 'board'):
+            raise ValueError(f"Unknown command: {command}")
+
+        # Read input from stdin or argument, exactly like the scripts do
+        if command == 'board':
+            params = {"date": args[1] if len(args) > 1 else None}
+        elif command == 'generate' and len(args) > 1:
+            with open(args[1], 'r') as f:
+                params = json.load(f)
+        else:
+            params = json.load(sys.stdin)
+
+        try:
+            result = call(command, params)
+        except OSError:
+            # No daemon running; resolve in-process instead
+            result = QuestEngine().handle({"method": command, "params": params})
+            if 'error' in result:
+                raise RuntimeError(result['error'])
+            result = result['result']
+
+        print(json.dumps(result, indent=2))
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,38 +3,59 @@
 Resolve quest completion, calculate XP, level-ups, and stat changes.
 Accepts quest ID and character sheet data as input.
 Outputs JSON with resolution results and narration prompts.
+
+Send the "aggregates" block from quest_log.json instead of the whole
+completed_quests history; the updated block comes back in the result.
+Run with --rebuild-aggregates [quest_log.json] to recompute the block
+from history after manual edits.
+
+With --store, the quest is looked up in the SQLite quest store by
+"quest_id", "source_id" or "quest_name", aggregates are read from the
+store, and the completion is written back to it in the same transaction.
+
+Send "quests" (an ordered list) instead of "quest" to resolve a burst of
+completions in one call; see resolve_quest_batch. This works with --store
+(items may be quests or lookups) and --journal too, and the batch is
+written in one transaction or append.
+
+With --journal, the character state comes from the append-only journal
+(see quest_journal.py) and the completion is appended to it.
+
+With --achievements, the result also gets an "achievements" block (new
+unlocks and the day streak, see achievements.py).
+
+With --profile (or QUESTBOARD_PROFILE), per-stage timings are reported on
+exit (see instrumentation.py).
 """
 
 import json
 import sys
 import datetime
 import hashlib
+import os
 from typing import Dict, Any, List, Tuple
 
-# XP thresholds from RPG system
-XP_THRESHOLDS = {
-    1: 0, 2: 100, 3: 300, 4: 600, 5: 1000,
-    6: 1500, 7: 2100, 8: 2800, 9: 3600, 10: 4500
-}
+from narration_templates import registry
+from quest_model import QuestTable
+from instrumentation import timed, span, incr, strip_profile_args
+from level_curve import MAX_TABLE_LEVEL, level_from_xp, xp_for_level, xp_to_next_level
+
+QUEST_LOG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'quest_log.json'
+)
+
+# XP thresholds from RPG system (levels 11+ follow the closed-form tail)
+XP_THRESHOLDS = {level: xp_for_level(level) for level in range(1, MAX_TABLE_LEVEL + 1)}
 
+@timed('xp_level')
 def get_level_from_xp(xp: int) -> int:
     """Calculate level from total XP."""
-    level = 1
-    for lvl, threshold in XP_THRESHOLDS.items():
-        if xp >= threshold:
-            level = lvl
-        else:
-            break
-    return level
+    return level_from_xp(xp)
 
+@timed('xp_level')
 def get_xp_to_next_level(current_level: int, current_xp: int) -> int:
     """Calculate XP needed to reach next level."""
-    if current_level >= 10:
-        # Level 11+ needs 1000 XP per level
-        next_level_threshold = XP_THRESHOLDS[10] + (current_level - 10) * 1000
-    else:
-        next_level_threshold = XP_THRESHOLDS.get(current_level + 1, 1000)
-    return next_level_threshold - current_xp
+    return xp_to_next_level(current_level, current_xp)
 
 def get_stat_from_category(category: str) -> str:
     """Map quest category to primary stat."""
@@ -60,40 +81,81 @@ def get_class_from_category(category: str) -> str:
     }
     return class_map.get(category, 'Ranger')
 
-def calculate_stat_bonuses(completed_quests: List[Dict[str, Any]]) -> Dict[str, int]:
-    """Calculate stat bonuses based on quest completion history."""
-    stat_counts = {
-        'STR': 0, 'DEX': 0, 'CON': 0,
-        'INT': 0, 'WIS': 0, 'CHA': 0
+def empty_aggregates() -> Dict[str, Any]:
+    """Return a zeroed aggregate block."""
+    return {
+        'total_completed': 0,
+        'category_counts': {
+            'coding': 0, 'meeting': 0, 'writing': 0,
+            'exercise': 0, 'research': 0, 'misc': 0
+        },
+        'stat_counts': {
+            'STR': 0, 'DEX': 0, 'CON': 0,
+            'INT': 0, 'WIS': 0, 'CHA': 0
+        },
+        'class': 'Unclassed'
     }
-    
-    for quest in completed_quests:
-        category = quest.get('category', 'misc')
-        stat = get_stat_from_category(category)
-        stat_counts[stat] += 1
-    
-    # +1 for every 5 completions in that category
-    bonuses = {}
-    for stat, count in stat_counts.items():
-        bonuses[stat] = count // 5
-    
-    return bonuses
 
-def determine_class(completed_quests: List[Dict[str, Any]]) -> str:
-    """Determine class based on most-completed quest category."""
-    category_counts = {
-        'coding': 0, 'meeting': 0, 'writing': 0,
-        'exercise': 0, 'research': 0, 'misc': 0
+@timed('stat_aggregation')
+def update_aggregates(aggregates: Dict[str, Any], quest: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of the aggregate block with one more completed quest."""
+    category = quest.get('category', 'misc')
+    stat = get_stat_from_category(category)
+
+    category_counts = dict(aggregates.get('category_counts', {}))
+    category_counts[category] = category_counts.get(category, 0) + 1
+    stat_counts = dict(aggregates.get('stat_counts', {}))
+    stat_counts[stat] = stat_counts.get(stat, 0) + 1
+
+    return {
+        'total_completed': aggregates.get('total_completed', 0) + 1,
+        'category_counts': category_counts,
+        'stat_counts': stat_counts,
+        'class': aggregates.get('class', 'Unclassed')
     }
-    
-    for quest in completed_quests:
-        category = quest.get('category', 'misc')
-        category_counts[category] += 1
-    
-    # Find category with most completions
+
+def build_aggregates(completed_quests: List[Dict[str, Any]], character_class: str = 'Unclassed') -> Dict[str, Any]:
+    """Rebuild the aggregate block from a full completion history.
+
+    `completed_quests` may also be a QuestTable, in which case the counts
+    come straight from its category column.
+    """
+    aggregates = empty_aggregates()
+    if isinstance(completed_quests, QuestTable):
+        for category, count in completed_quests.category_counts().items():
+            stat = get_stat_from_category(category)
+            aggregates['category_counts'][category] = aggregates['category_counts'].get(category, 0) + count
+            aggregates['stat_counts'][stat] = aggregates['stat_counts'].get(stat, 0) + count
+            aggregates['total_completed'] += count
+    else:
+        for quest in completed_quests:
+            aggregates = update_aggregates(aggregates, quest)
+    aggregates['class'] = character_class
+    return aggregates
+
+@timed('stat_aggregation')
+def stat_bonuses_from_aggregates(aggregates: Dict[str, Any]) -> Dict[str, int]:
+    """+1 for every 5 completions mapped to each stat."""
+    stat_counts = empty_aggregates()['stat_counts']
+    stat_counts.update(aggregates.get('stat_counts', {}))
+    return {stat: count // 5 for stat, count in stat_counts.items()}
+
+@timed('stat_aggregation')
+def class_from_aggregates(aggregates: Dict[str, Any]) -> str:
+    """Class for the most-completed category in the aggregate block."""
+    category_counts = empty_aggregates()['category_counts']
+    category_counts.update(aggregates.get('category_counts', {}))
     max_category = max(category_counts, key=category_counts.get)
     return get_class_from_category(max_category)
 
+def calculate_stat_bonuses(completed_quests: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Calculate stat bonuses based on quest completion history."""
+    return stat_bonuses_from_aggregates(build_aggregates(completed_quests))
+
+def determine_class(completed_quests: List[Dict[str, Any]]) -> str:
+    """Determine class based on most-completed quest category."""
+    return class_from_aggregates(build_aggregates(completed_quests))
+
 def get_level_title(level: int, character_class: str = "Unclassed") -> str:
     """Get title based on level and class."""
     if character_class == "Unclassed":
@@ -118,45 +180,20 @@ def get_level_title(level: int, character_class: str = "Unclassed") -> str:
     
     return titles.get(level, "Legendary")
 
+@timed('template_render')
 def generate_narration_prompt(quest: Dict[str, Any], xp_gained: int, leveled_up: bool, new_level: int = None) -> Dict[str, str]:
     """Generate narration prompts for the agent."""
     difficulty = quest.get('difficulty', 'easy')
     category = quest.get('category', 'misc')
     quest_name = quest.get('name', 'Unknown Quest')
     
-    # Victory narration templates
-    victory_templates = {
-        'easy': [
-            "The scroll has been delivered. A minor task, perhaps, but even the mightiest adventurer began by clearing rats from a cellar. +{xp} XP.",
-            "A small victory, but victory nonetheless. The path to greatness is paved with such moments. +{xp} XP.",
-            "Task completed with practiced efficiency. You grow stronger with each challenge overcome. +{xp} XP."
-        ],
-        'medium': [
-            "Through skill and determination, you have emerged victorious from this challenge. The townsfolk nod in approval. +{xp} XP.",
-            "The obstacle has been overcome. Your reputation grows with each successful endeavor. +{xp} XP.",
-            "Well done, adventurer. This quest tested your mettle, and you did not disappoint. +{xp} XP."
-        ],
-        'hard': [
-            "Through sheer force of will, you have conquered this formidable challenge. The bards will sing of this day! +{xp} XP.",
-            "A true test of your abilities, and you have risen to the occasion. Legends are built on such victories. +{xp} XP.",
-            "The odds were against you, but you persevered. This triumph will be remembered. +{xp} XP."
-        ],
-        'boss': [
-            "THE BEAST IS DEAD. holy shit. +{xp} XP.",
-            "actually impossible. you did that. +{xp} XP.",
-            "VICTORY! somehow you pulled it off. +{xp} XP."
-        ]
-    }
-    
     # Level up narration
     level_up_narration = ""
     if leveled_up:
-        level_up_narration = f"A golden light envelops you as raw power surges through your being. You have ascended to Level {new_level}! New title unlocked: {get_level_title(new_level)}. The road ahead grows darker, but so does your resolve."
+        level_up_narration = registry.template('level_up')(level=new_level, title=get_level_title(new_level))
     
     # Select appropriate template
-    templates = victory_templates.get(difficulty, victory_templates['easy'])
-    base_narration = templates[hash(quest_name) % len(templates)]
-    victory_narration = base_narration.format(xp=xp_gained)
+    victory_narration = registry.pick(quest_name, 'victory', difficulty, fallback='easy')(xp=xp_gained)
     
     return {
         "victory": victory_narration,
@@ -166,9 +203,31 @@ def generate_narration_prompt(quest: Dict[str, Any], xp_gained: int, leveled_up:
         "category": category
     }
 
-def resolve_quest_completion(quest: Dict[str, Any], character_sheet: Dict[str, Any], all_completed_quests: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Main function to resolve quest completion."""
-    
+def mark_deadline(quest: Dict[str, Any], now: datetime.datetime = None):
+    """Flag a completion as early or late against the quest's `deadline`.
+
+    Quests without a (parseable) deadline get neither flag.
+    """
+    try:
+        deadline = datetime.datetime.fromisoformat(quest['deadline'].replace('Z', '+00:00'))
+    except (KeyError, AttributeError, ValueError):
+        return
+    if deadline.tzinfo is None:
+        deadline = deadline.replace(tzinfo=datetime.timezone.utc)
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    quest['completed_early'] = now <= deadline
+    quest['missed_deadline'] = now > deadline
+
+def resolve_quest_completion(quest: Dict[str, Any], character_sheet: Dict[str, Any], all_completed_quests: List[Dict[str, Any]] = None, aggregates: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Main function to resolve quest completion.
+
+    Pass the persisted `aggregates` block to resolve in O(1); the full
+    `all_completed_quests` history is only scanned when no aggregates are
+    given. The updated block is returned under "aggregates".
+    """
+    if aggregates is None:
+        aggregates = build_aggregates(all_completed_quests or [], character_sheet.get('class', 'Unclassed'))
+
     # Extract current stats
     current_xp = character_sheet.get('xp', 0)
     current_level = character_sheet.get('level', 1)
@@ -185,17 +244,19 @@ def resolve_quest_completion(quest: Dict[str, Any], character_sheet: Dict[str, A
     # Update quest completion
     quest['completed_at'] = datetime.datetime.now().isoformat() + "Z"
     quest['status'] = 'completed'
+    mark_deadline(quest)
     
-    # Add to completed quests list
-    updated_completed = all_completed_quests + [quest]
+    # Fold the quest into the running counters
+    updated_aggregates = update_aggregates(aggregates, quest)
     
     # Calculate stat bonuses
-    stat_bonuses = calculate_stat_bonuses(updated_completed)
+    stat_bonuses = stat_bonuses_from_aggregates(updated_aggregates)
     
     # Determine class (at level 3+)
-    character_class = character_sheet.get('class', 'Unclassed')
+    character_class = character_sheet.get('class', aggregates.get('class', 'Unclassed'))
     if new_level >= 3 and character_class == 'Unclassed':
-        character_class = determine_class(updated_completed)
+        character_class = class_from_aggregates(updated_aggregates)
+    updated_aggregates['class'] = character_class
     
     # Update stats
     base_stats = character_sheet.get('stats', {
@@ -224,27 +285,133 @@ def resolve_quest_completion(quest: Dict[str, Any], character_sheet: Dict[str, A
         "title": get_level_title(new_level, character_class),
         "updated_stats": updated_stats,
         "stat_changes": stat_bonuses,
-        "total_quests_completed": len(updated_completed),
-        "narration_prompts": narration
+        "total_quests_completed": updated_aggregates['total_completed'],
+        "narration_prompts": narration,
+        "aggregates": updated_aggregates
     }
     
     return result
 
+def resolve_quest_batch(quests: List[Dict[str, Any]], character_sheet: Dict[str, Any], all_completed_quests: List[Dict[str, Any]] = None, aggregates: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Resolve an ordered burst of completions in one pass.
+
+    Each quest is resolved against the character state left by the one
+    before it, so level-ups and class assignment land on the right quest.
+    History (if no aggregates are given) is scanned once for the batch.
+    """
+    if aggregates is None:
+        aggregates = build_aggregates(all_completed_quests or [], character_sheet.get('class', 'Unclassed'))
+
+    sheet = dict(character_sheet)
+    results = []
+    for quest in quests:
+        previous_class = sheet.get('class', aggregates.get('class', 'Unclassed'))
+        result = resolve_quest_completion(quest, sheet, aggregates=aggregates)
+        aggregates = result.pop('aggregates')
+        result['class_assigned'] = result['class'] != previous_class
+        results.append(result)
+
+        sheet['xp'] = result['new_total_xp']
+        sheet['level'] = result['new_level']
+        sheet['class'] = result['class']
+
+    final_sheet = {
+        'xp': sheet.get('xp', 0),
+        'level': sheet.get('level', 1),
+        'class': sheet.get('class', aggregates.get('class', 'Unclassed')),
+        'title': results[-1]['title'] if results else get_level_title(sheet.get('level', 1), sheet.get('class', 'Unclassed')),
+        'xp_to_next_level': get_xp_to_next_level(sheet.get('level', 1), sheet.get('xp', 0)),
+        'stats': results[-1]['updated_stats'] if results else sheet.get('stats', {})
+    }
+
+    return {
+        "results": results,
+        "total_xp_gained": sum(result['xp_gained'] for result in results),
+        "level_ups": [result['new_level'] for result in results if result['leveled_up']],
+        "character_sheet": final_sheet,
+        "total_quests_completed": aggregates['total_completed'],
+        "aggregates": aggregates
+    }
+
+def active_store_quest(store, quest: Dict[str, Any], lookup: Dict[str, Any]) -> Dict[str, Any]:
+    """`quest`, or the store's match for `lookup`, checked to still be active."""
+    quest = quest or store.find_quest(lookup)
+    if not quest:
+        raise ValueError("Quest not found in store")
+    stored = store.quest_by_id(quest.get('id'))
+    if stored is not None and stored.get('status', 'active') != 'active':
+        raise ValueError(f"Quest {quest['id']} is already {stored['status']}")
+    return quest
+
+def rebuild_aggregates(quest_log_path: str = QUEST_LOG_PATH) -> Dict[str, Any]:
+    """Recompute the aggregate block in quest_log.json from its history."""
+    with open(quest_log_path, 'r') as f:
+        quest_log = json.load(f)
+
+    character_class = quest_log.get('aggregates', {}).get('class', 'Unclassed')
+    quest_log['aggregates'] = build_aggregates(quest_log.get('completed_quests', []), character_class)
+
+    with open(quest_log_path, 'w') as f:
+        json.dump(quest_log, f, indent=2)
+    return quest_log['aggregates']
+
 def main():
     """Main function to process input and resolve quest."""
     try:
+        args = strip_profile_args(sys.argv[1:])
+        if args and args[0] == '--rebuild-aggregates':
+            path = args[1] if len(args) > 1 else QUEST_LOG_PATH
+            print(json.dumps(rebuild_aggregates(path), indent=2))
+            return
+
         # Read input from stdin
-        input_data = json.load(sys.stdin)
+        with span('input_parse'):
+            input_data = json.load(sys.stdin)
         
         quest = input_data.get('quest', {})
         character_sheet = input_data.get('character_sheet', {})
         completed_quests = input_data.get('completed_quests', [])
+        aggregates = input_data.get('aggregates')
         
-        # Resolve quest completion
-        result = resolve_quest_completion(quest, character_sheet, completed_quests)
+        if '--journal' in args:
+            from quest_journal import QuestJournal
+            journal = QuestJournal()
+            if 'quests' in input_data:
+                result = journal.complete_batch(input_data['quests'], character_sheet.get('stats'))
+            else:
+                result = journal.complete(quest, character_sheet.get('stats'))
+        elif '--store' in args:
+            from quest_store import QuestStore
+            with QuestStore() as store:
+                if 'quests' in input_data:
+                    # Items are quests, or {"quest_id" | "source_id" | "quest_name": ...} lookups
+                    quests = [active_store_quest(store, item if item.get('id') else None, item) for item in input_data['quests']]
+                    ids = [quest['id'] for quest in quests]
+                    if len(set(ids)) != len(ids):
+                        raise ValueError("The same quest appears more than once in the batch")
+                    result = store.complete(quests, lambda batch, aggregates: resolve_quest_batch(
+                        batch, character_sheet, aggregates=aggregates))
+                else:
+                    quest = active_store_quest(store, quest, input_data)
+                    result = store.complete([quest], lambda batch, aggregates: resolve_quest_completion(
+                        batch[0], character_sheet, aggregates=aggregates))
+        elif 'quests' in input_data:
+            # Resolve a burst of completions in one pass
+            result = resolve_quest_batch(input_data['quests'], character_sheet, completed_quests, aggregates)
+        else:
+            # Resolve quest completion
+            result = resolve_quest_completion(quest, character_sheet, completed_quests, aggregates)
         
+        incr('quests_resolved', len(input_data['quests']) if 'quests' in input_data else 1)
+
+        if '--achievements' in args:
+            from achievements import process_result
+            result['achievements'] = process_result(result)
+
         # Output result
-        print(json.dumps(result, indent=2))
+        with span('output_serialize'):
+            output = json.dumps(result, indent=2)
+        print(output)
         
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+In-process scheduler that has each day's quest board ready before
+`quest_generation_time`.
+
+Boards are keyed by local date in the configured `timezone`. Until a
+day's generation time passes, that day is the target; afterwards the
+next day is, and its board is built right away from the event feed. The
+feed file is polled for changes (mtime and size); a missing or
+half-written feed keeps the last events. On a change, the target
+board is refreshed incrementally: events are fingerprinted as in
+calendar_sync.py. Quests are regenerated only for new or changed events,
+and changed events keep their quest ID and created_at. Boss encounters
+are re-rendered only when their quest or the player level moved. At
+generation time the board is stamped as published (and, with --post, sent
+to `output_channel` through webhook_dispatcher.py).
+An event that fails to generate is listed in the board's `errors` (and
+counted in `stats`) and keeps its quest from the previous build, if any.
+If the scheduler starts after today's generation time, today's board is
+built and published on the first tick.
+
+Boards are stored as data/boards/<YYYY-MM-DD>.json (QUESTBOARD_BOARD_DIR
+to override), so `/quests` is a pure read of an already rendered file.
+The feed is data/events.json (QUESTBOARD_EVENT_FEED or `event_feed` in
+config.json), in any shape generate_quests.py accepts. Only events that
+start on the board's day are included; recurring events are expanded over
+that day.
+
+Usage:
+    python3 scripts/scheduler.py run [--post] [--poll SECONDS]
+    python3 scripts/scheduler.py refresh [YYYY-MM-DD]
+    python3 scripts/scheduler.py board [YYYY-MM-DD]
+
+`questboard.py serve --schedule` runs the same scheduler inside the daemon.
+"""
+
+import datetime
+import json
+import os
+import sys
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+from boss_fight import encounter_cache_key, generate_boss_encounter
+from calendar_dates import expand_events, get_timezone, is_expansion_error, parse_event_time
+from calendar_sync import event_fingerprint
+from generate_quests import generate_quest_from_event
+from stable_hash import content_digest
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+CONFIG_PATH = os.path.join(DATA_DIR, 'config.json')
+BOARD_DIR = os.environ.get('QUESTBOARD_BOARD_DIR', os.path.join(DATA_DIR, 'boards'))
+
+DEFAULT_GENERATION_TIME = '08:00'
+POLL_INTERVAL = 60.0
+KEEP_DAYS = 14
+
+
+def load_config() -> Dict[str, Any]:
+    try:
+        with open(CONFIG_PATH, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def feed_path(config: Dict[str, Any]) -> str:
+    path = os.environ.get('QUESTBOARD_EVENT_FEED') or config.get('event_feed') or os.path.join(DATA_DIR, 'events.json')
+    return os.path.join(DATA_DIR, path) if not os.path.isabs(path) else path
+
+
+def parse_generation_time(value: str) -> datetime.time:
+    hours, _, minutes = (value or DEFAULT_GENERATION_TIME).partition(':')
+    return datetime.time(int(hours), int(minutes or 0))
+
+
+def publish_time(day: datetime.date, at: datetime.time, tz: datetime.tzinfo) -> datetime.datetime:
+    """`at` on `day`, local wall-clock time (so it follows DST)."""
+    return datetime.datetime.combine(day, at, tzinfo=tz)
+
+
+def target_day(now: datetime.datetime, at: datetime.time, tz: datetime.tzinfo) -> datetime.date:
+    """The next day whose board has not been published yet."""
+    local = now.astimezone(tz)
+    today = local.date()
+    return today if local < publish_time(today, at, tz) else today + datetime.timedelta(days=1)
+
+
+def board_path(day: datetime.date, directory: str = BOARD_DIR) -> str:
+    return os.path.join(directory, f"{day.isoformat()}.json")
+
+
+def load_board(day: datetime.date, directory: str = BOARD_DIR) -> Optional[Dict[str, Any]]:
+    try:
+        with open(board_path(day, directory), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_board(board: Dict[str, Any], directory: str = BOARD_DIR):
+    os.makedirs(directory, exist_ok=True)
+    path = board_path(datetime.date.fromisoformat(board['date']), directory)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(board, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def prune_boards(today: datetime.date, directory: str = BOARD_DIR, keep_days: int = KEEP_DAYS):
+    """Delete boards older than `keep_days`."""
+    cutoff = (today - datetime.timedelta(days=keep_days)).isoformat()
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+    for name in names:
+        if name.endswith('.json') and name[:-5] < cutoff:
+            os.unlink(os.path.join(directory, name))
+
+
+def events_for_day(events: List[Dict[str, Any]], day: datetime.date, tz: datetime.tzinfo,
+                   errors: List[Dict[str, Any]] = None) -> List[Tuple[datetime.datetime, Dict[str, Any]]]:
+    """(start, event) for events starting on `day`, in start order.
+
+    Recurring events that can't be expanded are appended to `errors`.
+    """
+    window_start = datetime.datetime(day.year, day.month, day.day, tzinfo=tz)
+    window_end = window_start + datetime.timedelta(days=1)
+    selected = []
+    for event in expand_events(events, window_start, window_end):
+        if is_expansion_error(event):
+            if errors is not None:
+                errors.append({"source_id": event['source_id'], "error": event['error']})
+            continue
+        if not isinstance(event, dict) or event.get('status') == 'cancelled':
+            continue
+        try:
+            start, _ = parse_event_time(event.get('start', {}), tz)
+        except (ValueError, TypeError, AttributeError):
+            continue
+        if start is not None and window_start <= start < window_end:
+            selected.append((start, event))
+    selected.sort(key=lambda item: item[0])
+    return selected
+
+
+def build_board(events: List[Dict[str, Any]], day: datetime.date, tz: datetime.tzinfo, previous: Dict[str, Any] = None,
+                character_sheet: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Board for `day`, reusing whatever `previous` already rendered."""
+    character_sheet = character_sheet or {}
+    previous = previous or {}
+    previous_sources = previous.get('sources', {})
+    previous_quests = {quest['id']: quest for quest in previous.get('quests', [])}
+    previous_encounters = previous.get('boss_encounters', {})
+
+    quests, encounters, sources, errors = [], {}, {}, []
+    day_end = datetime.datetime(day.year, day.month, day.day, tzinfo=tz) + datetime.timedelta(days=1)
+    day_end = day_end.astimezone(datetime.timezone.utc).isoformat().replace('+00:00', 'Z')
+    stats = {"reused": 0, "generated": 0, "regenerated": 0, "encounters_rendered": 0, "removed": 0, "errors": 0}
+    expansion_errors = []
+    for _, event in events_for_day(events, day, tz, expansion_errors):
+        source_id = event.get('id')
+        try:
+            fingerprint = event_fingerprint(event)
+            source_id = source_id or f"anon:{fingerprint}"
+            if source_id in sources:
+                continue
+            entry = previous_sources.get(source_id)
+            quest = previous_quests.get(entry['quest_id']) if entry else None
+            source = {"fingerprint": fingerprint, "quest_id": None}
+            if quest is not None and entry['fingerprint'] == fingerprint:
+                counter = 'reused'
+            else:
+                fresh = generate_quest_from_event(event)
+                if not fresh.get('deadline'):
+                    # The board is built ahead of time; the quest is due by the end of its day
+                    fresh['deadline'] = day_end
+                if quest is not None:
+                    fresh['id'] = quest['id']
+                    fresh['created_at'] = quest['created_at']
+                    counter = 'regenerated'
+                else:
+                    counter = 'generated'
+                quest = fresh
+            source['quest_id'] = quest['id']
+
+            encounter = None
+            if quest.get('is_boss'):
+                key = content_digest(encounter_cache_key(quest, character_sheet))
+                encounter = previous_encounters.get(quest['id'])
+                if encounter is None or (entry or {}).get('encounter_key') != key:
+                    encounter = generate_boss_encounter(quest, character_sheet)
+                    stats['encounters_rendered'] += 1
+                source['encounter_key'] = key
+        except Exception as e:
+            # One bad event mustn't cost the whole board; keep what the last
+            # build had for it so the next refresh retries
+            stats['errors'] += 1
+            errors.append({"source_id": source_id, "error": str(e)})
+            entry = previous_sources.get(source_id) if source_id else None
+            quest = previous_quests.get(entry['quest_id']) if entry else None
+            if quest is None or source_id in sources:
+                continue
+            source, counter = entry, 'reused'
+            encounter = previous_encounters.get(quest['id'])
+
+        stats[counter] += 1
+        quests.append(quest)
+        sources[source_id] = source
+        if encounter is not None:
+            encounters[quest['id']] = encounter
+
+    # A recurring event that failed to expand keeps the instances the last
+    # build rendered for it, like any other failing event
+    for error in expansion_errors:
+        stats['errors'] += 1
+        errors.append(error)
+        prefix = f"{error['source_id']}_"
+        for source_id, entry in previous_sources.items():
+            quest = previous_quests.get(entry['quest_id'])
+            if error['source_id'] and source_id.startswith(prefix) and source_id not in sources and quest is not None:
+                quests.append(quest)
+                sources[source_id] = entry
+                stats['reused'] += 1
+                if quest['id'] in previous_encounters:
+                    encounters[quest['id']] = previous_encounters[quest['id']]
+    stats['removed'] = len(set(previous_sources) - set(sources))
+
+    return {
+        "date": day.isoformat(),
+        "timezone": str(tz),
+        "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat().replace('+00:00', 'Z'),
+        "published_at": previous.get('published_at'),
+        "quests": quests,
+        "boss_encounters": encounters,
+        "sources": sources,
+        "stats": stats,
+        "errors": errors
+    }
+
+
+class BoardScheduler:
+    """Keeps the upcoming board built and fresh on a background thread."""
+
+    def __init__(self, config: Dict[str, Any] = None, directory: str = BOARD_DIR, poll_interval: float = POLL_INTERVAL,
+                 on_publish=None):
+        config = config if config is not None else load_config()
+        self.tz = get_timezone(config.get('timezone'))
+        self.at = parse_generation_time(config.get('quest_generation_time'))
+        self.feed = feed_path(config)
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self.on_publish = on_publish
+        self.day: Optional[datetime.date] = None
+        self._stamp = None
+        self._events: List[Dict[str, Any]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.lock = threading.Lock()
+
+    def _feed_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.feed)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_feed(self) -> bool:
+        """Reload the feed if it changed; True if it did.
+
+        A missing feed (e.g. mid-rename) or one that doesn't parse (still
+        being written) counts as no change, so the last events are kept
+        and the boards already built aren't emptied.
+        """
+        stamp = self._feed_stamp()
+        if stamp is None or stamp == self._stamp:
+            return False
+        from questboard import events_from_payload
+        try:
+            with open(self.feed, 'r') as f:
+                events = events_from_payload(json.load(f))
+        except (OSError, ValueError) as e:
+            # Re-read once the file changes again
+            self._stamp = stamp
+            print(f"Error reading feed {self.feed}: {e}", file=sys.stderr)
+            return False
+        self._stamp, self._events = stamp, events
+        return True
+
+    def _character_sheet(self) -> Dict[str, Any]:
+        try:
+            from character_sheet import CharacterSheetFile, character_from_sheet
+            return character_from_sheet(CharacterSheetFile().load())
+        except (OSError, ValueError, KeyError):
+            return {}
+
+    def refresh(self, day: datetime.date) -> Dict[str, Any]:
+        """Rebuild `day`'s board incrementally from the current feed and save it."""
+        board = build_board(self._events, day, self.tz, load_board(day, self.directory), self._character_sheet())
+        save_board(board, self.directory)
+        return board
+
+    def publish(self, day: datetime.date, now: datetime.datetime = None):
+        board = load_board(day, self.directory) or self.refresh(day)
+        if board.get('published_at') is None:
+            now = now or datetime.datetime.now(datetime.timezone.utc)
+            board['published_at'] = now.astimezone(datetime.timezone.utc).isoformat().replace('+00:00', 'Z')
+            save_board(board, self.directory)
+            if self.on_publish is not None:
+                try:
+                    self.on_publish(board)
+                except Exception as e:
+                    print(f"Error publishing board for {board['date']}: {e}", file=sys.stderr)
+        prune_boards(day, self.directory)
+
+    def tick(self, now: datetime.datetime = None) -> datetime.datetime:
+        """Do whatever is due at `now`; returns when the next publish is due."""
+        now = now or datetime.datetime.now(self.tz)
+        with self.lock:
+            changed = self._read_feed()
+            day = target_day(now, self.at, self.tz)
+            if self.day is not None and day > self.day:
+                # The previous target's generation time has passed
+                if changed:
+                    self.refresh(self.day)
+                self.publish(self.day, now)
+            elif self.day is None and day > now.astimezone(self.tz).date():
+                # Started after today's generation time: today's board is
+                # still owed, so build it if missing and publish it late
+                self.publish(day - datetime.timedelta(days=1), now)
+            if day != self.day or changed or not os.path.exists(board_path(day, self.directory)):
+                self.refresh(day)
+            self.day = day
+        return publish_time(day, self.at, self.tz)
+
+    def run(self):
+        """Tick until stopped, waking for feed polls and at generation time."""
+        while not self._stop.is_set():
+            try:
+                due = self.tick()
+                wait = (due - datetime.datetime.now(self.tz)).total_seconds()
+            except Exception as e:
+                print(f"Error: scheduler tick failed: {e}", file=sys.stderr)
+                wait = self.poll_interval
+            self._stop.wait(min(max(wait, 0.0), self.poll_interval))
+
+    def start(self) -> "BoardScheduler":
+        self._thread = threading.Thread(target=self.run, name='board-scheduler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def post_board(board: Dict[str, Any]):
+    """Send a published board's quests to `output_channel`."""
+    import asyncio
+    from webhook_dispatcher import format_quest, load_channels, send_entries
+    channels, default = load_channels()
+    if not default:
+        return
+    report = asyncio.run(send_entries(channels, default, [format_quest(quest) for quest in board['quests']]))
+    if report['errors']:
+        raise RuntimeError('; '.join(report['errors']))
+
+
+def parse_day(args: List[str], default: datetime.date) -> datetime.date:
+    return datetime.date.fromisoformat(args[0]) if args else default
+
+
+def main():
+    """Main function to run the scheduler or read and refresh boards."""
+    try:
+        args = sys.argv[1:]
+        command = args[0] if args else 'board'
+
+        if command == 'run':
+            poll = POLL_INTERVAL
+            if '--poll' in args:
+                poll = float(args[args.index('--poll') + 1])
+            scheduler = BoardScheduler(poll_interval=poll, on_publish=post_board if '--post' in args else None)
+            print(f"Scheduler: boards published daily at {scheduler.at.strftime('%H:%M')} {scheduler.tz}", file=sys.stderr)
+            try:
+                scheduler.run()
+            except KeyboardInterrupt:
+                pass
+        elif command == 'refresh':
+            scheduler = BoardScheduler()
+            scheduler._read_feed()
+            board = scheduler.refresh(parse_day(args[1:], target_day(datetime.datetime.now(scheduler.tz), scheduler.at, scheduler.tz)))
+            print(json.dumps({"date": board['date'], "quests": len(board['quests']), **board['stats']}, indent=2))
+        elif command == 'board':
+            tz = get_timezone()
+            day = parse_day(args[1:], datetime.datetime.now(tz).date())
+            board = load_board(day)
+            if board is None:
+                raise ValueError(f"No board for {day.isoformat()}; run `scheduler.py refresh {day.isoformat()}`")
+            print(json.dumps(board, indent=2, ensure_ascii=False))
+        else:
+            raise ValueError(f"Unknown command: {command}")
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
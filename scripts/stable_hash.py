@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Stable hashing shared by all scripts.
+
+Python's built-in hash() is salted per process, so anything chosen with it
+(quest names, narration, boss phases) changed on every run. These helpers
+give fixed digests instead, so the same input always renders the same
+output and can be cached.
+"""
+
+import hashlib
+import json
+from typing import Any
+
+
+def stable_hash(value: str) -> int:
+    """Fixed 32-bit hash of a string (same scheme roll_d20 uses)."""
+    return int(hashlib.md5(value.encode()).hexdigest()[:8], 16)
+
+
+def content_digest(value: Any) -> str:
+    """Hex digest of any JSON-serializable value, independent of key order."""
+    canonical = json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
@@ -0,0 +1,575 @@
+#!/usr/bin/env python3
+"""
+Asyncio dispatcher for Discord/Slack/Telegram-style webhooks.
+
+Posting a team's morning board one synchronous request per quest opens a
+connection per post and runs straight into the platforms' rate limits.
+The dispatcher instead:
+
+- keeps a pool of keep-alive HTTP/1.1 connections per host
+  (MAX_CONNECTIONS_PER_HOST), reused across channels and messages;
+- rate-limits each channel with a token bucket sized to its platform
+  (Discord webhooks allow 5 posts per 2 s, Slack and Telegram about 1/s);
+- packs queued entries (quests, narrations) into as few messages as fit
+  the platform's size limit, splitting any entry that is too long alone;
+- retries 429s after Retry-After (and drains the channel's bucket), and
+  retries 5xx/connection errors with jittered exponential backoff.
+
+Channels are configured under `webhooks` in data/config.json:
+
+    "webhooks": {
+        "discord": {"platform": "discord", "url": "https://discord.com/api/webhooks/..."},
+        "team-slack": {"platform": "slack", "url": "...", "rate": 1, "burst": 1}
+    }
+
+A channel without a `url` reads it from QUESTBOARD_WEBHOOK_<NAME>, for
+example QUESTBOARD_WEBHOOK_DISCORD. Telegram channels also need a
+`chat_id`.
+
+Usage:
+    python3 scripts/webhook_dispatcher.py send [channel] < messages.json
+    python3 scripts/webhook_dispatcher.py standin [port] [--rate N] [--burst N] [--latency MS] [--fail-every N]
+
+`send` takes a JSON list of strings or quest objects (or {"quests": [...]}
+as printed by generate_quests.py), defaulting to `output_channel`.
+`standin` runs a local webhook server that enforces a rate limit and can
+inject failures, for tests and throughput measurement (see
+benchmarks/bench_webhook_dispatcher.py).
+"""
+
+import asyncio
+import json
+import os
+import random
+import ssl
+import sys
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+CONFIG_PATH = os.path.join(DATA_DIR, 'config.json')
+
+PLATFORMS = {
+    # platform: (message size limit, rate per second, burst)
+    'discord': (2000, 2.5, 5),
+    'slack': (4000, 1.0, 1),
+    'telegram': (4096, 1.0, 3),
+    'generic': (4000, 5.0, 5),
+}
+MAX_CONNECTIONS_PER_HOST = 4
+IDLE_TIMEOUT = 30.0
+REQUEST_TIMEOUT = 15.0
+BATCH_WINDOW = 0.05
+MAX_RETRIES = 5
+BASE_DELAY = 0.5
+MAX_DELAY = 30.0
+ENTRY_SEPARATOR = '\n\n'
+DEFAULT_STANDIN_PORT = 8766
+
+
+class WebhookError(Exception):
+    """A message could not be delivered."""
+
+
+class TokenBucket:
+    """Token bucket for one channel; `pause` honors a server Retry-After."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """Make the next token available no sooner than `seconds` from now."""
+        self._refill()
+        self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections per (scheme, host, port)."""
+
+    def __init__(self, max_per_host: int = MAX_CONNECTIONS_PER_HOST, timeout: float = REQUEST_TIMEOUT):
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.opened = 0
+        self.requests = 0
+        self._idle: Dict[Tuple[str, str, int], List[Tuple[asyncio.StreamReader, asyncio.StreamWriter, float]]] = {}
+        self._slots: Dict[Tuple[str, str, int], asyncio.Semaphore] = {}
+        self._ssl = None
+
+    async def _connect(self, key: Tuple[str, str, int]):
+        scheme, host, port = key
+        if scheme == 'https' and self._ssl is None:
+            self._ssl = ssl.create_default_context()
+        self.opened += 1
+        return await asyncio.open_connection(host, port, ssl=self._ssl if scheme == 'https' else None)
+
+    def _checkout_idle(self, key):
+        idle = self._idle.get(key, [])
+        while idle:
+            reader, writer, since = idle.pop()
+            if time.monotonic() - since < IDLE_TIMEOUT and not reader.at_eof() and not writer.is_closing():
+                return reader, writer
+            writer.close()
+        return None
+
+    async def request(self, url: str, body: bytes, headers: Dict[str, str] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """POST `body` to `url`; returns (status, lower-cased headers, body)."""
+        parts = urlsplit(url)
+        scheme = parts.scheme or 'http'
+        key = (scheme, parts.hostname, parts.port or (443 if scheme == 'https' else 80))
+        target = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        host_header = parts.hostname if parts.port is None else f'{parts.hostname}:{parts.port}'
+        head = [f'POST {target} HTTP/1.1', f'Host: {host_header}', f'Content-Length: {len(body)}',
+                'Connection: keep-alive']
+        head += [f'{name}: {value}' for name, value in (headers or {}).items()]
+        payload = ('\r\n'.join(head) + '\r\n\r\n').encode() + body
+
+        slots = self._slots.get(key)
+        if slots is None:
+            slots = self._slots[key] = asyncio.Semaphore(self.max_per_host)
+        async with slots:
+            connection = self._checkout_idle(key)
+            reused = connection is not None
+            while True:
+                if connection is None:
+                    connection = await asyncio.wait_for(self._connect(key), self.timeout)
+                reader, writer = connection
+                try:
+                    writer.write(payload)
+                    await writer.drain()
+                    status, response_headers, response_body = await asyncio.wait_for(_read_response(reader), self.timeout)
+                    break
+                except (ConnectionError, asyncio.IncompleteReadError) as e:
+                    writer.close()
+                    connection = None
+                    if not reused:
+                        raise WebhookError(f"Connection to {key[1]} failed: {e}") from e
+                    # The server dropped an idle keep-alive connection; retry once on a fresh one
+                    reused = False
+                except BaseException:
+                    writer.close()
+                    raise
+            self.requests += 1
+            if response_headers.get('connection', '').lower() == 'close':
+                writer.close()
+            else:
+                self._idle.setdefault(key, []).append((reader, writer, time.monotonic()))
+        return status, response_headers, response_body
+
+    def close(self):
+        for idle in self._idle.values():
+            for _, writer, _ in idle:
+                writer.close()
+        self._idle.clear()
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> Tuple[str, Dict[str, str]]:
+    start_line = (await reader.readuntil(b'\r\n')).decode('latin-1').strip()
+    headers = {}
+    while True:
+        line = (await reader.readuntil(b'\r\n')).decode('latin-1')
+        if line == '\r\n':
+            return start_line, headers
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+
+async def _read_body(reader: asyncio.StreamReader, headers: Dict[str, str]) -> bytes:
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        chunks = []
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            if size == 0:
+                await reader.readuntil(b'\r\n')
+                return b''.join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+    if 'content-length' in headers:
+        return await reader.readexactly(int(headers['content-length']))
+    return b''
+
+
+async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str], bytes]:
+    status_line, headers = await _read_headers(reader)
+    status = int(status_line.split()[1])
+    if 'content-length' not in headers and 'transfer-encoding' not in headers and status not in (204, 304):
+        headers['connection'] = 'close'
+        return status, headers, await reader.read()
+    return status, headers, await _read_body(reader, headers)
+
+
+def split_text(text: str, limit: int) -> List[str]:
+    """Split one over-long entry at line, then word, boundaries."""
+    pieces = []
+    while len(text) > limit:
+        cut = text.rfind('\n', 0, limit + 1)
+        if cut <= 0:
+            cut = text.rfind(' ', 0, limit + 1)
+        if cut <= 0:
+            cut = limit
+        pieces.append(text[:cut].rstrip())
+        text = text[cut:].lstrip()
+    if text:
+        pieces.append(text)
+    return pieces
+
+
+def pack_entries(entries: List[str], limit: int, separator: str = ENTRY_SEPARATOR) -> List[Tuple[str, List[int]]]:
+    """Greedily pack entries (in order) into messages of at most `limit` chars.
+
+    Returns (message, indexes of the entries it carries).
+    """
+    messages: List[Tuple[str, List[int]]] = []
+    current, carried = '', []
+    for index, entry in enumerate(entries):
+        for piece in split_text(entry, limit):
+            if current and len(current) + len(separator) + len(piece) <= limit:
+                current += separator + piece
+                if carried[-1] != index:
+                    carried.append(index)
+                continue
+            if current:
+                messages.append((current, carried))
+            current, carried = piece, [index]
+    if current:
+        messages.append((current, carried))
+    return messages
+
+
+def format_quest(quest: Dict[str, Any]) -> str:
+    """One quest as a board entry."""
+    boss = ' [BOSS]' if quest.get('is_boss') else ''
+    line = f"**{quest.get('name', 'Unknown Quest')}**{boss} ({quest.get('difficulty', 'easy')}, {quest.get('xp_reward', 0)} XP)"
+    return f"{line}\n{quest['description']}" if quest.get('description') else line
+
+
+def build_payload(channel: Dict[str, Any], text: str) -> Dict[str, Any]:
+    platform = channel.get('platform', 'generic')
+    if platform == 'discord':
+        return {"content": text}
+    if platform == 'telegram':
+        return {"chat_id": channel.get('chat_id'), "text": text}
+    return {"text": text}
+
+
+def retry_after(headers: Dict[str, str], body: bytes) -> Optional[float]:
+    """Seconds to wait from a 429 response (header or Discord-style body)."""
+    delays = []
+    try:
+        delays.append(float(headers['retry-after']))
+    except (KeyError, ValueError):
+        pass
+    try:
+        data = json.loads(body or b'{}')
+        delays.append(float(data.get('retry_after') or data.get('parameters', {}).get('retry_after')))
+    except (ValueError, TypeError, AttributeError):
+        pass
+    return max(delays) if delays else None
+
+
+class WebhookDispatcher:
+    """Per-channel queues drained by rate-limited, batching workers."""
+
+    def __init__(self, channels: Dict[str, Dict[str, Any]], pool: ConnectionPool = None, batch_window: float = BATCH_WINDOW,
+                 max_retries: int = MAX_RETRIES, base_delay: float = BASE_DELAY, max_delay: float = MAX_DELAY):
+        self.channels = channels
+        self.pool = pool or ConnectionPool()
+        self.batch_window = batch_window
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = {"entries": 0, "messages": 0, "retries": 0, "rate_limited": 0, "failed": 0}
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def _channel(self, name: str) -> Dict[str, Any]:
+        channel = self.channels.get(name)
+        if channel is None:
+            raise WebhookError(f"Unknown channel: {name}")
+        if not channel.get('url'):
+            env_name = 'QUESTBOARD_WEBHOOK_' + ''.join(c if c.isalnum() else '_' for c in name).upper()
+            channel = dict(channel, url=os.environ.get(env_name))
+            if not channel['url']:
+                raise WebhookError(f"No url for channel {name} (set it in config.json or {env_name})")
+            self.channels[name] = channel
+        return channel
+
+    def submit(self, name: str, text: str) -> asyncio.Future:
+        """Queue one entry; the future resolves once a message carrying it is delivered."""
+        channel = self._channel(name)
+        queue = self._queues.get(name)
+        if queue is None:
+            queue = self._queues[name] = asyncio.Queue()
+            limit, rate, burst = PLATFORMS.get(channel.get('platform', 'generic'), PLATFORMS['generic'])
+            self._buckets[name] = TokenBucket(channel.get('rate', rate), channel.get('burst', burst))
+            self._workers[name] = asyncio.ensure_future(self._worker(name))
+        future = asyncio.get_running_loop().create_future()
+        queue.put_nowait((text, future))
+        self.stats['entries'] += 1
+        return future
+
+    async def send_all(self, name: str, entries: List[str]) -> List[Any]:
+        """Queue entries for a channel and wait for all of them."""
+        return list(await asyncio.gather(*(self.submit(name, entry) for entry in entries), return_exceptions=True))
+
+    async def _worker(self, name: str):
+        queue = self._queues[name]
+        channel = self.channels[name]
+        limit = channel.get('limit') or PLATFORMS.get(channel.get('platform', 'generic'), PLATFORMS['generic'])[0]
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await queue.get()]
+            deadline = loop.time() + self.batch_window
+            while (timeout := deadline - loop.time()) > 0:
+                try:
+                    items.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Wait for a send slot first, then take everything that queued up meanwhile
+            await self._buckets[name].acquire()
+            while not queue.empty():
+                items.append(queue.get_nowait())
+
+            # An over-long entry is split across messages; it only counts as
+            # delivered once every piece is, so settle futures at the end
+            results, errors = {}, {}
+            first = True
+            for text, indexes in pack_entries([text for text, _ in items], limit):
+                try:
+                    result = await self._deliver(name, channel, text, skip_token=first)
+                except Exception as e:
+                    self.stats['failed'] += 1
+                    for index in indexes:
+                        errors.setdefault(index, e)
+                else:
+                    for index in indexes:
+                        results.setdefault(index, result)
+                first = False
+            for index, (_, future) in enumerate(items):
+                if future.done():
+                    continue
+                if index in errors:
+                    future.set_exception(errors[index])
+                else:
+                    future.set_result(results.get(index))
+            for _ in items:
+                queue.task_done()
+
+    def _backoff(self, attempt: int) -> float:
+        return min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    async def _deliver(self, name: str, channel: Dict[str, Any], text: str, skip_token: bool = False) -> Dict[str, Any]:
+        bucket = self._buckets[name]
+        body = json.dumps(build_payload(channel, text)).encode()
+        headers = {'Content-Type': 'application/json'}
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt or not skip_token:
+                await bucket.acquire()
+            try:
+                status, response_headers, response_body = await self.pool.request(channel['url'], body, headers)
+            except (OSError, asyncio.TimeoutError, WebhookError) as e:
+                error, delay = str(e) or type(e).__name__, self._backoff(attempt)
+            else:
+                if 200 <= status < 300:
+                    self.stats['messages'] += 1
+                    return {"channel": name, "status": status, "attempts": attempt + 1, "chars": len(text)}
+                error = f"HTTP {status}: {response_body[:200].decode('utf-8', 'replace')}"
+                if status == 429:
+                    self.stats['rate_limited'] += 1
+                    delay = retry_after(response_headers, response_body) or self._backoff(attempt)
+                    bucket.pause(delay)
+                    delay = 0  # the bucket now enforces the wait
+                elif status >= 500:
+                    delay = self._backoff(attempt)
+                else:
+                    raise WebhookError(f"{name}: {error}")
+            if attempt < self.max_retries:
+                self.stats['retries'] += 1
+                await asyncio.sleep(delay)
+        raise WebhookError(f"{name}: gave up after {self.max_retries + 1} attempts ({error})")
+
+    async def drain(self):
+        """Wait until every queued entry has been handled."""
+        for queue in self._queues.values():
+            await queue.join()
+
+    async def close(self):
+        await self.drain()
+        for worker in self._workers.values():
+            worker.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        self.pool.close()
+
+
+class StandInServer:
+    """Local keep-alive webhook endpoint for tests and throughput runs.
+
+    Each URL path is its own channel with a `rate`/`burst` limit; posts over
+    the limit get a 429 with Retry-After. Every `fail_every`-th post gets a
+    503. Accepted payloads are kept in `received[path]`.
+    """
+
+    def __init__(self, port: int = 0, rate: float = 2.5, burst: float = 5, latency: float = 0.0, fail_every: int = 0):
+        self.port = port
+        self.rate = rate
+        self.burst = burst
+        self.latency = latency
+        self.fail_every = fail_every
+        self.received: Dict[str, List[Any]] = {}
+        self.connections = 0
+        self.posts = 0
+        self.rejected = 0
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._handlers: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+        self.server = None
+
+    def url(self, path: str = '/hook') -> str:
+        return f"http://127.0.0.1:{self.port}{path}"
+
+    async def start(self) -> "StandInServer":
+        self.server = await asyncio.start_server(self._handle, '127.0.0.1', self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        """Stop listening and end open keep-alive connections cleanly."""
+        self.server.close()
+        handlers = dict(self._handlers)
+        for writer in handlers.values():
+            writer.close()
+        await asyncio.gather(*handlers, return_exceptions=True)
+        await self.server.wait_closed()
+
+    def _respond(self, writer: asyncio.StreamWriter, status: int, reason: str, body: Dict[str, Any] = None, headers: Dict[str, str] = None):
+        payload = json.dumps(body).encode() if body is not None else b''
+        head = [f'HTTP/1.1 {status} {reason}', f'Content-Length: {len(payload)}', 'Content-Type: application/json']
+        head += [f'{name}: {value}' for name, value in (headers or {}).items()]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode() + payload)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        task = asyncio.current_task()
+        self._handlers[task] = writer
+        try:
+            while True:
+                try:
+                    request_line, headers = await _read_headers(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                body = await _read_body(reader, headers)
+                path = request_line.split()[1]
+                self.posts += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+
+                bucket = self._buckets.get(path)
+                if bucket is None:
+                    bucket = self._buckets[path] = TokenBucket(self.rate, self.burst)
+                bucket._refill()
+                if self.fail_every and self.posts % self.fail_every == 0:
+                    self._respond(writer, 503, 'Service Unavailable', {"message": "try again"})
+                elif bucket.tokens < 1:
+                    self.rejected += 1
+                    wait = round((1 - bucket.tokens) / bucket.rate, 3)
+                    self._respond(writer, 429, 'Too Many Requests', {"message": "rate limited", "retry_after": wait},
+                                  {'Retry-After': str(wait)})
+                else:
+                    bucket.tokens -= 1
+                    self.received.setdefault(path, []).append(json.loads(body or b'null'))
+                    self._respond(writer, 204, 'No Content')
+                await writer.drain()
+        finally:
+            self._handlers.pop(task, None)
+            writer.close()
+
+
+def load_channels() -> Tuple[Dict[str, Dict[str, Any]], Optional[str]]:
+    """Configured webhooks and the default (`output_channel`) channel."""
+    try:
+        with open(CONFIG_PATH, 'r') as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        config = {}
+    channels = dict(config.get('webhooks') or {})
+    default = config.get('output_channel')
+    if default and default not in channels:
+        channels[default] = {"platform": default if default in PLATFORMS else 'generic'}
+    return channels, default
+
+
+async def send_entries(channels: Dict[str, Dict[str, Any]], name: str, entries: List[str]) -> Dict[str, Any]:
+    dispatcher = WebhookDispatcher(channels)
+    try:
+        results = await dispatcher.send_all(name, entries)
+    finally:
+        await dispatcher.close()
+    errors = sorted({str(result) for result in results if isinstance(result, Exception)})
+    return {"channel": name, **dispatcher.stats, "connections": dispatcher.pool.opened, "errors": errors}
+
+
+def main():
+    """Main function to send messages or run the stand-in webhook server."""
+    try:
+        args = sys.argv[1:]
+        command = args[0] if args else 'send'
+
+        if command == 'send':
+            channels, default = load_channels()
+            name = args[1] if len(args) > 1 else default
+            if not name:
+                raise ValueError("No channel given and no output_channel in config.json")
+            data = json.load(sys.stdin)
+            items = data.get('quests', data.get('messages', [])) if isinstance(data, dict) else data
+            entries = [format_quest(item) if isinstance(item, dict) else str(item) for item in items]
+            report = asyncio.run(send_entries(channels, name, entries))
+            print(json.dumps(report, indent=2))
+            if report['errors']:
+                sys.exit(1)
+        elif command == 'standin':
+            options = {'--rate': 2.5, '--burst': 5, '--latency': 0, '--fail-every': 0}
+            for flag in options:
+                if flag in args:
+                    index = args.index(flag)
+                    options[flag] = float(args[index + 1])
+                    del args[index:index + 2]
+
+            async def run():
+                standin = await StandInServer(
+                    int(args[1]) if len(args) > 1 else DEFAULT_STANDIN_PORT, options['--rate'], options['--burst'],
+                    options['--latency'] / 1000, int(options['--fail-every'])
+                ).start()
+                print(f"Stand-in webhook server listening on {standin.url('/<channel>')}", file=sys.stderr)
+                await standin.server.serve_forever()
+
+            try:
+                asyncio.run(run())
+            except KeyboardInterrupt:
+                pass
+        else:
+            raise ValueError(f"Unknown command: {command}")
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
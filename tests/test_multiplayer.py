@@ -0,0 +1,93 @@
+"""Multi-player engine in-process (no sockets, no network)."""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import multiplayer
+from multiplayer import MultiPlayerEngine, run_load
+from quest_journal import QuestJournal
+
+
+class MultiPlayerEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='questboard-test-')
+        self.engine = MultiPlayerEngine(self.root, workers=8)
+
+    def tearDown(self):
+        self.engine.close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_no_xp_lost_under_concurrent_completions(self):
+        report = asyncio.run(run_load(self.engine, players=20, completions=10, concurrency=200))
+        self.assertEqual(report['completions'], 200)
+        self.assertEqual(report['lost_xp'], 0)
+
+    def test_completions_are_serialized_per_player(self):
+        active, overlaps, players_at_once = {}, [], []
+        guard = threading.Lock()
+        original = QuestJournal.complete
+
+        def tracked(journal, quest, stats=None):
+            player = journal.directory
+            with guard:
+                active[player] = active.get(player, 0) + 1
+                overlaps.append(active[player])
+                players_at_once.append(sum(1 for count in active.values() if count))
+            time.sleep(0.005)
+            try:
+                return original(journal, quest, stats)
+            finally:
+                with guard:
+                    active[player] -= 1
+
+        QuestJournal.complete = tracked
+        try:
+            async def run():
+                await asyncio.gather(*(
+                    self.engine.complete(f"player{index % 4}", {"id": f"q{index}", "category": "coding", "xp_reward": 25})
+                    for index in range(40)
+                ))
+                return [await self.engine.state(f"player{index}") for index in range(4)]
+            states = asyncio.run(run())
+        finally:
+            QuestJournal.complete = original
+
+        self.assertEqual(max(overlaps), 1)
+        self.assertGreater(max(players_at_once), 1)
+        self.assertEqual([state['xp'] for state in states], [250] * 4)
+
+    def test_generate_runs_off_the_event_loop(self):
+        threads = []
+        original = multiplayer.generate_quest_from_event
+
+        def tracked(event):
+            threads.append(threading.current_thread())
+            return original(event)
+
+        multiplayer.generate_quest_from_event = tracked
+        try:
+            async def run():
+                events = [{"id": "e1", "title": "Write docs", "start": {"dateTime": "2026-10-17T09:00:00Z"},
+                           "end": {"dateTime": "2026-10-17T10:00:00Z"}}]
+                quests = await self.engine.generate("ana", events)
+                return quests, await self.engine.state("ana")
+            quests, state = asyncio.run(run())
+        finally:
+            multiplayer.generate_quest_from_event = original
+
+        self.assertEqual(len(quests), 1)
+        self.assertIn(quests[0]['id'], state['active_quests'])
+        self.assertTrue(threads and all(thread is not threading.main_thread() for thread in threads))
+
+
+if __name__ == '__main__':
+    unittest.main()
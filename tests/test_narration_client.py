@@ -0,0 +1,104 @@
+"""Narration client against the local stub model server (no network)."""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from narration_client import ChatTransport, NarrationCache, NarrationClient, StubModelServer
+
+
+class NarrationClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.stub = StubModelServer().start()
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = NarrationCache(os.path.join(self.directory.name, 'narration.db'))
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+        self.stub.stop()
+
+    def client(self, url: str = None) -> NarrationClient:
+        return NarrationClient(ChatTransport(url or self.stub.url, api_key=''), self.cache, model='stub', style='epic_humorous')
+
+    def test_burst_is_coalesced_and_packed(self):
+        prompts = [f"Quest #{index % 3} is complete." for index in range(30)]
+        client = self.client()
+        texts = asyncio.run(client.narrate_many(prompts))
+        client.close()
+
+        self.assertEqual(texts, [f"The bards recount: {prompt}" for prompt in prompts])
+        self.assertEqual(self.stub.requests, 1)
+        self.assertEqual(self.stub.prompts, 3)
+        self.assertEqual(client.counters['coalesced'], 27)
+        self.assertFalse(client._tasks)
+
+    def test_warm_cache_makes_no_requests(self):
+        prompts = ["Quest A is complete.", "Quest B is complete."]
+        cold = self.client()
+        asyncio.run(cold.narrate_many(prompts))
+        cold.close()
+        requests = self.stub.requests
+
+        warm = self.client()
+        # Near-identical prompts normalize to the same cache entry
+        texts = asyncio.run(warm.narrate_many(["  quest a is COMPLETE. ", "Quest B is complete."]))
+        warm.close()
+
+        self.assertEqual(self.stub.requests, requests)
+        self.assertEqual(warm.counters['cache_hits'], 2)
+        self.assertEqual(texts[1], "The bards recount: Quest B is complete.")
+
+    def test_cache_reads_do_not_block_the_event_loop(self):
+        client = self.client()
+        get = self.cache.get
+
+        def slow_get(digest):
+            # Another process holding the cache's write lock
+            time.sleep(0.3)
+            return get(digest)
+
+        self.cache.get = slow_get
+
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            task = asyncio.ensure_future(ticker())
+            text = await client.narrate("Quest A is complete.")
+            task.cancel()
+            return text, ticks
+
+        text, ticks = asyncio.run(run())
+        client.close()
+        self.assertEqual(text, "The bards recount: Quest A is complete.")
+        self.assertGreater(ticks, 10)
+
+    def test_transport_errors_reach_every_caller(self):
+        # A stub that was never started: connections are refused
+        dead = StubModelServer()
+        dead.server.server_close()
+        client = self.client(dead.url)
+
+        async def run():
+            return await asyncio.gather(*(client.narrate(f"Quest {index}") for index in range(3)), return_exceptions=True)
+
+        results = asyncio.run(run())
+        client.close()
+        self.assertTrue(all(isinstance(result, Exception) for result in results))
+        self.assertFalse(client._tasks)
+
+
+if __name__ == '__main__':
+    unittest.main()
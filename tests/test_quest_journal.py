@@ -0,0 +1,46 @@
+"""Quest journal against a throwaway directory."""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from quest_journal import QuestJournal
+
+
+class QuestJournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='questboard-test-')
+        self.journal = QuestJournal(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_repeated_completion_is_rejected(self):
+        self.journal.complete({'id': 'q1', 'xp_reward': 100})
+        with self.assertRaises(ValueError):
+            self.journal.complete({'id': 'q1', 'xp_reward': 100})
+        with self.assertRaises(ValueError):
+            self.journal.complete_batch([{'id': 'q2', 'xp_reward': 50}, {'id': 'q1', 'xp_reward': 100}])
+        self.assertEqual(self.journal.state()['xp'], 100)
+
+    def test_duplicate_in_batch_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.journal.complete_batch([{'id': 'q1', 'xp_reward': 100}, {'id': 'q1', 'xp_reward': 100}])
+        self.assertEqual(self.journal.state()['xp'], 0)
+
+    def test_completed_ids_survive_compaction(self):
+        self.journal.complete({'id': 'q1', 'xp_reward': 100})
+        self.journal.compact()
+        fresh = QuestJournal(self.directory)
+        with self.assertRaises(ValueError):
+            fresh.complete({'id': 'q1', 'xp_reward': 100})
+        self.assertEqual(fresh.state()['xp'], 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""Webhook dispatcher against the local stand-in server (no network)."""
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from webhook_dispatcher import StandInServer, WebhookDispatcher, WebhookError
+
+
+class WebhookDispatcherTest(unittest.TestCase):
+
+    def dispatch(self, entries, server_options=None, channel_options=None, **dispatcher_options):
+        """Send `entries` to a fresh stand-in; returns (results, dispatcher, server)."""
+        async def run():
+            server = await StandInServer(**{'rate': 1000, 'burst': 1000, **(server_options or {})}).start()
+            channel = {"platform": "discord", "url": server.url('/hook'), "limit": 100, "rate": 1000, "burst": 1000}
+            channel.update(channel_options or {})
+            options = {'batch_window': 0.01, 'base_delay': 0.01, **dispatcher_options}
+            dispatcher = WebhookDispatcher({"team": channel}, **options)
+            try:
+                results = await dispatcher.send_all("team", entries)
+            finally:
+                await dispatcher.close()
+                await server.stop()
+            return results, dispatcher, server
+        return asyncio.run(run())
+
+    def test_entries_are_packed_under_the_limit(self):
+        entries = [f"Quest {index} is ready." for index in range(20)]
+        results, dispatcher, server = self.dispatch(entries)
+
+        messages = [payload['content'] for payload in server.received['/hook']]
+        self.assertFalse([result for result in results if isinstance(result, Exception)])
+        self.assertLess(len(messages), len(entries))
+        self.assertTrue(all(len(message) <= 100 for message in messages))
+        self.assertEqual(sum(message.count("is ready.") for message in messages), len(entries))
+        self.assertEqual(dispatcher.stats['messages'], len(messages))
+
+    def test_split_entry_fails_when_one_piece_fails(self):
+        long_entry = ' '.join(f"word{index}" for index in range(60))
+        results, dispatcher, server = self.dispatch([long_entry], server_options={'fail_every': 2}, max_retries=0)
+
+        self.assertIsInstance(results[0], WebhookError)
+        self.assertGreaterEqual(dispatcher.stats['failed'], 1)
+        # The other pieces were still delivered
+        self.assertGreaterEqual(len(server.received['/hook']), 2)
+
+    def test_rate_limited_posts_wait_for_retry_after(self):
+        entries = [f"Quest {index} is ready." for index in range(12)]
+        results, dispatcher, server = self.dispatch(entries, server_options={'rate': 20, 'burst': 1},
+                                                    channel_options={'limit': 30})
+
+        self.assertFalse([result for result in results if isinstance(result, Exception)])
+        self.assertGreater(server.rejected, 0)
+        self.assertEqual(dispatcher.stats['rate_limited'], server.rejected)
+        self.assertEqual(len(server.received['/hook']), dispatcher.stats['messages'])
+
+    def test_server_errors_are_retried(self):
+        entries = [f"Quest {index} is ready." for index in range(12)]
+        results, dispatcher, server = self.dispatch(entries, server_options={'fail_every': 3},
+                                                    channel_options={'limit': 30})
+
+        self.assertFalse([result for result in results if isinstance(result, Exception)])
+        self.assertGreater(dispatcher.stats['retries'], 0)
+        self.assertEqual(dispatcher.stats['failed'], 0)
+        self.assertEqual(server.posts, dispatcher.stats['messages'] + dispatcher.stats['retries'])
+
+    def test_connections_are_reused(self):
+        entries = [f"Quest {index} is ready." for index in range(12)]
+        results, dispatcher, server = self.dispatch(entries, channel_options={'limit': 30})
+
+        self.assertGreater(dispatcher.stats['messages'], 1)
+        self.assertEqual(dispatcher.pool.opened, 1)
+        self.assertEqual(server.connections, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()